@@ -0,0 +1,103 @@
+"""Start-up, incremental reload and stop of a fleet entry against benchmarks/fake_hass.py.
+
+    python benchmarks/bench_fleet.py [--zones 500] [--changed 5] [--entities minimal|full] [--engine batch]
+
+Writes a fleet file with --zones zones to a temporary config directory and times the FleetRuntime:
+loading the file and starting every zone runtime, building the entities of all platforms (each
+platform gets one bulk add call), a reload after --changed zone definitions were edited and one
+zone was added, and stopping all zones. Entities are constructed but not attached to a platform.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from custom_components.smart_pid_thermostat import button, number, sensor, switch  # noqa: E402
+from custom_components.smart_pid_thermostat.const import (  # noqa: E402
+    DOMAIN,
+    CONF_NAME,
+    CONF_ENTRY_TYPE,
+    ENTRY_FLEET,
+    CONF_FLEET_FILE,
+)
+from custom_components.smart_pid_thermostat.fleet import FleetRuntime  # noqa: E402
+from custom_components.smart_pid_thermostat.simulator import SimClock  # noqa: E402
+from fake_hass import FakeConfigEntry, FakeHass  # noqa: E402
+
+PLATFORMS = (sensor, switch, number, button)
+
+
+def fleet_definition(zones: int, entities: str, engine: str) -> dict:
+    return {
+        "entities": entities,
+        "defaults": {"engine": engine, "update_interval": 60, "min_temp": 16, "max_temp": 28},
+        "zones": [
+            {"id": f"zone_{i:04d}", "climates": [f"climate.zone_{i:04d}"], "sensor": f"sensor.zone_{i:04d}_temperature"}
+            for i in range(zones)
+        ],
+    }
+
+
+async def run(zones: int, changed: int, entities: str, engine: str) -> dict:
+    hass = FakeHass(SimClock(0.0))
+    hass.data[DOMAIN] = {}
+    definition = fleet_definition(zones, entities, engine)
+    path = hass.config.path("fleet.json")
+    with open(path, "w") as f:
+        json.dump(definition, f)
+    entry = FakeConfigEntry({CONF_NAME: "Bench", CONF_ENTRY_TYPE: ENTRY_FLEET, CONF_FLEET_FILE: "fleet.json"},
+                            entry_id="bench", title="Bench")
+    fleet = FleetRuntime(hass, entry)
+    added = []
+    timings = {}
+
+    t0 = time.perf_counter()
+    await fleet.start()
+    timings["start"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for platform in PLATFORMS:
+        fleet.add_platform(platform._build, lambda batch, update: added.append(len(batch)))
+    timings["entities"] = time.perf_counter() - t0
+    calls, total = len(added), sum(added)
+
+    for zone in definition["zones"][:changed]:
+        zone["min_temp"] = 17
+    definition["zones"].append({"id": "zone_new", "climates": ["climate.zone_new"], "sensor": "sensor.zone_new"})
+    with open(path, "w") as f:
+        json.dump(definition, f)
+    t0 = time.perf_counter()
+    res = await fleet.reload()
+    timings["reload"] = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    await fleet.stop()
+    timings["stop"] = time.perf_counter() - t0
+    return {"timings": timings, "add_calls": calls, "entities": total, "reload": res}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--zones", type=int, default=500)
+    parser.add_argument("--changed", type=int, default=5)
+    parser.add_argument("--entities", choices=["minimal", "full"], default="minimal")
+    parser.add_argument("--engine", choices=["scalar", "batch"], default="batch")
+    args = parser.parse_args()
+    out = asyncio.run(run(args.zones, args.changed, args.entities, args.engine))
+    reload = out["reload"]
+    print(f"{args.zones} zones, {args.entities} entities, {args.engine} engine")
+    print(f"{'start':<12}{out['timings']['start'] * 1e3:>10.1f} ms   ({out['timings']['start'] / args.zones * 1e6:.0f} us/zone)")
+    print(f"{'entities':<12}{out['timings']['entities'] * 1e3:>10.1f} ms   ({out['entities']} entities in {out['add_calls']} add calls)")
+    print(f"{'reload':<12}{out['timings']['reload'] * 1e3:>10.1f} ms   ({len(reload['changed'])} changed, "
+          f"{len(reload['added'])} added, {reload['unchanged']} untouched)")
+    print(f"{'stop':<12}{out['timings']['stop'] * 1e3:>10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
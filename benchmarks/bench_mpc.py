@@ -0,0 +1,81 @@
+"""Per-tick cost and closed-loop behaviour of MPCController against PIDController.
+
+    python benchmarks/bench_mpc.py [--days 1] [--ticks 100000]
+
+Times one controller update (MPC: dot product and clamp on the precomputed gains; PID: update)
+and the matrix precomputation, then runs both in closed loop against FOPDT rooms with growing dead
+time. The PID uses IMC gains for the same model. The "mismatch" rows run the MPC on a model whose
+tau and dead time are 30% off the simulated room.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.smart_pid_thermostat.mpc import MPCController  # noqa: E402
+from custom_components.smart_pid_thermostat.pid_controller import PIDController  # noqa: E402
+from custom_components.smart_pid_thermostat.simulator import FOPDTPlant, run_scenario  # noqa: E402
+from custom_components.smart_pid_thermostat.sysid import imc_gains  # noqa: E402
+
+MODELS = {
+    "short_dead_time": {"gain": 0.9, "tau": 900.0, "dead_time": 60.0},
+    "slow": {"gain": 0.7, "tau": 3600.0, "dead_time": 600.0},
+    "long_dead_time": {"gain": 0.8, "tau": 1800.0, "dead_time": 1500.0},
+}
+INTERVAL = 60.0
+
+
+def per_tick(ticks: int) -> None:
+    print(f"{'controller':<34}{'us/tick':>10}")
+    for name, model in MODELS.items():
+        t0 = time.perf_counter()
+        mpc = MPCController(model, INTERVAL, u_min=18.0, u_max=30.0)
+        build = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        for i in range(ticks):
+            mpc.step(21.0 + (i % 7) * 0.1, 22.0, 22.0, INTERVAL * i)
+        tick = (time.perf_counter() - t0) / ticks
+        print(f"{'mpc/' + name:<34}{tick * 1e6:>10.2f}   (precompute {build * 1e3:.2f} ms, "
+              f"{mpc.k_x.size} states)")
+    pid = PIDController(0.8, 0.05, 0.1, out_min=-4.0, out_max=8.0)
+    t0 = time.perf_counter()
+    for i in range(ticks):
+        pid.update(1.0 - (i % 7) * 0.1, now=INTERVAL * i)
+    print(f"{'pid':<34}{(time.perf_counter() - t0) / ticks * 1e6:>10.2f}")
+
+
+def closed_loop(days: float) -> None:
+    duration = days * 86400.0
+    common = dict(target=22.0, duration=duration, interval=INTERVAL, settle_band=0.5, sensor_step=0.1)
+    print()
+    print(f"{'scenario':<34}{'settle [min]':>14}{'overshoot':>11}{'final':>8}{'commands':>10}")
+    for name, model in MODELS.items():
+        runs = {
+            "pid_imc": run_scenario(_plant(model), **imc_gains(model), **common),
+            "mpc": run_scenario(_plant(model), mpc=MPCController(model, INTERVAL), **common),
+            "mpc_mismatch": run_scenario(_plant(model), mpc=MPCController(
+                {**model, "tau": model["tau"] * 1.3, "dead_time": model["dead_time"] * 0.7}, INTERVAL), **common),
+        }
+        for kind, res in runs.items():
+            settle = "-" if res["settling_time"] is None else f"{res['settling_time'] / 60:.1f}"
+            print(f"{name + '/' + kind:<34}{settle:>14}{res['overshoot']:>11.2f}{res['final']:>8.2f}{res['commands']:>10}")
+
+
+def _plant(model: dict) -> FOPDTPlant:
+    return FOPDTPlant(model["gain"], model["tau"], model["dead_time"], outdoor=10.0, initial=19.0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=float, default=1.0)
+    parser.add_argument("--ticks", type=int, default=100000)
+    args = parser.parse_args()
+    per_tick(args.ticks)
+    closed_loop(args.days)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""Setup and unload time of many config entries against benchmarks/fake_hass.py.
+
+    python benchmarks/bench_setup.py [--entries 1 50 500] [--engine batch|scalar]
+
+First reports, in a fresh interpreter, the cost of importing the integration package and whether
+NumPy came with it. Then, for each count, runs the integration's async_setup once, sets up that many
+zone entries through __init__.async_setup_entry (platform forwarding included; entities are
+constructed and counted but not attached), and unloads them all again. All counts run in one
+process, so the first one also pays for importing the runtime and platform modules.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.dirname(__file__))
+
+import custom_components.smart_pid_thermostat as integration  # noqa: E402
+from custom_components.smart_pid_thermostat.const import DOMAIN  # noqa: E402
+from custom_components.smart_pid_thermostat.simulator import SimClock  # noqa: E402
+from fake_hass import FakeConfigEntry, FakeHass  # noqa: E402
+
+IMPORT_PROBE = (
+    "import sys, time; sys.path.insert(0, {root!r}); t0 = time.perf_counter(); "
+    "import custom_components.smart_pid_thermostat; "
+    "print(time.perf_counter() - t0, 'numpy' in sys.modules)"
+)
+
+
+def import_cost() -> tuple[float, bool]:
+    # what Home Assistant has loaded anyway comes first, so only the integration's own imports are timed
+    probe = "import asyncio, logging, homeassistant.helpers.config_validation; " + IMPORT_PROBE.format(root=ROOT)
+    out = subprocess.run([sys.executable, "-c", probe], capture_output=True, text=True, check=True,
+                         env={**os.environ, "PYTHONPATH": os.pathsep.join(sys.path)})
+    seconds, numpy = out.stdout.split()
+    return float(seconds), numpy == "True"
+
+
+def zone_data(i: int, engine: str) -> dict:
+    return {
+        "name": f"Zone {i}",
+        "climates": [f"climate.zone_{i}"],
+        "sensor": [f"sensor.zone_{i}_temperature"],
+        "engine": engine,
+        "update_interval": 60,
+        "min_temp": 16,
+        "max_temp": 28,
+    }
+
+
+async def run(count: int, engine: str) -> dict:
+    hass = FakeHass(SimClock(0.0))
+    entries = [FakeConfigEntry(zone_data(i, engine), entry_id=f"entry_{i}", title=f"Zone {i}") for i in range(count)]
+
+    t0 = time.perf_counter()
+    await integration.async_setup(hass, {})
+    domain_setup = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    for entry in entries:
+        await integration.async_setup_entry(hass, entry)
+    setup = time.perf_counter() - t0
+    loaded = len(hass.data[DOMAIN])
+
+    t0 = time.perf_counter()
+    for entry in entries:
+        await integration.async_unload_entry(hass, entry)
+    unload = time.perf_counter() - t0
+    return {
+        "domain_setup": domain_setup,
+        "setup": setup,
+        "unload": unload,
+        "loaded": loaded,
+        "left": len(hass.data[DOMAIN]),
+        "entities": hass.config_entries.entities,
+        "services": len(hass.services.registered),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--entries", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--engine", choices=["scalar", "batch"], default="batch")
+    args = parser.parse_args()
+    seconds, numpy = import_cost()
+    print(f"import: {seconds * 1e3:.1f} ms, numpy loaded: {'yes' if numpy else 'no'}")
+    print(f"{'entries':>8}{'setup [ms]':>12}{'per entry':>11}{'unload [ms]':>13}{'per entry':>11}{'entities':>10}{'services':>10}")
+    for count in args.entries:
+        res = asyncio.run(run(count, args.engine))
+        assert res["loaded"] == count and res["left"] == 0
+        print(f"{count:>8}{res['setup'] * 1e3:>12.1f}{res['setup'] / count * 1e3:>11.2f}"
+              f"{res['unload'] * 1e3:>13.1f}{res['unload'] / count * 1e3:>11.2f}{res['entities']:>10}{res['services']:>10}")
+    print(f"async_setup (service registration): {res['domain_setup'] * 1e3:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
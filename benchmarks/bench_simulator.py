@@ -0,0 +1,64 @@
+"""Closed-loop benchmark of PIDController and RelayAutoTuner against simulated thermal plants.
+
+    python benchmarks/bench_simulator.py [--days 1]
+
+Runs every gain set against each plant model on a simulated clock and prints settling time,
+overshoot, actuator command count and wall-clock cost per simulated day.
+"""
+from __future__ import annotations
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from custom_components.smart_pid_thermostat.simulator import (  # noqa: E402
+    FOPDTPlant,
+    TwoNodeRCPlant,
+    run_autotune,
+    run_batch,
+)
+
+PLANTS = {
+    "fopdt_fast": lambda: FOPDTPlant(gain=0.9, tau=900.0, dead_time=60.0),
+    "fopdt_slow": lambda: FOPDTPlant(gain=0.7, tau=3600.0, dead_time=600.0),
+    "rc_two_node": lambda: TwoNodeRCPlant(),
+}
+
+GAINS = {
+    "default": {"kp": 0.8, "ki": 0.05, "kd": 0.1},
+    "soft": {"kp": 0.4, "ki": 0.005, "kd": 0.0},
+    "aggressive": {"kp": 2.0, "ki": 0.02, "kd": 1.0},
+}
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--days", type=float, default=1.0)
+    args = parser.parse_args()
+    duration = args.days * 86400.0
+
+    scenarios = [
+        (f"{plant}/{gains}", factory(), {**GAINS[gains], "duration": duration})
+        for plant, factory in PLANTS.items()
+        for gains in GAINS
+    ]
+    print(f"{'scenario':<28}{'settle [min]':>14}{'overshoot':>11}{'commands':>10}{'ms/day':>9}")
+    for name, res in run_batch(scenarios).items():
+        settle = "-" if res["settling_time"] is None else f"{res['settling_time'] / 60:.1f}"
+        print(f"{name:<28}{settle:>14}{res['overshoot']:>11.2f}{res['commands']:>10}{res['wall_per_day'] * 1e3:>9.1f}")
+
+    print()
+    print(f"{'autotune':<28}{'Ku':>8}{'Tu [min]':>10}{'kp':>8}{'ki':>8}{'kd':>8}{'ms/day':>9}")
+    for plant, factory in PLANTS.items():
+        res = run_autotune(factory(), amplitude=2.0, duration=min(duration, 12 * 3600.0))
+        r = res["result"]
+        if r is None:
+            print(f"{plant:<28}{'no oscillation detected':>50}")
+            continue
+        print(f"{plant:<28}{r['Ku']:>8.2f}{r['Tu'] / 60:>10.1f}{r['kp']:>8.3f}{r['ki']:>8.4f}{r['kd']:>8.2f}"
+              f"{res['wall_per_day'] * 1e3:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
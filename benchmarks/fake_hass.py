@@ -0,0 +1,172 @@
+"""Minimal stand-in for a Home Assistant instance, enough to drive ControllerRuntime offline.
+
+Provides the attributes the runtime touches while ticking (states, services, config entries,
+data, loop), plus what entry setup and the real helpers used by ControllerRuntime.start() need
+(config dir, executor jobs, bus listeners, job runner, service registration, platform forwarding)
+so entries can be set up and unloaded too. No Home
+Assistant core is started; the `homeassistant` package must still be installed because the
+integration imports its helpers.
+"""
+from __future__ import annotations
+import asyncio
+import importlib
+import os
+import tempfile
+from datetime import datetime, timezone
+
+
+class FakeState:
+    __slots__ = ("entity_id", "state", "attributes", "last_updated", "last_reported")
+
+    def __init__(self, entity_id: str, state: str, attributes: dict | None, when: datetime):
+        self.entity_id = entity_id
+        self.state = state
+        self.attributes = attributes or {}
+        self.last_updated = when
+        self.last_reported = when
+
+
+class FakeStates:
+    def __init__(self):
+        self._states: dict[str, FakeState] = {}
+
+    def get(self, entity_id: str) -> FakeState | None:
+        return self._states.get(entity_id)
+
+    def set(self, entity_id: str, state, attributes: dict | None = None, when: float = 0.0):
+        at = datetime.fromtimestamp(when, timezone.utc)
+        old = self._states.get(entity_id)
+        if old is not None and attributes is None:
+            attributes = old.attributes
+        self._states[entity_id] = FakeState(entity_id, str(state), attributes, at)
+
+
+class FakeServices:
+    """Records every call as (time, domain, service, data); climate setpoints are echoed into states
+    so the actuator sees the device follow its commands. A weather entity acts as a stub: its
+    `forecast` attribute is returned by weather.get_forecasts."""
+    def __init__(self, hass: FakeHass):
+        self.hass = hass
+        self.calls: list[tuple[float, str, str, dict]] = []
+        self.registered: dict[tuple[str, str], object] = {}
+
+    def async_register(self, domain: str, service: str, handler, *args, **kwargs):
+        self.registered[(domain, service)] = handler
+
+    async def async_call(self, domain: str, service: str, data: dict, blocking: bool = False, **kwargs):
+        now = self.hass.clock.time()
+        self.calls.append((now, domain, service, dict(data)))
+        if domain == "climate" and service == "set_temperature":
+            ids = data["entity_id"]
+            for entity_id in [ids] if isinstance(ids, str) else ids:
+                old = self.hass.states.get(entity_id)
+                attrs = {**(old.attributes if old else {}), "temperature": data["temperature"]}
+                self.hass.states.set(entity_id, old.state if old else "heat", attrs, now)
+        elif domain == "weather" and service == "get_forecasts":
+            ids = data["entity_id"]
+            return {
+                entity_id: {"forecast": list(state.attributes.get("forecast") or ()) if state else []}
+                for entity_id, state in ((e, self.hass.states.get(e)) for e in ([ids] if isinstance(ids, str) else ids))
+            }
+
+
+class FakeConfigEntry:
+    def __init__(self, data: dict, options: dict | None = None, entry_id: str = "replay", title: str = "Replay"):
+        self.data = data
+        self.options = options or {}
+        self.entry_id = entry_id
+        self.title = title
+        self.on_unload: list = []
+
+    def async_on_unload(self, func):
+        self.on_unload.append(func)
+
+    def add_update_listener(self, listener):
+        return lambda: None
+
+
+class FakeConfigEntries:
+    """Platform forwarding imports the integration's platform modules and runs their setup;
+    entities are constructed and counted but not added to any platform."""
+    def __init__(self, hass: FakeHass, package: str = "custom_components.smart_pid_thermostat"):
+        self.hass = hass
+        self.package = package
+        self.updates = 0
+        self.entities = 0
+        self.add_calls = 0
+
+    def async_update_entry(self, entry: FakeConfigEntry, options: dict | None = None, **kwargs):
+        if options is not None:
+            entry.options = options
+        self.updates += 1
+
+    def _add_entities(self, entities, update_before_add: bool = False):
+        self.add_calls += 1
+        self.entities += len(entities)
+
+    async def async_forward_entry_setups(self, entry: FakeConfigEntry, platforms):
+        for platform in platforms:
+            module = importlib.import_module(f"{self.package}.{platform}")
+            await module.async_setup_entry(self.hass, entry, self._add_entities)
+
+    async def async_unload_platforms(self, entry: FakeConfigEntry, platforms) -> bool:
+        for func in entry.on_unload:
+            func()
+        entry.on_unload.clear()
+        return True
+
+
+class FakeConfig:
+    def __init__(self, config_dir: str | None = None):
+        self.config_dir = config_dir or tempfile.mkdtemp(prefix="smart_pid_bench_")
+
+    def path(self, *parts: str) -> str:
+        return os.path.join(self.config_dir, *parts)
+
+
+class FakeBus:
+    """Accepts listeners and never fires; state changes in fake states are not events."""
+    def __init__(self):
+        self.listeners = 0
+
+    def async_listen(self, event_type, listener, *args, **kwargs):
+        self.listeners += 1
+        return self._unsub
+
+    async_listen_once = async_listen
+
+    def _unsub(self):
+        self.listeners -= 1
+
+
+class FakeHass:
+    """Create inside a running event loop."""
+    def __init__(self, clock, config_dir: str | None = None):
+        from homeassistant.core import CoreState
+
+        self.clock = clock
+        self.data: dict = {}
+        self.states = FakeStates()
+        self.services = FakeServices(self)
+        self.config_entries = FakeConfigEntries(self)
+        self.config = FakeConfig(config_dir)
+        self.bus = FakeBus()
+        self.state = CoreState.running
+        self.loop = asyncio.get_running_loop()
+
+    def async_create_task(self, coro, *args, **kwargs):
+        return self.loop.create_task(coro)
+
+    async_create_background_task = async_create_task
+
+    def async_add_executor_job(self, target, *args):
+        return self.loop.run_in_executor(None, target, *args)
+
+    def async_run_hass_job(self, job, *args, **kwargs):
+        result = (job.target if hasattr(job, "target") else job)(*args)
+        if asyncio.iscoroutine(result):
+            return self.loop.create_task(result)
+        return None
+
+    def verify_event_loop_thread(self, what: str):
+        pass
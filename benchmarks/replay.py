@@ -0,0 +1,186 @@
+"""Replay recorded sensor states through the real ControllerRuntime as fast as the CPU allows.
+
+    python benchmarks/replay.py states.jsonl --config zone.json [--calls-out calls.jsonl]
+                                [--autotune-at HOURS] [--json]
+
+The stream is JSONL ({"t": ..., "entity_id": ..., "state": ..., "attributes": {...}}) or CSV
+with columns t, entity_id, state. `t` is epoch seconds or an ISO timestamp. `--config` is a JSON
+file with the entry data (climates, sensor, gains, ...), merged over the integration defaults.
+
+The runtime runs on a simulated clock against benchmarks/fake_hass.py. Its own _loop, schedule
+(setback/restore), feedforward and autotune code run unchanged, and every service call it emits is
+recorded. Weather entities in the stream may carry a `forecast` attribute for the feedforward.
+Interval trigger only; runtimes configured for the sensor-change trigger are replayed on their
+interval. Reports simulated hours per wall-clock second.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import csv
+import json
+import os
+import sys
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+sys.path.insert(0, os.path.dirname(__file__))
+
+from homeassistant.util import dt as dt_util  # noqa: E402
+
+from custom_components.smart_pid_thermostat.const import (  # noqa: E402
+    DEFAULTS,
+    CONF_TRIGGER,
+    CONF_ENGINE,
+    CONF_STATUS_INTERVAL,
+    CONF_OPTIMAL_START,
+    CONF_FEEDFORWARD,
+    FEEDFORWARD_REFRESH,
+    TRIGGER_INTERVAL,
+    ENGINE_SCALAR,
+)
+from custom_components.smart_pid_thermostat.coordinator import ControllerRuntime  # noqa: E402
+from custom_components.smart_pid_thermostat.simulator import SimClock  # noqa: E402
+from fake_hass import FakeConfigEntry, FakeHass  # noqa: E402
+
+
+def _parse_t(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+
+
+def load_events(path: str) -> list[tuple[float, str, str, dict | None]]:
+    """(t, entity_id, state, attributes) sorted by time."""
+    events = []
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            for row in csv.DictReader(f):
+                events.append((_parse_t(row["t"]), row["entity_id"], row["state"], None))
+        else:
+            for line in f:
+                if line.strip():
+                    rec = json.loads(line)
+                    events.append((_parse_t(rec["t"]), rec["entity_id"], rec["state"], rec.get("attributes")))
+    events.sort(key=lambda e: e[0])
+    return events
+
+
+async def replay(events, data: dict, autotune_at: float | None = None) -> dict:
+    if not events:
+        raise ValueError("empty state stream")
+    t0 = events[0][0]
+    clock = SimClock(epoch=t0)
+    hass = FakeHass(clock)
+    # the runtime is ticked directly: no timers, no throttled status pushes, scalar PID
+    data = {**data, CONF_TRIGGER: TRIGGER_INTERVAL, CONF_ENGINE: ENGINE_SCALAR, CONF_STATUS_INTERVAL: 0}
+    entry = FakeConfigEntry(data)
+    runtime = ControllerRuntime(hass, entry, clock=clock)
+    schedule = runtime._build_schedule()
+
+    def wall(t: float):
+        return dt_util.utc_from_timestamp(clock.epoch + t)
+
+    def next_transition(after):
+        # (due offset, transition); due is early by the optimal-start lead, like ScheduleEngine
+        at = schedule.next_transition(after) if schedule else None
+        if at is None:
+            return float("inf"), None
+        due = at.timestamp() - clock.epoch
+        if runtime.cfg.get(CONF_OPTIMAL_START):
+            due = max(clock.t, due - runtime._lead(schedule.current(at)))
+        return due, at
+
+    due, transition = next_transition(wall(0.0))
+    next_tick = 0.0
+    # feedforward profile refreshes, like the runtime's own timer
+    next_ff = 0.0 if data.get(CONF_FEEDFORWARD) else float("inf")
+    ticks = 0
+    autotune_t = None if autotune_at is None else autotune_at * 3600.0
+    started = time.perf_counter()
+
+    async def deliver():
+        # the actuator delivers in background tasks; finish them at the simulated instant they were sent
+        while runtime.actuator._inflight:
+            await asyncio.gather(*list(runtime.actuator._inflight.values()), return_exceptions=True)
+
+    async def run_until(t: float):
+        nonlocal next_tick, next_ff, ticks, due, transition, autotune_t
+        while min(next_tick, due) <= t:
+            if next_ff <= min(next_tick, due):
+                clock.t = next_ff
+                await runtime.refresh_feedforward()
+                next_ff += FEEDFORWARD_REFRESH
+                continue
+            if due <= next_tick:
+                clock.t = due
+                await runtime._on_schedule(schedule.current(max(wall(due), transition)), transition)
+                await deliver()
+                due, transition = next_transition(transition)
+                continue
+            clock.t = next_tick
+            if autotune_t is not None and next_tick >= autotune_t:
+                autotune_t = None
+                await runtime.start_autotune()
+            await runtime._loop(wall(next_tick))
+            await deliver()
+            ticks += 1
+            next_tick += runtime.interval
+
+    for t, entity_id, state, attributes in events:
+        await run_until(t - t0)
+        clock.t = t - t0
+        hass.states.set(entity_id, state, attributes, t)
+    await run_until(events[-1][0] - t0)
+    elapsed = time.perf_counter() - started
+
+    sim_hours = (events[-1][0] - t0) / 3600.0
+    calls = hass.services.calls
+    return {
+        "simulated_hours": sim_hours,
+        "wall_seconds": elapsed,
+        "sim_hours_per_wall_second": sim_hours / elapsed if elapsed else float("inf"),
+        "events": len(events),
+        "ticks": ticks,
+        "service_calls": len(calls),
+        "setpoints_sent": runtime.actuator.sent,
+        "setpoints_suppressed": runtime.actuator.suppressed,
+        "loop_latency": runtime.metrics["loop"].summary(),
+        "gains": {k: runtime.cfg[k] for k in ("kp", "ki", "kd")},
+        "calls": calls,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("stream")
+    parser.add_argument("--config", required=True)
+    parser.add_argument("--calls-out")
+    parser.add_argument("--autotune-at", type=float, help="start autotune after this many simulated hours")
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        data = {**DEFAULTS, **json.load(f)}
+    res = asyncio.run(replay(load_events(args.stream), data, args.autotune_at))
+    calls = res.pop("calls")
+    if args.calls_out:
+        with open(args.calls_out, "w") as f:
+            for t, domain, service, payload in calls:
+                f.write(json.dumps({"t": t, "domain": domain, "service": service, "data": payload}) + "\n")
+
+    if args.json:
+        print(json.dumps(res, indent=2))
+        return
+    print(f"simulated {res['simulated_hours']:.1f} h in {res['wall_seconds']:.3f} s "
+          f"({res['sim_hours_per_wall_second']:.0f} sim h / wall s)")
+    print(f"{res['events']} state events, {res['ticks']} loop ticks, {res['service_calls']} service calls "
+          f"({res['setpoints_sent']} setpoints sent, {res['setpoints_suppressed']} suppressed)")
+    lat = res["loop_latency"]
+    print(f"loop latency p50 {lat['p50_ms']} ms, p95 {lat['p95_ms']} ms, max {lat['max_ms']} ms")
+    print(f"final gains: {res['gains']}")
+
+
+if __name__ == "__main__":
+    main()
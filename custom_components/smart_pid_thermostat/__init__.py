@@ -3,36 +3,74 @@ import logging
 
 from homeassistant.core import HomeAssistant
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.const import Platform
+from homeassistant.helpers import config_validation as cv
 
-from .const import DOMAIN, PLATFORMS
-from .coordinator import ControllerRuntime
+from .const import DOMAIN, PLATFORMS, CONF_ENTRY_TYPE, CONF_FLEET_FILE, ENTRY_FLEET
+from .services import async_setup_services
 
 _LOGGER = logging.getLogger(__name__)
 
-async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
-    runtime = ControllerRuntime(hass, entry)
-    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = runtime
-    await runtime.start()
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+# The runtime modules (and NumPy behind the batch engine and MPC) are imported on first use,
+# so loading the integration without entries stays cheap.
+
+async def async_setup(hass: HomeAssistant, config: dict):
+    hass.data.setdefault(DOMAIN, {})
+    async_setup_services(hass)
+    return True
+
+def _platforms(owner) -> list[str]:
+    # fleets with the minimal entity set have no buttons
+    from .fleet import ENTITIES_FULL, FleetRuntime
 
-    await hass.config_entries.async_forward_entry_setups(entry, [Platform.SENSOR, Platform.SWITCH, Platform.NUMBER, Platform.BUTTON])
-    # Services
-    async def handle_start_autotune(call):
-        await runtime.start_autotune()
+    if isinstance(owner, FleetRuntime) and owner.entity_set != ENTITIES_FULL:
+        return [p for p in PLATFORMS if p != "button"]
+    return PLATFORMS
 
-    async def handle_stop_autotune(call):
-        res = await runtime.stop_autotune()
-        # Expose result to log; UI sensor also reflects applied values
-        _LOGGER.info("Auto-tune result: %s", res)
+async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry):
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_FLEET:
+        from .fleet import FleetRuntime
 
-    hass.services.async_register(DOMAIN, "start_autotune", handle_start_autotune)
-    hass.services.async_register(DOMAIN, "stop_autotune", handle_stop_autotune)
+        owner = FleetRuntime(hass, entry)
+        entry.async_on_unload(entry.add_update_listener(_async_fleet_updated))
+    else:
+        from .coordinator import ControllerRuntime
 
+        owner = ControllerRuntime(hass, entry)
+        entry.async_on_unload(entry.add_update_listener(_async_zone_updated))
+    hass.data.setdefault(DOMAIN, {})[entry.entry_id] = owner
+    await owner.start()
+    # unload exactly what was forwarded, whatever the owner looks like by then
+    owner.platforms = _platforms(owner)
+    await hass.config_entries.async_forward_entry_setups(entry, owner.platforms)
     return True
 
+async def _async_zone_updated(hass: HomeAssistant, entry: ConfigEntry):
+    # tuning options apply to the running zone; anything start() wired up needs a reload
+    runtime = hass.data[DOMAIN].get(entry.entry_id)
+    if runtime is not None and not runtime.options_updated():
+        await hass.config_entries.async_reload(entry.entry_id)
+
+async def _async_fleet_updated(hass: HomeAssistant, entry: ConfigEntry):
+    # zone option edits land in the entry options too; only a new file path needs a restart
+    fleet = hass.data[DOMAIN][entry.entry_id]
+    if fleet.path != hass.config.path({**entry.data, **entry.options}[CONF_FLEET_FILE]):
+        await hass.config_entries.async_reload(entry.entry_id)
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry):
-    runtime: ControllerRuntime = hass.data[DOMAIN].pop(entry.entry_id, None)
-    if runtime:
-        await runtime.stop()
-    unload_ok = await hass.config_entries.async_unload_platforms(entry, [Platform.SENSOR, Platform.SWITCH, Platform.NUMBER, Platform.BUTTON])
+    owner = hass.data[DOMAIN].pop(entry.entry_id, None)
+    if owner is None:
+        return True
+    await owner.stop()
+    unload_ok = await hass.config_entries.async_unload_platforms(entry, owner.platforms)
     return unload_ok
+
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry):
+    from .state_store import ControllerStateStore
+
+    store = await ControllerStateStore.async_get(hass)
+    if entry.data.get(CONF_ENTRY_TYPE) == ENTRY_FLEET:
+        store.remove_prefix(f"{entry.entry_id}_")
+    else:
+        store.remove(entry.entry_id)
@@ -0,0 +1,215 @@
+from __future__ import annotations
+import asyncio
+import logging
+import time
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_state_change_event
+
+from .const import DOMAIN
+from .metrics import LatencyHistogram
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_TEMP_STEP = 0.1
+CALL_TIMEOUT = 10.0      # seconds for one set_temperature call
+CONFIRM_TIMEOUT = 15.0   # seconds for the entity to report the new target
+MAX_RETRIES = 2
+BACKOFF = 2.0            # first retry delay in seconds, doubled per retry
+MAX_CONCURRENCY = 4      # calls in flight per zone
+
+
+class DeliveryStats:
+    """Per-climate delivery counters and end-to-end latency (call until confirmed)."""
+    def __init__(self):
+        self.latency = LatencyHistogram()
+        self.confirmed = 0
+        self.retries = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.unconfirmed = 0
+        self.failed = 0
+        self.last_error: str | None = None
+
+    def as_dict(self) -> dict:
+        return {
+            "latency": self.latency.summary(),
+            "confirmed": self.confirmed,
+            "retries": self.retries,
+            "timeouts": self.timeouts,
+            "errors": self.errors,
+            "unconfirmed": self.unconfirmed,
+            "failed": self.failed,
+            "last_error": self.last_error,
+        }
+
+
+class ClimateActuator:
+    """Sends climate.set_temperature to a set of climate entities.
+    Commands are rounded to each entity's `target_temp_step`, writes that would not change
+    the device are dropped, and changes closer together than `min_interval` seconds are
+    held back (the next loop iteration sends the latest value).
+    Each entity gets its own call, at most `max_concurrency` at a time, bounded by CALL_TIMEOUT,
+    and is confirmed by its reported target. Failed deliveries are retried with backoff, and a
+    command with a new value for the same entity supersedes one still in flight; the same value
+    leaves it running.
+    """
+    def __init__(self, hass: HomeAssistant, min_interval: float = 0.0, clock=time,
+                 max_concurrency: int = MAX_CONCURRENCY):
+        self.hass = hass
+        self.clock = clock
+        self.min_interval = float(min_interval)
+        self._last: dict[str, tuple[float, float]] = {}  # entity_id -> (temperature, monotonic time)
+        self._inflight: dict[str, asyncio.Task] = {}
+        self._inflight_value: dict[str, float] = {}
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.stats: dict[str, DeliveryStats] = {}
+        self.sent = 0
+        self.suppressed = 0
+        self.failed = 0
+
+    def _step(self, attrs) -> float:
+        try:
+            return float(attrs.get("target_temp_step") or DEFAULT_TEMP_STEP)
+        except (TypeError, ValueError):
+            return DEFAULT_TEMP_STEP
+
+    def _quantize(self, entity_id: str, temperature: float) -> float:
+        state = self.hass.states.get(entity_id)
+        attrs = state.attributes if state else {}
+        step = self._step(attrs)
+        value = round(temperature / step) * step
+        lo, hi = attrs.get("min_temp"), attrs.get("max_temp")
+        if lo is not None:
+            value = max(float(lo), value)
+        if hi is not None:
+            value = min(float(hi), value)
+        return round(value, 4)
+
+    def _device_target(self, entity_id: str):
+        state = self.hass.states.get(entity_id)
+        return state.attributes.get("temperature") if state else None
+
+    def _matches(self, entity_id: str, value: float) -> bool | None:
+        """Whether the entity reports `value` as its target; None if it reports no single target."""
+        state = self.hass.states.get(entity_id)
+        if state is None:
+            return False
+        target = state.attributes.get("temperature")
+        if target is None:
+            return None
+        try:
+            return abs(float(target) - value) <= self._step(state.attributes) / 2
+        except (TypeError, ValueError):
+            return None
+
+    async def async_set_temperature(self, entity_ids, temperature: float, force: bool = False):
+        """Send `temperature` to the entities that need it. `force` bypasses the rate limit.
+        Only dispatches: delivery, confirmation and retries run in background tasks, so a slow or
+        offline unit never holds up the control loop or a schedule transition.
+        """
+        now = self.clock.monotonic()
+        for entity_id in entity_ids:
+            value = self._quantize(entity_id, temperature)
+            previous = self._inflight.get(entity_id)
+            # retries to a dead unit outlast a loop tick; restarting them would never let the delivery fail
+            if previous is not None and self._inflight_value.get(entity_id) == value:
+                self.suppressed += 1
+                continue
+            last = self._last.get(entity_id)
+            if last is not None:
+                device = self._device_target(entity_id)
+                # no-op unless the device was changed behind our back
+                if last[0] == value and (device is None or device == value):
+                    self.suppressed += 1
+                    continue
+                if not force and now - last[1] < self.min_interval:
+                    self.suppressed += 1
+                    continue
+            if previous is not None:
+                previous.cancel()
+            self._last[entity_id] = (value, now)
+            self.sent += 1
+            # a background task: shutdown does not wait for retries to an offline unit
+            task = self._inflight[entity_id] = self.hass.async_create_background_task(
+                self._deliver(entity_id, value), f"{DOMAIN} set_temperature {entity_id}")
+            self._inflight_value[entity_id] = value
+            task.add_done_callback(lambda t, entity_id=entity_id: self._done(entity_id, t))
+
+    def _done(self, entity_id: str, task: asyncio.Task):
+        if self._inflight.get(entity_id) is task:
+            del self._inflight[entity_id]
+            del self._inflight_value[entity_id]
+
+    async def _deliver(self, entity_id: str, value: float) -> bool:
+        stats = self.stats.get(entity_id)
+        if stats is None:
+            stats = self.stats[entity_id] = DeliveryStats()
+        for attempt in range(MAX_RETRIES + 1):
+            if attempt:
+                stats.retries += 1
+                await asyncio.sleep(BACKOFF * 2 ** (attempt - 1))
+            t0 = time.perf_counter()
+            try:
+                async with self._semaphore:
+                    async with asyncio.timeout(CALL_TIMEOUT):
+                        await self.hass.services.async_call("climate", "set_temperature", {
+                            "entity_id": entity_id,
+                            "temperature": value
+                        }, blocking=True)
+                if await self._confirm(entity_id, value):
+                    stats.latency.record(time.perf_counter() - t0)
+                    stats.confirmed += 1
+                    return True
+                stats.unconfirmed += 1
+            except TimeoutError:
+                stats.timeouts += 1
+            except Exception as e:
+                stats.errors += 1
+                stats.last_error = str(e)
+            _LOGGER.debug("Setting %s to %s failed (attempt %d)", entity_id, value, attempt + 1)
+
+        stats.failed += 1
+        self.failed += 1
+        _LOGGER.warning("%s did not accept target %s after %d attempts", entity_id, value, MAX_RETRIES + 1)
+        # forget the value so the next loop iteration sends it again
+        if self._last.get(entity_id, (None,))[0] == value:
+            del self._last[entity_id]
+        return False
+
+    async def _confirm(self, entity_id: str, value: float) -> bool:
+        """Wait until the entity reports `value` (most integrations already have after a blocking call)."""
+        if self._matches(entity_id, value) is not False:
+            return True
+        confirmed = asyncio.get_running_loop().create_future()
+
+        @callback
+        def _changed(event):
+            if not confirmed.done() and self._matches(entity_id, value) is not False:
+                confirmed.set_result(True)
+
+        unsub = async_track_state_change_event(self.hass, [entity_id], _changed)
+        try:
+            # the state may have changed before the listener was attached
+            if self._matches(entity_id, value) is not False:
+                return True
+            async with asyncio.timeout(CONFIRM_TIMEOUT):
+                return await confirmed
+        except TimeoutError:
+            return False
+        finally:
+            unsub()
+
+    def seed(self, entity_ids, temperature: float):
+        """Assume `temperature` was already sent (e.g. restored after a restart)."""
+        for entity_id in entity_ids:
+            self._last[entity_id] = (self._quantize(entity_id, temperature), 0.0)
+
+    def invalidate(self):
+        self._last.clear()
+
+    def cancel(self):
+        for task in self._inflight.values():
+            task.cancel()
+        self._inflight.clear()
+        self._inflight_value.clear()
@@ -1,24 +1,68 @@
 from __future__ import annotations
+import math
 import time
+from collections import deque
+
+
+class _RunningWindow:
+    """Fixed-size ring buffer with O(1) running mean and variance."""
+    def __init__(self, size: int):
+        self.values = deque(maxlen=size)
+        self._sum = 0.0
+        self._sq = 0.0
+
+    def push(self, value: float):
+        if len(self.values) == self.values.maxlen:
+            old = self.values[0]
+            self._sum -= old
+            self._sq -= old * old
+        self.values.append(value)
+        self._sum += value
+        self._sq += value * value
+
+    @property
+    def full(self) -> bool:
+        return len(self.values) == self.values.maxlen
+
+    @property
+    def mean(self) -> float:
+        return self._sum / len(self.values) if self.values else 0.0
+
+    @property
+    def rel_spread(self) -> float:
+        # coefficient of variation; inf until there is something to compare
+        n = len(self.values)
+        if n < 2 or self.mean == 0:
+            return math.inf
+        var = max(0.0, self._sq / n - self.mean ** 2)
+        return math.sqrt(var) / abs(self.mean)
+
 
 class RelayAutoTuner:
     """Simple relay auto-tuner to estimate Ku/Tu for PID.
     This toggles an offset around target and measures oscillation period & amplitude.
     It's a lightweight approach suitable for HVAC with slow dynamics.
+    Period and amplitude are kept as running estimates over the last `measure_cycles`
+    cycles; once both vary by less than `tolerance` the tuner reports `converged`.
     """
-    def __init__(self, amplitude=0.5, settle_cycles=1, measure_cycles=3):
+    def __init__(self, amplitude=0.5, settle_cycles=1, measure_cycles=3, tolerance=0.1):
         self.amp = amplitude
         self.settle_cycles = settle_cycles
         self.measure_cycles = measure_cycles
+        self.tolerance = tolerance
         self.reset()
 
     def reset(self):
-        self.peaks = []
+        self.periods = _RunningWindow(self.measure_cycles)
+        self.amplitudes = _RunningWindow(self.measure_cycles)
         self.last_value = None
         self.state = 1  # 1 or -1
         self.last_switch_t = None
         self.cycle_count = 0
         self.running = False
+        self._last_half = None
+        self._last_half_peak = 0.0
+        self._half_peak = 0.0
 
     def start(self):
         self.reset()
@@ -27,11 +71,28 @@ class RelayAutoTuner:
     def stop(self):
         self.running = False
 
+    @property
+    def converged(self) -> bool:
+        return (
+            self.periods.full
+            and self.amplitudes.full
+            and self.periods.rel_spread <= self.tolerance
+            and self.amplitudes.rel_spread <= self.tolerance
+        )
+
+    @property
+    def phase(self) -> str:
+        if not self.running:
+            return "idle"
+        if self.cycle_count < self.settle_cycles:
+            return "settling"
+        return "converged" if self.converged else "measuring"
+
     def step(self, ambient_value: float, target: float, now: float | None = None):
         """Returns commanded target (target +/- amp) while running.
         This function should be called periodically with latest ambient_value.
         """
-        t = now or time.monotonic()
+        t = now if now is not None else time.monotonic()
         if not self.running:
             return target
 
@@ -43,44 +104,46 @@ class RelayAutoTuner:
 
         commanded = target + (self.state * self.amp)
 
-        # Detect peaks (zero-crossings derivative change). For simplicity we track sign changes
-        # of (ambient - target).
-        sign = 1 if (ambient_value - target) >= 0 else -1
+        # Track sign changes of (ambient - target); each one closes a half cycle
+        deviation = ambient_value - target
+        self._half_peak = max(self._half_peak, abs(deviation))
+        sign = 1 if deviation >= 0 else -1
         if self.last_value is not None:
             last_sign = 1 if (self.last_value - target) >= 0 else -1
             if sign != last_sign:
-                self.cycle_count += 0.5  # half cycle
-                self.peaks.append((t, ambient_value))
+                self._on_crossing(t)
         self.last_value = ambient_value
 
         return commanded
 
+    def _on_crossing(self, t: float):
+        if self.last_switch_t is not None:
+            half = t - self.last_switch_t
+            self.cycle_count += 0.5  # half cycle
+            if self.cycle_count > self.settle_cycles and half > 0:
+                # a full cycle is the last two half cycles; amplitude is half its peak-to-peak swing
+                if self._last_half is not None:
+                    self.periods.push(self._last_half + half)
+                    self.amplitudes.push((self._last_half_peak + self._half_peak) / 2)
+                self._last_half = half
+                self._last_half_peak = self._half_peak
+        self.last_switch_t = t
+        self._half_peak = 0.0
+
     def results(self):
-        """Estimate Ku and Tu from peak timings; then suggest PID via Ziegler–Nichols.
+        """Estimate Ku and Tu from the running period/amplitude; then suggest PID via Ziegler–Nichols.
         Returns dict or None if insufficient data.
         """
-        if len(self.peaks) < 4:
-            return None
-        # Estimate period Tu from time between every two peaks of same sign (~2 indices apart)
-        ts = [p[0] for p in self.peaks]
-        if len(ts) < 4:
+        if not self.periods.values or not self.amplitudes.values:
             return None
-        periods = []
-        for i in range(0, len(ts) - 2):
-            dt = ts[i+2] - ts[i]
-            if dt > 0:
-                periods.append(dt)
-        if not periods:
+        Tu = self.periods.mean
+        if Tu <= 0:
             return None
-        Tu = sum(periods) / len(periods)
 
         # Ultimate gain Ku approximated via describing function of relay ~ (4 * amplitude)/(pi * A)
-        # Here A ~ average peak amplitude over target
-        amps = [abs(p[1]) for p in self.peaks]
-        if not amps:
-            return None
-        A = max(1e-6, (sum(amps) / len(amps)))
-        Ku = (4 * self.amp) / (3.14159 * A)
+        # Here A ~ average oscillation amplitude around target
+        A = max(1e-6, self.amplitudes.mean)
+        Ku = (4 * self.amp) / (math.pi * A)
 
         # ZN classic rules:
         Kp = 0.6 * Ku
@@ -0,0 +1,129 @@
+from __future__ import annotations
+import time
+
+import numpy as np
+
+
+class BatchPIDController:
+    """Vectorized PIDController for many loops at once.
+    Every slot behaves exactly like an independent PIDController, but gains and state
+    live in contiguous float64 arrays so a single update() advances all loops.
+    """
+    def __init__(self, size: int = 8):
+        size = max(1, int(size))
+        self.kp = np.zeros(size)
+        self.ki = np.zeros(size)
+        self.kd = np.zeros(size)
+        self.out_min = np.full(size, -np.inf)
+        self.out_max = np.full(size, np.inf)
+        self.nominal_dt = np.ones(size)
+        self.max_dt = np.full(size, np.inf)
+        self._i = np.zeros(size)
+        # NaN marks "no previous sample" (None in PIDController)
+        self._last_error = np.full(size, np.nan)
+        self._last_t = np.full(size, np.nan)
+        # terms of each slot's last update, for telemetry
+        self.p_term = np.zeros(size)
+        self.d_term = np.zeros(size)
+        self._free = list(range(size - 1, -1, -1))
+
+    @property
+    def size(self) -> int:
+        return self.kp.shape[0]
+
+    def _grow(self):
+        old = self.size
+        new = old * 2
+        for name, fill in (("kp", 0.0), ("ki", 0.0), ("kd", 0.0), ("out_min", -np.inf), ("out_max", np.inf),
+                           ("nominal_dt", 1.0), ("max_dt", np.inf),
+                           ("_i", 0.0), ("_last_error", np.nan), ("_last_t", np.nan),
+                           ("p_term", 0.0), ("d_term", 0.0)):
+            arr = np.full(new, fill)
+            arr[:old] = getattr(self, name)
+            setattr(self, name, arr)
+        self._free.extend(range(new - 1, old - 1, -1))
+
+    def add(self, kp: float, ki: float, kd: float, out_min=None, out_max=None) -> int:
+        """Allocate a slot for a new loop and return its index."""
+        if not self._free:
+            self._grow()
+        slot = self._free.pop()
+        self.set_gains(slot, kp, ki, kd)
+        self.set_limits(slot, out_min, out_max)
+        self.set_timing(slot)
+        self.reset(slot)
+        return slot
+
+    def remove(self, slot: int):
+        self.reset(slot)
+        self._free.append(slot)
+
+    def set_gains(self, slot: int, kp: float, ki: float, kd: float, bumpless: bool = False):
+        """Same as PIDController.set_gains for one slot (bumpless is off by default here)."""
+        last_e = self._last_error[slot]
+        if bumpless and not np.isnan(last_e):
+            self._i[slot] += (self.kp[slot] - float(kp)) * last_e
+        self.kp[slot] = float(kp)
+        self.ki[slot] = float(ki)
+        self.kd[slot] = float(kd)
+
+    def set_limits(self, slot: int, out_min=None, out_max=None):
+        self.out_min[slot] = -np.inf if out_min is None else float(out_min)
+        self.out_max[slot] = np.inf if out_max is None else float(out_max)
+
+    def set_timing(self, slot: int, nominal_dt: float = 1.0, max_dt: float | None = None):
+        self.nominal_dt[slot] = float(nominal_dt)
+        self.max_dt[slot] = np.inf if max_dt is None else float(max_dt)
+
+    def reset(self, slot: int | None = None):
+        idx = slice(None) if slot is None else slot
+        self._i[idx] = 0.0
+        self._last_error[idx] = np.nan
+        self._last_t[idx] = np.nan
+        self.p_term[idx] = 0.0
+        self.d_term[idx] = 0.0
+
+    def state(self, slot: int) -> tuple:
+        """Same layout as PIDController.state() for one slot."""
+        last_e, last_t = self._last_error[slot], self._last_t[slot]
+        return (
+            float(self._i[slot]),
+            None if np.isnan(last_e) else float(last_e),
+            None if np.isnan(last_t) else float(last_t),
+        )
+
+    def load_state(self, slot: int, i: float, last_error: float | None, last_t: float | None):
+        self._i[slot] = float(i)
+        self._last_error[slot] = np.nan if last_error is None else last_error
+        self._last_t[slot] = np.nan if last_t is None else last_t
+
+    def update(self, errors, now: float | None = None, slots=None) -> np.ndarray:
+        """Advance the loops in `slots` (all slots if None) with the matching `errors`.
+        Returns the clamped outputs in the same order as `errors`.
+        """
+        t = now if now is not None else time.monotonic()
+        e = np.asarray(errors, dtype=float)
+        idx = np.arange(self.size) if slots is None else np.asarray(slots, dtype=np.intp)
+
+        last_t = self._last_t[idx]
+        dt = np.where(np.isnan(last_t), self.nominal_dt[idx],
+                      np.minimum(np.maximum(1e-3, t - last_t), self.max_dt[idx]))
+        self._last_t[idx] = t
+
+        # P
+        p = self.kp[idx] * e
+
+        # I
+        i = self._i[idx] + self.ki[idx] * e * dt
+        self._i[idx] = i
+
+        # D
+        last_e = self._last_error[idx]
+        d = np.where(np.isnan(last_e), 0.0, self.kd[idx] * (e - last_e) / dt)
+        self._last_error[idx] = e
+        self.p_term[idx] = p
+        self.d_term[idx] = d
+
+        # clamp in the same order as PIDController (min first, then max)
+        out = np.maximum(p + i + d, self.out_min[idx])
+        return np.minimum(out, self.out_max[idx])
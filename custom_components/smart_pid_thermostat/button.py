@@ -8,7 +8,12 @@ from homeassistant.helpers.entity import DeviceInfo
 from .const import DOMAIN
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
-    async_add_entities([AutotuneStartButton(hass, entry), AutotuneStopButton(hass, entry)], True)
+    from .fleet import add_zone_entities
+
+    add_zone_entities(hass, entry, async_add_entities, _build)
+
+def _build(hass: HomeAssistant, entry: ConfigEntry, full: bool) -> list:
+    return [AutotuneStartButton(hass, entry), AutotuneStopButton(hass, entry)] if full else []
 
 class AutotuneStartButton(ButtonEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
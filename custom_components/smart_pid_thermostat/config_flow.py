@@ -8,6 +8,7 @@ from homeassistant.helpers.selector import (
     EntitySelectorConfig,
     NumberSelector,
     NumberSelectorConfig,
+    ObjectSelector,
     SelectSelector,
     SelectSelectorConfig,
     SelectOptionDict,
@@ -19,6 +20,10 @@ from .const import (
     DOMAIN,
     DEFAULTS,
     CONF_NAME,
+    CONF_ENTRY_TYPE,
+    ENTRY_ZONE,
+    ENTRY_FLEET,
+    CONF_FLEET_FILE,
     CONF_CLIMATES,
     CONF_SENSOR,
     CONF_TARGET,
@@ -26,6 +31,29 @@ from .const import (
     CONF_MAX_TEMP,
     CONF_DEADBAND,
     CONF_MODE,
+    CONF_ENGINE,
+    ENGINE_SCALAR,
+    ENGINE_BATCH,
+    CONF_CONTROLLER,
+    CONTROLLER_PID,
+    CONTROLLER_MPC,
+    CONF_MPC_HORIZON,
+    CONF_MPC_MOVE_PENALTY,
+    CONF_TRIGGER,
+    TRIGGER_INTERVAL,
+    TRIGGER_EVENT,
+    CONF_MIN_INTERVAL,
+    CONF_MAX_STALENESS,
+    CONF_MIN_COMMAND_INTERVAL,
+    CONF_FILTER,
+    CONF_FILTER_WINDOW,
+    CONF_SENSOR_MAX_AGE,
+    CONF_OUTLIER_THRESHOLD,
+    CONF_STATE_MAX_AGE,
+    CONF_STATUS_INTERVAL,
+    CONF_ADAPTIVE_INTERVAL,
+    CONF_INTERVAL_MIN,
+    CONF_INTERVAL_MAX,
     CONF_KP,
     CONF_KI,
     CONF_KD,
@@ -36,6 +64,14 @@ from .const import (
     CONF_RESTORE_TIME,
     CONF_RESTORE_TEMP,
     CONF_RESTORE_FAN,
+    CONF_SCHEDULE,
+    CONF_GAIN_SCHEDULE,
+    CONF_OPTIMAL_START,
+    CONF_OUTDOOR_SENSOR,
+    CONF_MAX_LEAD,
+    CONF_FEEDFORWARD,
+    CONF_FF_GAIN,
+    CONF_FF_LEAD,
 )
 
 
@@ -45,12 +81,38 @@ class SmartPIDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
     VERSION = 1
 
     async def async_step_user(self, user_input=None):
+        return self.async_show_menu(
+            step_id="user",
+            menu_options={ENTRY_ZONE: "Single zone", ENTRY_FLEET: "Fleet (zones from a file)"},
+        )
+
+    async def async_step_fleet(self, user_input=None):
+        errors = {}
+        if user_input is not None:
+            errors = await _validate_fleet_file(self.hass, user_input[CONF_FLEET_FILE])
+            if not errors:
+                return self.async_create_entry(
+                    title=user_input[CONF_NAME],
+                    data={**user_input, CONF_ENTRY_TYPE: ENTRY_FLEET},
+                )
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_NAME, default="Smart PID Fleet"): TextSelector(TextSelectorConfig()),
+                vol.Required(CONF_FLEET_FILE, default="smart_pid_fleet.yaml"): TextSelector(TextSelectorConfig()),
+            }
+        )
+        return self.async_show_form(step_id="fleet", data_schema=schema, errors=errors)
+
+    async def async_step_zone(self, user_input=None):
         errors = {}
         if user_input is not None:
             # Convert setback_enabled from string to boolean if needed
             user_input[CONF_SETBACK_ENABLED] = (
                 True if user_input[CONF_SETBACK_ENABLED] == "true" else False
             )
+            user_input[CONF_OPTIMAL_START] = user_input.get(CONF_OPTIMAL_START) == "true"
+            user_input[CONF_FEEDFORWARD] = user_input.get(CONF_FEEDFORWARD) == "true"
+            user_input[CONF_ADAPTIVE_INTERVAL] = user_input.get(CONF_ADAPTIVE_INTERVAL) == "true"
             return self.async_create_entry(
                 title=user_input.get(CONF_NAME, "Smart PID Controller"),
                 data=user_input,
@@ -65,7 +127,7 @@ class SmartPIDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                     EntitySelectorConfig(domain=["climate"], multiple=True)
                 ),
                 vol.Required(CONF_SENSOR): EntitySelector(
-                    EntitySelectorConfig(domain=["sensor"], multiple=False)
+                    EntitySelectorConfig(domain=["sensor"], multiple=True)
                 ),
                 vol.Required(CONF_TARGET, default=DEFAULTS[CONF_TARGET]): NumberSelector(
                     NumberSelectorConfig(min=5, max=35, step=0.1, mode="box")
@@ -100,6 +162,84 @@ class SmartPIDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                 vol.Required(CONF_INTERVAL, default=DEFAULTS[CONF_INTERVAL]): NumberSelector(
                     NumberSelectorConfig(min=15, max=900, step=5, mode="slider")
                 ),
+                vol.Required(CONF_ENGINE, default=DEFAULTS[CONF_ENGINE]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=ENGINE_SCALAR, label="Per-zone"),
+                            SelectOptionDict(value=ENGINE_BATCH, label="Shared batch engine"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_CONTROLLER, default=DEFAULTS[CONF_CONTROLLER]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=CONTROLLER_PID, label="PID"),
+                            SelectOptionDict(value=CONTROLLER_MPC, label="Model predictive (needs an identified model)"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_MPC_HORIZON, default=DEFAULTS[CONF_MPC_HORIZON]): NumberSelector(
+                    NumberSelectorConfig(min=5, max=240, step=1, mode="box")
+                ),
+                vol.Required(CONF_MPC_MOVE_PENALTY, default=DEFAULTS[CONF_MPC_MOVE_PENALTY]): NumberSelector(
+                    NumberSelectorConfig(min=0.01, max=100, step=0.01, mode="box")
+                ),
+                vol.Required(CONF_TRIGGER, default=DEFAULTS[CONF_TRIGGER]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=TRIGGER_INTERVAL, label="Fixed interval"),
+                            SelectOptionDict(value=TRIGGER_EVENT, label="On sensor change"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_MIN_INTERVAL, default=DEFAULTS[CONF_MIN_INTERVAL]): NumberSelector(
+                    NumberSelectorConfig(min=1, max=900, step=1, mode="box")
+                ),
+                vol.Required(CONF_MAX_STALENESS, default=DEFAULTS[CONF_MAX_STALENESS]): NumberSelector(
+                    NumberSelectorConfig(min=15, max=3600, step=5, mode="box")
+                ),
+                vol.Required(CONF_MIN_COMMAND_INTERVAL, default=DEFAULTS[CONF_MIN_COMMAND_INTERVAL]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=3600, step=5, mode="box")
+                ),
+                vol.Required(CONF_FILTER, default=DEFAULTS[CONF_FILTER]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value="none", label="None"),
+                            SelectOptionDict(value="ewma", label="Moving average (EWMA)"),
+                            SelectOptionDict(value="median", label="Sliding median"),
+                            SelectOptionDict(value="kalman", label="Kalman"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_FILTER_WINDOW, default=DEFAULTS[CONF_FILTER_WINDOW]): NumberSelector(
+                    NumberSelectorConfig(min=1, max=60, step=1, mode="box")
+                ),
+                vol.Required(CONF_SENSOR_MAX_AGE, default=DEFAULTS[CONF_SENSOR_MAX_AGE]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=86400, step=60, mode="box")
+                ),
+                vol.Required(CONF_OUTLIER_THRESHOLD, default=DEFAULTS[CONF_OUTLIER_THRESHOLD]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=10, step=0.1, mode="box")
+                ),
+                vol.Required(CONF_STATE_MAX_AGE, default=DEFAULTS[CONF_STATE_MAX_AGE]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=604800, step=60, mode="box")
+                ),
+                vol.Required(CONF_STATUS_INTERVAL, default=DEFAULTS[CONF_STATUS_INTERVAL]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=3600, step=1, mode="box")
+                ),
+                vol.Required(CONF_ADAPTIVE_INTERVAL, default="false"): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value="true", label="Enabled"),
+                            SelectOptionDict(value="false", label="Disabled"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_INTERVAL_MIN, default=DEFAULTS[CONF_INTERVAL_MIN]): NumberSelector(
+                    NumberSelectorConfig(min=5, max=900, step=5, mode="box")
+                ),
+                vol.Required(CONF_INTERVAL_MAX, default=DEFAULTS[CONF_INTERVAL_MAX]): NumberSelector(
+                    NumberSelectorConfig(min=15, max=3600, step=15, mode="box")
+                ),
                 vol.Required(CONF_SETBACK_ENABLED, default="true"): SelectSelector(
                     SelectSelectorConfig(
                         options=[
@@ -129,9 +269,37 @@ class SmartPIDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
                         ]
                     )
                 ),
+                vol.Required(CONF_OPTIMAL_START, default="false"): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value="true", label="Enabled"),
+                            SelectOptionDict(value="false", label="Disabled"),
+                        ]
+                    )
+                ),
+                vol.Optional(CONF_OUTDOOR_SENSOR, description={"suggested_value": None}): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor", "weather"])
+                ),
+                vol.Required(CONF_MAX_LEAD, default=DEFAULTS[CONF_MAX_LEAD]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=43200, step=300, mode="box")
+                ),
+                vol.Required(CONF_FEEDFORWARD, default="false"): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value="true", label="Enabled"),
+                            SelectOptionDict(value="false", label="Disabled"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_FF_GAIN, default=DEFAULTS[CONF_FF_GAIN]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=1, step=0.01, mode="box")
+                ),
+                vol.Required(CONF_FF_LEAD, default=DEFAULTS[CONF_FF_LEAD]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=43200, step=300, mode="box")
+                ),
             }
         )
-        return self.async_show_form(step_id="user", data_schema=schema, errors=errors)
+        return self.async_show_form(step_id="zone", data_schema=schema, errors=errors)
 
     @staticmethod
     @callback
@@ -139,6 +307,16 @@ class SmartPIDConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
         return OptionsFlowHandler(config_entry)
 
 
+async def _validate_fleet_file(hass, path: str) -> dict:
+    from .fleet import load_fleet_file
+
+    try:
+        await hass.async_add_executor_job(load_fleet_file, hass.config.path(path))
+    except (OSError, ValueError):
+        return {CONF_FLEET_FILE: "invalid_fleet_file"}
+    return {}
+
+
 class OptionsFlowHandler(config_entries.OptionsFlow):
     """Handle options for Smart PID Thermostat."""
 
@@ -146,14 +324,35 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
         self.config_entry = config_entry
 
     async def async_step_init(self, user_input=None):
+        if self.config_entry.data.get(CONF_ENTRY_TYPE) == ENTRY_FLEET:
+            return await self.async_step_fleet(user_input)
+        errors = {}
         if user_input is not None:
             # convert string to bool if needed
             user_input[CONF_SETBACK_ENABLED] = (
                 True if user_input[CONF_SETBACK_ENABLED] == "true" else False
             )
-            return self.async_create_entry(title="", data=user_input)
+            user_input[CONF_OPTIMAL_START] = user_input.get(CONF_OPTIMAL_START) == "true"
+            user_input[CONF_FEEDFORWARD] = user_input.get(CONF_FEEDFORWARD) == "true"
+            user_input[CONF_ADAPTIVE_INTERVAL] = user_input.get(CONF_ADAPTIVE_INTERVAL) == "true"
+            # a cleared entity field is omitted from the input, not sent empty
+            user_input.setdefault(CONF_OUTDOOR_SENSOR, None)
+            from .schedule import WeeklySchedule
+            from .gain_schedule import GainSchedule
+
+            try:
+                WeeklySchedule.from_rules(user_input.get(CONF_SCHEDULE))
+            except ValueError:
+                errors[CONF_SCHEDULE] = "invalid_schedule"
+            try:
+                GainSchedule.from_config(user_input.get(CONF_GAIN_SCHEDULE))
+            except ValueError:
+                errors[CONF_GAIN_SCHEDULE] = "invalid_gain_schedule"
+            if not errors:
+                # keep options that are not on this form (e.g. an identified model)
+                return self.async_create_entry(title="", data={**self.config_entry.options, **user_input})
 
-        cfg = {**DEFAULTS, **self.config_entry.data, **self.config_entry.options}
+        cfg = {**DEFAULTS, **self.config_entry.data, **self.config_entry.options, **(user_input or {})}
 
         schema = vol.Schema(
             {
@@ -181,6 +380,84 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                 vol.Required(CONF_INTERVAL, default=cfg[CONF_INTERVAL]): NumberSelector(
                     NumberSelectorConfig(min=15, max=900, step=5, mode="slider")
                 ),
+                vol.Required(CONF_ENGINE, default=cfg[CONF_ENGINE]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=ENGINE_SCALAR, label="Per-zone"),
+                            SelectOptionDict(value=ENGINE_BATCH, label="Shared batch engine"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_CONTROLLER, default=cfg[CONF_CONTROLLER]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=CONTROLLER_PID, label="PID"),
+                            SelectOptionDict(value=CONTROLLER_MPC, label="Model predictive (needs an identified model)"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_MPC_HORIZON, default=cfg[CONF_MPC_HORIZON]): NumberSelector(
+                    NumberSelectorConfig(min=5, max=240, step=1, mode="box")
+                ),
+                vol.Required(CONF_MPC_MOVE_PENALTY, default=cfg[CONF_MPC_MOVE_PENALTY]): NumberSelector(
+                    NumberSelectorConfig(min=0.01, max=100, step=0.01, mode="box")
+                ),
+                vol.Required(CONF_TRIGGER, default=cfg[CONF_TRIGGER]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value=TRIGGER_INTERVAL, label="Fixed interval"),
+                            SelectOptionDict(value=TRIGGER_EVENT, label="On sensor change"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_MIN_INTERVAL, default=cfg[CONF_MIN_INTERVAL]): NumberSelector(
+                    NumberSelectorConfig(min=1, max=900, step=1, mode="box")
+                ),
+                vol.Required(CONF_MAX_STALENESS, default=cfg[CONF_MAX_STALENESS]): NumberSelector(
+                    NumberSelectorConfig(min=15, max=3600, step=5, mode="box")
+                ),
+                vol.Required(CONF_MIN_COMMAND_INTERVAL, default=cfg[CONF_MIN_COMMAND_INTERVAL]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=3600, step=5, mode="box")
+                ),
+                vol.Required(CONF_FILTER, default=cfg[CONF_FILTER]): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value="none", label="None"),
+                            SelectOptionDict(value="ewma", label="Moving average (EWMA)"),
+                            SelectOptionDict(value="median", label="Sliding median"),
+                            SelectOptionDict(value="kalman", label="Kalman"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_FILTER_WINDOW, default=cfg[CONF_FILTER_WINDOW]): NumberSelector(
+                    NumberSelectorConfig(min=1, max=60, step=1, mode="box")
+                ),
+                vol.Required(CONF_SENSOR_MAX_AGE, default=cfg[CONF_SENSOR_MAX_AGE]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=86400, step=60, mode="box")
+                ),
+                vol.Required(CONF_OUTLIER_THRESHOLD, default=cfg[CONF_OUTLIER_THRESHOLD]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=10, step=0.1, mode="box")
+                ),
+                vol.Required(CONF_STATE_MAX_AGE, default=cfg[CONF_STATE_MAX_AGE]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=604800, step=60, mode="box")
+                ),
+                vol.Required(CONF_STATUS_INTERVAL, default=cfg[CONF_STATUS_INTERVAL]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=3600, step=1, mode="box")
+                ),
+                vol.Required(CONF_ADAPTIVE_INTERVAL, default="true" if cfg[CONF_ADAPTIVE_INTERVAL] else "false"): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value="true", label="Enabled"),
+                            SelectOptionDict(value="false", label="Disabled"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_INTERVAL_MIN, default=cfg[CONF_INTERVAL_MIN]): NumberSelector(
+                    NumberSelectorConfig(min=5, max=900, step=5, mode="box")
+                ),
+                vol.Required(CONF_INTERVAL_MAX, default=cfg[CONF_INTERVAL_MAX]): NumberSelector(
+                    NumberSelectorConfig(min=15, max=3600, step=15, mode="box")
+                ),
                 vol.Required(CONF_SETBACK_ENABLED, default="true" if cfg[CONF_SETBACK_ENABLED] else "false"): SelectSelector(
                     SelectSelectorConfig(
                         options=[
@@ -210,6 +487,51 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                         ]
                     )
                 ),
+                vol.Required(CONF_OPTIMAL_START, default="true" if cfg[CONF_OPTIMAL_START] else "false"): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value="true", label="Enabled"),
+                            SelectOptionDict(value="false", label="Disabled"),
+                        ]
+                    )
+                ),
+                vol.Optional(CONF_OUTDOOR_SENSOR, description={"suggested_value": cfg[CONF_OUTDOOR_SENSOR]}): EntitySelector(
+                    EntitySelectorConfig(domain=["sensor", "weather"])
+                ),
+                vol.Required(CONF_MAX_LEAD, default=cfg[CONF_MAX_LEAD]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=43200, step=300, mode="box")
+                ),
+                vol.Required(CONF_FEEDFORWARD, default="true" if cfg[CONF_FEEDFORWARD] else "false"): SelectSelector(
+                    SelectSelectorConfig(
+                        options=[
+                            SelectOptionDict(value="true", label="Enabled"),
+                            SelectOptionDict(value="false", label="Disabled"),
+                        ]
+                    )
+                ),
+                vol.Required(CONF_FF_GAIN, default=cfg[CONF_FF_GAIN]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=1, step=0.01, mode="box")
+                ),
+                vol.Required(CONF_FF_LEAD, default=cfg[CONF_FF_LEAD]): NumberSelector(
+                    NumberSelectorConfig(min=0, max=43200, step=300, mode="box")
+                ),
+                vol.Optional(CONF_SCHEDULE, default=cfg[CONF_SCHEDULE]): ObjectSelector(),
+                vol.Optional(CONF_GAIN_SCHEDULE, default=cfg[CONF_GAIN_SCHEDULE]): ObjectSelector(),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=schema, errors=errors)
+
+    async def async_step_fleet(self, user_input=None):
+        errors = {}
+        cfg = {**self.config_entry.data, **self.config_entry.options}
+        if user_input is not None:
+            errors = await _validate_fleet_file(self.hass, user_input[CONF_FLEET_FILE])
+            if not errors:
+                # keep the zones' option edits
+                return self.async_create_entry(title="", data={**self.config_entry.options, **user_input})
+        schema = vol.Schema(
+            {
+                vol.Required(CONF_FLEET_FILE, default=cfg[CONF_FLEET_FILE]): TextSelector(TextSelectorConfig()),
             }
         )
-        return self.async_show_form(step_id="init", data_schema=schema)
+        return self.async_show_form(step_id="fleet", data_schema=schema, errors=errors)
@@ -3,7 +3,7 @@ DOMAIN = "smart_pid_thermostat"
 # Config entry keys
 CONF_NAME = "name"
 CONF_CLIMATES = "climates"
-CONF_SENSOR = "sensor"
+CONF_SENSOR = "sensor"  # one entity id or a list of them
 CONF_TARGET = "target_temperature"
 CONF_KP = "kp"
 CONF_KI = "ki"
@@ -13,6 +13,44 @@ CONF_MAX_TEMP = "max_temp"
 CONF_INTERVAL = "update_interval"
 CONF_DEADBAND = "deadband"
 CONF_MODE = "mode"  # "auto", "heat", "cool"
+CONF_GAIN_SCHEDULE = "gain_schedule"  # gain tables per mode; kp/ki/kd apply where none matches
+CONF_ENGINE = "engine"  # "scalar", "batch"
+CONF_TRIGGER = "trigger"  # "interval", "event"
+CONF_MIN_INTERVAL = "min_interval"      # event trigger: seconds between runs
+CONF_MAX_STALENESS = "max_staleness"    # event trigger: run at least this often
+CONF_MIN_COMMAND_INTERVAL = "min_command_interval"  # seconds between setpoint changes per climate
+CONF_TELEMETRY_SIZE = "telemetry_size"  # control-loop samples kept per zone
+CONF_STATE_MAX_AGE = "state_max_age"    # seconds; older persisted controller state is discarded
+CONF_STATUS_INTERVAL = "status_interval"  # minimum seconds between status sensor updates
+CONF_ADAPTIVE_INTERVAL = "adaptive_interval"  # vary the loop interval with the error
+CONF_INTERVAL_MIN = "interval_min"          # seconds; fastest adaptive interval
+CONF_INTERVAL_MAX = "interval_max"          # seconds; slowest adaptive interval (settled zone)
+
+# Sensor fusion / filtering of the process variable
+CONF_FILTER = "filter"                        # "none", "ewma", "median", "kalman"
+CONF_FILTER_WINDOW = "filter_window"          # samples the filter smooths over
+CONF_SENSOR_MAX_AGE = "sensor_max_age"        # seconds; older readings are ignored (0 = off)
+CONF_OUTLIER_THRESHOLD = "outlier_threshold"  # degC from consensus; 0 = off
+
+ENGINE_SCALAR = "scalar"
+ENGINE_BATCH = "batch"
+
+TRIGGER_INTERVAL = "interval"
+TRIGGER_EVENT = "event"
+
+# Entry type: one zone configured in the UI, or a fleet of zones defined in a YAML/JSON file
+CONF_ENTRY_TYPE = "entry_type"
+ENTRY_ZONE = "zone"
+ENTRY_FLEET = "fleet"
+CONF_FLEET_FILE = "fleet_file"            # path, relative to the config directory
+CONF_ZONES = "zones"                      # fleet entry options: {zone id: option edits}
+
+# Controller
+CONF_CONTROLLER = "controller"
+CONTROLLER_PID = "pid"
+CONTROLLER_MPC = "mpc"                    # needs an identified model (model_* options)
+CONF_MPC_HORIZON = "mpc_horizon"          # prediction steps after the dead time
+CONF_MPC_MOVE_PENALTY = "mpc_move_penalty"  # weight of setpoint changes against tracking error
 
 # Night setback / restore
 CONF_SETBACK_ENABLED = "setback_enabled"
@@ -21,6 +59,34 @@ CONF_SETBACK_TEMP = "setback_temp"        # 18
 CONF_RESTORE_TIME = "restore_time"        # "06:30:00"
 CONF_RESTORE_TEMP = "restore_temp"        # 23
 CONF_RESTORE_FAN = "restore_fan"          # "auto", "low", "quiet"
+CONF_SCHEDULE = "schedule"                # weekly rules; replaces setback/restore when set
+CONF_OPTIMAL_START = "optimal_start"      # start schedule transitions early, learned per zone
+CONF_OUTDOOR_SENSOR = "outdoor_sensor"    # optional outdoor temperature (optimal start, gain schedule)
+CONF_MAX_LEAD = "max_lead"                # seconds; longest optimal-start lead
+CONF_FEEDFORWARD = "feedforward"          # setpoint offset from the outdoor forecast or sensor
+CONF_FF_GAIN = "ff_gain"                  # degC setpoint per degC of target - outdoor
+CONF_FF_LEAD = "ff_lead"                  # seconds the forecast is read ahead
+
+# Identified plant model (first order plus dead time), written by the identify service
+CONF_MODEL_GAIN = "model_gain"            # degC ambient per degC setpoint
+CONF_MODEL_TAU = "model_tau"              # seconds
+CONF_MODEL_DEAD_TIME = "model_dead_time"  # seconds
+
+# Options a running zone applies in place; saving any other option reloads the entry
+LIVE_OPTIONS = frozenset({
+    CONF_TARGET, CONF_KP, CONF_KI, CONF_KD, CONF_MIN_TEMP, CONF_MAX_TEMP, CONF_DEADBAND, CONF_MODE,
+    CONF_GAIN_SCHEDULE, CONF_MIN_COMMAND_INTERVAL, CONF_STATUS_INTERVAL, CONF_FF_GAIN, CONF_FF_LEAD,
+    CONF_MPC_HORIZON, CONF_MPC_MOVE_PENALTY, CONF_MODEL_GAIN, CONF_MODEL_TAU, CONF_MODEL_DEAD_TIME,
+})
+
+# Default query for SQLite exports: timestamp, ambient, setpoint ordered by time
+DEFAULT_SYSID_QUERY = "SELECT ts, ambient, setpoint FROM samples ORDER BY ts"
+
+# Seconds between refreshes of the feedforward outdoor profile
+FEEDFORWARD_REFRESH = 1800.0
+
+# Seconds to collect option edits from number entities before writing the config entry
+OPTIONS_WRITE_DELAY = 2.0
 
 DEFAULTS = {
     CONF_NAME: "Smart PID Controller",
@@ -33,13 +99,49 @@ DEFAULTS = {
     CONF_INTERVAL: 60,  # seconds
     CONF_DEADBAND: 0.3,
     CONF_MODE: "auto",
+    CONF_GAIN_SCHEDULE: {},
+    CONF_ENGINE: ENGINE_SCALAR,
+    CONF_CONTROLLER: CONTROLLER_PID,
+    CONF_MPC_HORIZON: 60,
+    CONF_MPC_MOVE_PENALTY: 10.0,
+    CONF_TRIGGER: TRIGGER_INTERVAL,
+    CONF_MIN_INTERVAL: 10,
+    CONF_MAX_STALENESS: 300,
+    CONF_MIN_COMMAND_INTERVAL: 0,
+    CONF_TELEMETRY_SIZE: 4096,
+    CONF_STATE_MAX_AGE: 3600,
+    CONF_STATUS_INTERVAL: 10,
+    CONF_ADAPTIVE_INTERVAL: False,
+    CONF_INTERVAL_MIN: 15,
+    CONF_INTERVAL_MAX: 600,
+    CONF_FILTER: "none",
+    CONF_FILTER_WINDOW: 5,
+    CONF_SENSOR_MAX_AGE: 0,
+    CONF_OUTLIER_THRESHOLD: 3.0,
     CONF_SETBACK_ENABLED: True,
     CONF_SETBACK_TIME: "23:00:00",
     CONF_SETBACK_TEMP: 18.0,
     CONF_RESTORE_TIME: "06:30:00",
     CONF_RESTORE_TEMP: 23.0,
     CONF_RESTORE_FAN: "low",
+    CONF_SCHEDULE: [],
+    CONF_OPTIMAL_START: False,
+    CONF_OUTDOOR_SENSOR: None,
+    CONF_MAX_LEAD: 10800,
+    CONF_FEEDFORWARD: False,
+    CONF_FF_GAIN: 0.1,
+    CONF_FF_LEAD: 3600,
 }
 
+# hass.data keys shared by all entries
+DATA_BATCH_ENGINE = f"{DOMAIN}_batch_engine"
+DATA_SCHEDULER = f"{DOMAIN}_scheduler"
+DATA_STATE_STORE = f"{DOMAIN}_state_store"
+DATA_SCHEDULE_ENGINE = f"{DOMAIN}_schedule_engine"
+DATA_PROFILER = f"{DOMAIN}_profiler"
+
+# Dispatcher signal sent by a runtime when its status changed; format with entry_id
+SIGNAL_STATUS = f"{DOMAIN}_status_{{}}"
+
 # Platforms we expose (we'll provide number/switch/button/sensor for UI control)
 PLATFORMS = ["number", "switch", "button", "sensor"]
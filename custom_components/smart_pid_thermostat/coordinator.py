@@ -1,118 +1,663 @@
 from __future__ import annotations
+import asyncio
 import logging
-from datetime import timedelta, datetime, time as dtime
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING
 
 from homeassistant.core import HomeAssistant, callback
-from homeassistant.const import STATE_UNAVAILABLE
-from homeassistant.helpers.event import async_track_time_interval, async_track_time_change
+from homeassistant.exceptions import HomeAssistantError
+from homeassistant.util import dt as dt_util
+from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.event import (
+    async_call_later,
+    async_track_state_change_event,
+)
 
 from .pid_controller import PIDController
 from .autotune import RelayAutoTuner
+from .actuator import ClimateActuator
+from .scheduler import DomainScheduler
+from .telemetry import TelemetryBuffer, write_binary, write_csv
+from .metrics import RuntimeMetrics
+from .fusion import SensorFusion
+from .state_store import ControllerStateStore
+from .schedule import Period, ScheduleEngine, WeeklySchedule
+from .optimal_start import OptimalStart
+from .gain_schedule import GainSchedule
+from .feedforward import FeedForward
 from .const import *
 
+if TYPE_CHECKING:
+    from .mpc import MPCController
+
 _LOGGER = logging.getLogger(__name__)
 
 class ControllerRuntime:
-    def __init__(self, hass: HomeAssistant, entry):
+    def __init__(self, hass: HomeAssistant, entry, clock=time, store_options=None):
         self.hass = hass
         self.entry = entry
+        # persists option edits; fleet zones keep theirs in the fleet entry's options
+        self._store_options = store_options or self._write_entry_options
+        self._written_options: dict | None = None
         self.cfg = {**DEFAULTS, **entry.data, **entry.options}
+        # time source of the control loop: anything with time() and monotonic() (the replay harness passes a simulated clock)
+        self.clock = clock
+        # PID output is an offset from target, so its limits are the min/max setpoints relative to target
         self.pid = PIDController(
             self.cfg[CONF_KP],
             self.cfg[CONF_KI],
             self.cfg[CONF_KD],
-            out_min=self.cfg[CONF_MIN_TEMP],
-            out_max=self.cfg[CONF_MAX_TEMP],
+            out_min=self.cfg[CONF_MIN_TEMP] - self.cfg[CONF_TARGET],
+            out_max=self.cfg[CONF_MAX_TEMP] - self.cfg[CONF_TARGET],
+            nominal_dt=float(self.cfg[CONF_INTERVAL]),
+            max_dt=self._max_step(),
         )
+        # current loop interval; varies with the error in adaptive mode
+        self.interval = float(self.cfg[CONF_INTERVAL])
+        self.actuator = ClimateActuator(hass, min_interval=self.cfg[CONF_MIN_COMMAND_INTERVAL], clock=self.clock)
+        self.telemetry = TelemetryBuffer(self.cfg[CONF_TELEMETRY_SIZE])
+        self.metrics = RuntimeMetrics()
+        self.fusion = self._build_fusion()
+        self.optimal = OptimalStart(self.cfg[CONF_MAX_LEAD], band=max(0.1, float(self.cfg[CONF_DEADBAND])))
+        self.gain_schedule = self._build_gain_schedule()
+        self._gain_key: str | None = None  # table the current gains came from, None for the fixed gains
+        self.feedforward = FeedForward(self.cfg[CONF_FF_GAIN], self.cfg[CONF_FF_LEAD])
+        self._ff = 0.0  # feedforward offset in the current command; the PID limits are shifted by it
+        self._ff_timer = None
+        self.mpc: MPCController | None = None
+        self.mpc = self._build_mpc()
+        self._sample = None
+        self._prev_sample = None
+        self._last_command: float | None = None
+        self._state_store: ControllerStateStore | None = None
+        self._pending_options: dict = {}
+        self._options_flush = None
+        # live status pushed to the status sensor
+        self._terms: tuple | None = None
+        self.in_deadband = False
+        self._status_published = -float("inf")
+        self._status_timer = None
         self.enabled = True
         self.autotuner: RelayAutoTuner | None = None
+        self._engine: BatchEngine | None = None
         self._unsubs = []
+        # event-driven trigger state
+        self._last_run: float | None = None
+        self._pending_run = None
+        self._watchdog = None
 
     async def start(self):
-        # periodic control loop
-        interval = timedelta(seconds=int(self.cfg[CONF_INTERVAL]))
-        self._unsubs.append(async_track_time_interval(self.hass, self._loop, interval))
+        # warm start from persisted controller state
+        self._state_store = await ControllerStateStore.async_get(self.hass)
+        self._restore_state(self._state_store.get(self.entry.entry_id))
+        self._state_store.register(self.entry.entry_id, self)
+        self._unsubs.append(lambda: self._state_store.unregister(self.entry.entry_id))
+
+        # control loop: on sensor changes, or periodic
+        if self.cfg.get(CONF_TRIGGER) == TRIGGER_EVENT:
+            self._unsubs.append(async_track_state_change_event(self.hass, self.fusion.entity_ids, self._on_sensor_change))
+            self._unsubs.append(self._cancel_triggers)
+            self._arm_watchdog()
+        else:
+            scheduler = DomainScheduler.get(self.hass)
+            interval = int(self.cfg[CONF_INTERVAL])
+            # MPC zones always run their own loop
+            if self.cfg.get(CONF_ENGINE) == ENGINE_BATCH and self.cfg.get(CONF_CONTROLLER) != CONTROLLER_MPC:
+                self._engine = BatchEngine.get(self.hass)
+                self._engine.register(self)
+                self._unsubs.append(lambda: self._engine.unregister(self))
+                self._unsubs.append(scheduler.add(self, interval, self._loop, batch=self._engine.async_run))
+            else:
+                self._unsubs.append(scheduler.add(self, interval, self._loop))
 
-        # night setback and restore
-        if self.cfg.get(CONF_SETBACK_ENABLED, True):
-            st = _parse_hms(self.cfg[CONF_SETBACK_TIME])
-            rt = _parse_hms(self.cfg[CONF_RESTORE_TIME])
-            self._unsubs.append(async_track_time_change(self.hass, self._on_setback, hour=st.hour, minute=st.minute, second=st.second))
-            self._unsubs.append(async_track_time_change(self.hass, self._on_restore, hour=rt.hour, minute=rt.minute, second=rt.second))
+        if self.cfg.get(CONF_FEEDFORWARD) and self.cfg.get(CONF_OUTDOOR_SENSOR):
+            self._ff_timer = async_call_later(self.hass, 0, self._feedforward_tick)
+            self._unsubs.append(self._cancel_feedforward)
+
+        # weekly schedule (night setback and restore when no schedule is configured)
+        schedule = self._build_schedule()
+        if schedule:
+            lead = self._lead if self.cfg.get(CONF_OPTIMAL_START) else None
+            self._unsubs.append(ScheduleEngine.get(self.hass).add(self, schedule, self._on_schedule, lead))
 
     async def stop(self):
+        self._flush_options()
+        self.actuator.cancel()
+        if self._status_timer:
+            self._status_timer()
+            self._status_timer = None
         for u in self._unsubs:
             u()
         self._unsubs.clear()
 
+    def snapshot_state(self) -> list:
+        """[saved_at, integral, last_error, seconds since last PID update, last command, filter state, optimal start,
+        filter type]"""
+        i, last_error, last_t = self._engine.state(self) if self._engine else self.pid.state()
+        age = None if last_t is None else round(self.clock.monotonic() - last_t, 1)
+        return [round(self.clock.time(), 1), i, last_error, age, self._last_command, self.fusion.filter.state(),
+                self.optimal.state(), self.cfg[CONF_FILTER]]
+
+    def _restore_state(self, saved: list | None):
+        if not saved:
+            return
+        # learned warm-up rates do not expire with the rest of the state
+        if len(saved) > 6:
+            self.optimal.load(saved[6])
+        try:
+            saved_at, i, last_error, age, last_command, filter_state = saved[:6]
+            elapsed = self.clock.time() - saved_at
+            if not 0 <= elapsed <= float(self.cfg[CONF_STATE_MAX_AGE]):
+                _LOGGER.debug("Saved controller state is %.0f s old, starting cold", elapsed)
+                return
+            last_t = None if age is None else self.clock.monotonic() - age - elapsed
+            self.pid.load_state(i, last_error, last_t)
+            if last_command is not None:
+                self._last_command = last_command
+                self.actuator.seed(self.cfg[CONF_CLIMATES], last_command)
+        except (TypeError, ValueError) as e:
+            _LOGGER.debug("Ignoring unreadable controller state: %s", e)
+            self.pid.reset()
+            return
+        # another filter type keeps its state in another shape; it just starts over
+        filter_type = saved[7] if len(saved) > 7 else None
+        if filter_type == self.cfg[CONF_FILTER] and filter_state and filter_state[0] is not None:
+            try:
+                self.fusion.filter.load(filter_state)
+            except (TypeError, ValueError) as e:
+                _LOGGER.debug("Ignoring unreadable filter state: %s", e)
+
+    def set_option(self, key: str, value):
+        """Apply an option to the live controller now; persist it with other edits in one write."""
+        self._pending_options[key] = value
+        self.cfg[key] = value
+        self._apply_config()
+        if self._options_flush is None:
+            self._options_flush = async_call_later(self.hass, OPTIONS_WRITE_DELAY, self._flush_options)
+
+    @callback
+    def _flush_options(self, now=None):
+        if self._options_flush:
+            self._options_flush()
+            self._options_flush = None
+        if not self._pending_options:
+            return
+        opts = {**self.entry.options, **self._pending_options}
+        self._pending_options.clear()
+        self._store_options(opts)
+
+    def _write_entry_options(self, options: dict):
+        self._written_options = options
+        self.hass.config_entries.async_update_entry(self.entry, options=options)
+
+    def options_updated(self) -> bool:
+        """The entry's options changed (e.g. saved in the options flow); options this runtime wrote itself are already live.
+        Applies LIVE_OPTIONS in place; returns False if another option changed and the entry has to be reloaded."""
+        if self._written_options is not None and dict(self.entry.options) == self._written_options:
+            return True
+        cfg = {**DEFAULTS, **self.entry.data, **self.entry.options, **self._pending_options}
+        # trigger, engine, sensors, schedule and timers are wired up once in start()
+        if any(cfg.get(key) != self.cfg.get(key) for key in cfg.keys() | self.cfg.keys() if key not in LIVE_OPTIONS):
+            return False
+        self.update_config()
+        return True
+
     def update_config(self):
-        self.cfg = {**DEFAULTS, **self.entry.data, **self.entry.options}
-        self.pid.kp = self.cfg[CONF_KP]
-        self.pid.ki = self.cfg[CONF_KI]
-        self.pid.kd = self.cfg[CONF_KD]
-
-    async def _on_setback(self, now):
-        temp = float(self.cfg[CONF_SETBACK_TEMP])
-        await self._set_all_climates_temperature(temp)
-
-    async def _on_restore(self, now):
-        temp = float(self.cfg[CONF_RESTORE_TEMP])
-        await self._set_all_climates_temperature(temp)
-        fan = self.cfg.get(CONF_RESTORE_FAN)
-        if fan:
-            await self._set_all_climates_fan_mode(fan)
-
-    async def _set_all_climates_temperature(self, temperature: float):
-        climates = self.cfg[CONF_CLIMATES]
-        await self.hass.services.async_call("climate", "set_temperature", {
-            "entity_id": climates,
-            "temperature": temperature
-        }, blocking=False)
+        # cfg is the cached merged view; edits not yet written still win over the entry
+        self.cfg = {**DEFAULTS, **self.entry.data, **self.entry.options, **self._pending_options}
+        self._apply_config()
 
-    async def _set_all_climates_fan_mode(self, fan: str):
-        climates = self.cfg[CONF_CLIMATES]
+    def _apply_config(self):
+        self.gain_schedule = self._build_gain_schedule()
+        if not self.gain_schedule:
+            self._gain_key = None
+        # scheduled gains stay in place until the next loop run looks them up again
+        if self._gain_key is None:
+            self.pid.kp = self.cfg[CONF_KP]
+            self.pid.ki = self.cfg[CONF_KI]
+            self.pid.kd = self.cfg[CONF_KD]
+        self.mpc = self._build_mpc()
+        self.feedforward.gain = float(self.cfg[CONF_FF_GAIN])
+        self.feedforward.lead = float(self.cfg[CONF_FF_LEAD])
+        if not self.cfg.get(CONF_FEEDFORWARD) or self.mpc:
+            self._ff = 0.0
+        self.pid.out_min = self.cfg[CONF_MIN_TEMP] - self.cfg[CONF_TARGET] - self._ff
+        self.pid.out_max = self.cfg[CONF_MAX_TEMP] - self.cfg[CONF_TARGET] - self._ff
+        self.pid.nominal_dt = float(self.cfg[CONF_INTERVAL])
+        self.pid.max_dt = self._max_step()
+        self.actuator.min_interval = float(self.cfg[CONF_MIN_COMMAND_INTERVAL])
+        if self._engine:
+            self._engine.configure(self)
+
+    def _model(self) -> dict | None:
+        """Identified FOPDT model from the model_* options, or None before the identify service ran."""
+        if self.cfg.get(CONF_MODEL_TAU) is None:
+            return None
+        return {
+            "gain": float(self.cfg[CONF_MODEL_GAIN]),
+            "tau": float(self.cfg[CONF_MODEL_TAU]),
+            "dead_time": float(self.cfg[CONF_MODEL_DEAD_TIME]),
+        }
+
+    def _build_mpc(self) -> MPCController | None:
+        """MPC for the identified model; its matrices are only rebuilt when the model or horizon changed."""
+        if self.cfg.get(CONF_CONTROLLER) != CONTROLLER_MPC:
+            return None
+        model = self._model()
+        if model is None:
+            if self.mpc is None:
+                _LOGGER.warning("No plant model for %s yet, using PID until the identify service ran", self.entry.title)
+            return None
+        # NumPy is only loaded once a zone runs MPC or the batch engine
+        from .mpc import MPCController
+
+        mpc = self.mpc or MPCController(model, float(self.cfg[CONF_INTERVAL]))
+        mpc.configure(model, float(self.cfg[CONF_INTERVAL]), int(self.cfg[CONF_MPC_HORIZON]),
+                      float(self.cfg[CONF_MPC_MOVE_PENALTY]))
+        mpc.u_min = float(self.cfg[CONF_MIN_TEMP])
+        mpc.u_max = float(self.cfg[CONF_MAX_TEMP])
+        return mpc
+
+    def _max_step(self) -> float:
+        """Twice the longest regular gap between loop runs; the PID never integrates a longer step."""
+        if self.cfg.get(CONF_TRIGGER) == TRIGGER_EVENT:
+            longest = self.cfg[CONF_MAX_STALENESS]
+        elif self.cfg.get(CONF_ADAPTIVE_INTERVAL):
+            longest = self.cfg[CONF_INTERVAL_MAX]
+        else:
+            longest = self.cfg[CONF_INTERVAL]
+        return 2 * float(longest)
+
+    def _adapt_interval(self):
+        """Pick the next loop interval from the error projected over the slowest interval:
+        settled zones stretch toward interval_max, zones far from target or moving fast
+        shrink toward interval_min."""
+        if self.cfg.get(CONF_TRIGGER) == TRIGGER_EVENT:
+            return
+        base = float(self.cfg[CONF_INTERVAL])
+        # the MPC model is discretized at the configured interval
+        if not self.cfg.get(CONF_ADAPTIVE_INTERVAL) or self.mpc:
+            interval = base
+        else:
+            lo, hi = float(self.cfg[CONF_INTERVAL_MIN]), float(self.cfg[CONF_INTERVAL_MAX])
+            if not self.enabled:
+                interval = hi
+            elif self.autotuner or not self._sample:
+                # relay tuning measures periods, it needs steady sampling
+                interval = base
+            else:
+                band = max(0.1, float(self.cfg[CONF_DEADBAND]))
+                rate = 0.0
+                prev = self._prev_sample
+                if prev and self._sample[0] > prev[0]:
+                    rate = (self._sample[3] - prev[3]) / (self._sample[0] - prev[0])
+                projected = abs(self._sample[3]) + abs(rate) * hi
+                interval = hi if projected <= band else hi * band / projected
+                # slow down gradually, speed up at once
+                interval = min(interval, 2 * self.interval)
+            interval = round(min(hi, max(lo, interval)))
+        if interval != self.interval:
+            self.interval = interval
+            DomainScheduler.get(self.hass).reschedule(self, interval)
+
+    def _build_gain_schedule(self) -> GainSchedule:
         try:
-            await self.hass.services.async_call("climate", "set_fan_mode", {
-                "entity_id": climates,
-                "fan_mode": fan
-            }, blocking=False)
-        except Exception as e:
-            _LOGGER.debug("Fan mode set failed (maybe unsupported): %s", e)
+            return GainSchedule.from_config(self.cfg.get(CONF_GAIN_SCHEDULE))
+        except ValueError as e:
+            _LOGGER.error("Ignoring gain schedule of %s: %s", self.entry.title, e)
+            return GainSchedule({})
 
-    async def _loop(self, now):
-        if not self.enabled:
+    def _schedule_gains(self, error: float):
+        """Interpolate the gains for the mode and operating point; the switch is bumpless."""
+        key = self.gain_schedule.select(self.cfg[CONF_MODE], error)
+        if key is None:
+            gains = (float(self.cfg[CONF_KP]), float(self.cfg[CONF_KI]), float(self.cfg[CONF_KD]))
+        else:
+            gains = self.gain_schedule.lookup(key, error, self._read_outdoor())
+            if gains is None:
+                return
+        self._gain_key = key
+        if gains == (self.pid.kp, self.pid.ki, self.pid.kd):
             return
+        if self._engine:
+            # the engine owns the integral in batch mode
+            self.pid.set_gains(*gains, bumpless=False)
+            self._engine.set_gains(self, *gains)
+        else:
+            self.pid.set_gains(*gains)
+
+    async def _feedforward_tick(self, now=None):
+        self._ff_timer = async_call_later(self.hass, FEEDFORWARD_REFRESH, self._feedforward_tick)
+        await self.refresh_feedforward()
 
-        sensor = self.hass.states.get(self.cfg[CONF_SENSOR])
-        if not sensor or sensor.state in (STATE_UNAVAILABLE, "unknown", None):
-            _LOGGER.debug("Sensor %s unavailable", self.cfg[CONF_SENSOR])
+    def _cancel_feedforward(self):
+        if self._ff_timer:
+            self._ff_timer()
+            self._ff_timer = None
+
+    async def refresh_feedforward(self):
+        """Resample the hourly forecast of a weather entity (or the current outdoor reading) into
+        the feedforward profile; loop runs only index into it."""
+        entity_id = self.cfg.get(CONF_OUTDOOR_SENSOR)
+        if not entity_id:
+            return
+        now = self.clock.time()
+        if entity_id.startswith("weather.") and self.feedforward.load_forecast(await self._fetch_forecast(entity_id), now):
             return
+        outdoor = self._read_outdoor()
+        if outdoor is not None:
+            # valid until one refresh is missed
+            self.feedforward.load_current(outdoor, now, 2 * FEEDFORWARD_REFRESH)
+
+    async def _fetch_forecast(self, entity_id: str) -> list | None:
         try:
-            ambient = float(sensor.state)
-        except Exception:
+            res = await self.hass.services.async_call(
+                "weather", "get_forecasts", {"entity_id": entity_id, "type": "hourly"},
+                blocking=True, return_response=True,
+            )
+            return res[entity_id]["forecast"]
+        except (HomeAssistantError, KeyError, TypeError) as e:
+            _LOGGER.debug("No hourly forecast from %s: %s", entity_id, e)
+        # older weather integrations expose the forecast as an attribute
+        state = self.hass.states.get(entity_id)
+        return state.attributes.get("forecast") if state else None
+
+    def _update_feedforward(self, target: float):
+        ff = self.feedforward.term(target, self.clock.time())
+        if ff == self._ff:
+            return
+        # shift the PID limits so the command, not the PID output, saturates at min/max temp
+        self._ff = ff
+        self.pid.out_min = self.cfg[CONF_MIN_TEMP] - target - ff
+        self.pid.out_max = self.cfg[CONF_MAX_TEMP] - target - ff
+        if self._engine:
+            self._engine.configure(self)
+
+    def _build_schedule(self) -> WeeklySchedule:
+        rules = self.cfg.get(CONF_SCHEDULE)
+        if rules:
+            try:
+                return WeeklySchedule.from_rules(rules)
+            except ValueError as e:
+                _LOGGER.error("Ignoring schedule of %s: %s", self.entry.title, e)
+        if not self.cfg.get(CONF_SETBACK_ENABLED, True):
+            return WeeklySchedule(())
+        return WeeklySchedule.daily(
+            self.cfg[CONF_SETBACK_TIME], self.cfg[CONF_SETBACK_TEMP],
+            self.cfg[CONF_RESTORE_TIME], self.cfg[CONF_RESTORE_TEMP],
+            self.cfg.get(CONF_RESTORE_FAN),
+        )
+
+    async def _on_schedule(self, period: Period, transition: datetime):
+        with self.metrics.timer(period.label if period.label in ("setback", "restore") else "schedule"):
+            await self._set_all_climates_temperature(period.temperature, force=True)
+            if period.fan_mode:
+                await self._set_all_climates_fan_mode(period.fan_mode)
+        if self.cfg.get(CONF_OPTIMAL_START):
+            self.optimal.begin(self.clock.time(), self.fusion.filter.value, period.temperature, self._read_outdoor())
+            self.publish_status()
+
+    def _lead(self, period: Period) -> float:
+        """Early start of `period`; only transitions toward comfort (up when heating, down when
+        cooling) are advanced, so a setback never cuts the comfort period short."""
+        ambient = self.fusion.filter.value
+        outdoor = self._read_outdoor()
+        current = self._last_command if self._last_command is not None else ambient
+        mode = self.cfg.get(CONF_MODE)
+        cooling = mode == "cool" or (mode == "auto" and None not in (outdoor, ambient) and outdoor > ambient)
+        lead = 0.0
+        if current is not None and (period.temperature < current if cooling else period.temperature > current):
+            lead = self.optimal.lead(ambient, period.temperature, outdoor)
+        self.optimal.next_lead = lead
+        return lead
+
+    def _read_outdoor(self) -> float | None:
+        entity_id = self.cfg.get(CONF_OUTDOOR_SENSOR)
+        state = self.hass.states.get(entity_id) if entity_id else None
+        if state is None:
+            return None
+        # weather entities carry the temperature as an attribute
+        value = state.attributes.get("temperature") if entity_id.startswith("weather.") else state.state
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+    async def _set_all_climates_temperature(self, temperature: float, force: bool = False):
+        self._last_command = temperature
+        if self._state_store:
+            self._state_store.async_schedule_save()
+        with self.metrics.timer("service_call"):
+            await self.actuator.async_set_temperature(self.cfg[CONF_CLIMATES], temperature, force=force)
+
+    async def _set_all_climates_fan_mode(self, fan: str):
+        climates = self.cfg[CONF_CLIMATES]
+        with self.metrics.timer("service_call"):
+            try:
+                await self.hass.services.async_call("climate", "set_fan_mode", {
+                    "entity_id": climates,
+                    "fan_mode": fan
+                }, blocking=False)
+            except Exception as e:
+                _LOGGER.debug("Fan mode set failed (maybe unsupported): %s", e)
+
+    @callback
+    def _on_sensor_change(self, event):
+        new = event.data.get("new_state")
+        old = event.data.get("old_state")
+        if new is None or (old is not None and old.state == new.state):
+            return
+        if self._pending_run:
+            return
+        # throttle: run now, or once the minimum interval since the last run has passed
+        wait = 0.0
+        if self._last_run is not None:
+            wait = float(self.cfg[CONF_MIN_INTERVAL]) - (self.clock.monotonic() - self._last_run)
+        if wait <= 0:
+            self.hass.async_create_task(self._triggered_loop(None))
+        else:
+            self._pending_run = async_call_later(self.hass, wait, self._triggered_loop)
+
+    async def _triggered_loop(self, now):
+        if self._pending_run:
+            self._pending_run()
+            self._pending_run = None
+        self._last_run = self.clock.monotonic()
+        self._arm_watchdog()
+        await self._loop(now)
+
+    @callback
+    def _arm_watchdog(self):
+        # maximum staleness: run even if the sensor has not reported for a while
+        if self._watchdog:
+            self._watchdog()
+        self._watchdog = async_call_later(self.hass, float(self.cfg[CONF_MAX_STALENESS]), self._triggered_loop)
+
+    @callback
+    def _cancel_triggers(self):
+        for unsub in (self._pending_run, self._watchdog):
+            if unsub:
+                unsub()
+        self._pending_run = None
+        self._watchdog = None
+
+    async def _loop(self, now):
+        with self.metrics.timer("loop"):
+            error = await self._prepare()
+            if error is not None and self.mpc:
+                await self._mpc_output()
+            elif error is not None:
+                out = self.pid.update(error, now=self.clock.monotonic())
+                await self._apply_output(out)
+        self._adapt_interval()
+        self.publish_status()
+
+    async def _mpc_output(self):
+        _, ambient, target, _ = self._sample
+        out = self.mpc.step(ambient, target, self._last_command, self.clock.monotonic()) - target
+        # no PID terms: the whole MPC offset is reported as p
+        await self._apply_output(out, (out, 0.0, 0.0))
+
+    def status(self) -> tuple[str, dict]:
+        """Sensor state and attributes describing the controller right now."""
+        if not self.enabled:
+            state = "disabled"
+        elif self.autotuner:
+            state = "autotuning"
+        elif self.in_deadband:
+            state = "idle"
+        else:
+            state = "running"
+        attrs = {
+            "last_command": self._last_command,
+            "in_deadband": self.in_deadband,
+            "autotune_phase": self.autotuner.phase if self.autotuner else None,
+            "interval": self.interval,
+            "controller": CONTROLLER_MPC if self.mpc else CONTROLLER_PID,
+        }
+        if self._sample:
+            _, attrs["ambient"], attrs["target"], attrs["error"] = (round(v, 3) for v in self._sample)
+        if self._terms:
+            attrs["p"], attrs["i"], attrs["d"] = (round(v, 4) for v in self._terms)
+        if self.cfg.get(CONF_FEEDFORWARD):
+            attrs["feedforward"] = round(self._ff, 3)
+            attrs["feedforward_source"] = self.feedforward.source
+        if self.gain_schedule:
+            attrs["gain_table"] = self._gain_key
+            attrs["kp"], attrs["ki"], attrs["kd"] = (round(v, 4) for v in (self.pid.kp, self.pid.ki, self.pid.kd))
+        schedule = self.hass.data.get(DATA_SCHEDULE_ENGINE)
+        due = schedule.next_due(self) if schedule else None
+        if due:
+            attrs["next_transition"] = due.isoformat()
+        return state, attrs
+
+    @callback
+    def publish_status(self):
+        """Push status to the sensor, at most once per status_interval; a throttled update is sent at the end of the window."""
+        wait = float(self.cfg[CONF_STATUS_INTERVAL]) - (self.clock.monotonic() - self._status_published)
+        if wait > 0:
+            if self._status_timer is None:
+                self._status_timer = async_call_later(self.hass, wait, self._publish_deferred)
             return
+        self._status_published = self.clock.monotonic()
+        async_dispatcher_send(self.hass, SIGNAL_STATUS.format(self.entry.entry_id))
+
+    @callback
+    def _publish_deferred(self, now):
+        self._status_timer = None
+        self.publish_status()
+
+    def _build_fusion(self) -> SensorFusion:
+        return SensorFusion(
+            self.cfg[CONF_SENSOR],
+            filter_type=self.cfg[CONF_FILTER],
+            window=self.cfg[CONF_FILTER_WINDOW],
+            max_age=self.cfg[CONF_SENSOR_MAX_AGE],
+            outlier_threshold=self.cfg[CONF_OUTLIER_THRESHOLD],
+        )
+
+    def _read_ambient(self) -> float | None:
+        ambient = self.fusion.update(self.hass.states, dt_util.utc_from_timestamp(self.clock.time()))
+        if ambient is None:
+            _LOGGER.debug("No usable reading from %s", self.fusion.entity_ids)
+        return ambient
+
+    async def _prepare(self) -> float | None:
+        """Read the sensor and return the PID error, or None if no PID step is due."""
+        if not self.enabled:
+            return None
+
+        with self.metrics.timer("sensor"):
+            ambient = self._read_ambient()
+        if ambient is None:
+            return None
 
         target = float(self.cfg[CONF_TARGET])
         deadband = float(self.cfg[CONF_DEADBAND])
+        error = target - ambient
+        self._prev_sample = self._sample
+        self._sample = (self.clock.time(), ambient, target, error)
+        if self.optimal.observe(self._sample[0], ambient) and self._state_store:
+            self._state_store.async_schedule_save()
 
         if self.autotuner:
-            commanded = self.autotuner.step(ambient, target)
+            commanded = self.autotuner.step(ambient, target, now=self.clock.monotonic())
+            if self.autotuner.converged:
+                self.telemetry.record(*self._sample)
+                res = await self.stop_autotune()
+                _LOGGER.info("Auto-tune converged, applied: %s", res)
+                return None
+            self.telemetry.record(*self._sample, commanded=commanded)
             await self._set_all_climates_temperature(commanded)
-            return
+            return None
 
-        error = target - ambient
-        if abs(error) <= deadband:
-            return
+        self.in_deadband = abs(error) <= deadband
+        if self.in_deadband:
+            self.telemetry.record(*self._sample)
+            return None
+        if self.mpc:
+            return error
+        if self.gain_schedule:
+            self._schedule_gains(error)
+        if self.cfg.get(CONF_FEEDFORWARD):
+            self._update_feedforward(target)
+        return error
 
-        out = self.pid.update(error)
-        # Interpret PID output as absolute setpoint around target
-        commanded = max(self.cfg[CONF_MIN_TEMP], min(self.cfg[CONF_MAX_TEMP], target + out))
+    async def _apply_output(self, out: float, terms: tuple | None = None):
+        target = float(self.cfg[CONF_TARGET])
+        # PID output plus feedforward is the setpoint offset from target
+        commanded = max(self.cfg[CONF_MIN_TEMP], min(self.cfg[CONF_MAX_TEMP], target + out + self._ff))
+        p, i, d = self._terms = terms or (self.pid.p_term, self.pid._i, self.pid.d_term)
+        self.telemetry.record(*self._sample, p, i, d, commanded)
         await self._set_all_climates_temperature(commanded)
 
+    async def dump_telemetry(self, path: str | None = None, fmt: str = "binary") -> str:
+        """Write the telemetry buffer to `path` (relative to the config dir) off the event loop."""
+        if fmt not in ("binary", "csv"):
+            raise ValueError(f"Unknown telemetry format: {fmt}")
+        ext = "npy" if fmt == "binary" else "csv"
+        path = self.hass.config.path(path or f"smart_pid_telemetry_{self.entry.entry_id}.{ext}")
+        writer = write_binary if fmt == "binary" else write_csv
+        await self.hass.async_add_executor_job(writer, path, self.telemetry.snapshot())
+        return path
+
     # Service hooks
+    async def profile(self, duration: float | None = None, ticks: int | None = None, path: str | None = None) -> dict:
+        """cProfile + tracemalloc over the loop and service calls for `duration` seconds or `ticks`
+        loop runs, whichever ends first (60 s if neither is given). Files go to the config dir."""
+        from .profiler import ProfileSession
+
+        if self.hass.data.get(DATA_PROFILER):
+            raise HomeAssistantError("A profiling session is already running")
+        if duration is None and not ticks:
+            duration = 60.0
+        prefix = self.hass.config.path(path or f"smart_pid_profile_{self.entry.entry_id}_{int(self.clock.time())}")
+        session = self.hass.data[DATA_PROFILER] = ProfileSession(prefix, ticks)
+        scheduler = self.hass.data.get(DATA_SCHEDULER)
+        session.attach(self)
+        if scheduler:
+            scheduler.replace(self, self._loop)
+        try:
+            try:
+                async with asyncio.timeout(duration):
+                    await session.done.wait()
+            except TimeoutError:
+                pass
+            finally:
+                session.detach()
+                if scheduler:
+                    scheduler.replace(self, self._loop)
+            # the allocation snapshot costs as much as the files, so both are taken in the executor
+            return await self.hass.async_add_executor_job(session.write)
+        finally:
+            session.finish()
+            self.hass.data.pop(DATA_PROFILER, None)
+
     async def start_autotune(self):
         self.autotuner = RelayAutoTuner(amplitude=0.5)
         self.autotuner.start()
+        self.publish_status()
 
     async def stop_autotune(self):
         if not self.autotuner:
@@ -121,17 +666,150 @@ class ControllerRuntime:
         self.autotuner.stop()
         self.autotuner = None
         if res:
-            # Apply suggested gains to options
-            new_opts = {**self.entry.options}
-            new_opts[CONF_KP] = round(res["kp"], 4)
-            new_opts[CONF_KI] = round(res["ki"], 4)
-            new_opts[CONF_KD] = round(res["kd"], 4)
-            self.hass.config_entries.async_update_entry(self.entry, options=new_opts)
+            self._apply_gains(res)
+        self.publish_status()
         return res
 
+    async def identify_model(self, source: str = "recorder", path: str | None = None, query: str | None = None,
+                             days: int = 30, sample_interval: float = 60.0, apply: bool = True):
+        """Fit a FOPDT model to logged ambient/setpoint history and derive IMC PID gains from it."""
+        from . import sysid
+
+        if source in ("csv", "sqlite") and not path:
+            raise HomeAssistantError(f"path is required for source {source}")
+        if source == "recorder":
+            from homeassistant.components.recorder import get_instance
+
+            climate = self.cfg[CONF_CLIMATES][0]
+            model = await get_instance(self.hass).async_add_executor_job(
+                sysid.identify_recorder, self.hass, self.fusion.entity_ids[0], climate, int(days), sample_interval
+            )
+        elif source == "csv":
+            model = await self.hass.async_add_executor_job(sysid.identify_csv, self.hass.config.path(path), sample_interval)
+        elif source == "sqlite":
+            model = await self.hass.async_add_executor_job(
+                sysid.identify_sqlite, self.hass.config.path(path), query or DEFAULT_SYSID_QUERY, sample_interval
+            )
+        else:
+            raise ValueError(f"Unknown history source: {source}")
+        if model is None:
+            _LOGGER.warning("System identification found no usable model in %s history", source)
+            return None
+
+        res = {**sysid.imc_gains(model), "model": model}
+        if apply:
+            self._apply_gains(res, {
+                CONF_MODEL_GAIN: round(model["gain"], 4),
+                CONF_MODEL_TAU: round(model["tau"], 1),
+                CONF_MODEL_DEAD_TIME: round(model["dead_time"], 1),
+            })
+        return res
+
+    async def optimize_gains(self, step: float = 3.0, workers: int | None = None, max_iterations: int = 40,
+                             weights: dict | None = None, apply: bool = True):
+        """Search gains for the identified model (model_* options) in simulation, in worker processes."""
+        from . import optimizer
+        from .sysid import imc_gains
+
+        model = self._model()
+        if model is None:
+            _LOGGER.warning("No plant model for %s yet; run the identify service first", self.entry.title)
+            return None
+        settings = optimizer.scenario_settings(
+            model, self.cfg[CONF_TARGET], self.cfg[CONF_INTERVAL], self.cfg[CONF_DEADBAND],
+            self.cfg[CONF_MIN_TEMP], self.cfg[CONF_MAX_TEMP], step,
+        )
+        start = tuple(imc_gains(model).values())
+        current = (self.cfg[CONF_KP], self.cfg[CONF_KI], self.cfg[CONF_KD])
+        res = await optimizer.GainOptimizer(model, settings, weights, workers).async_run(start, current, max_iterations)
+        if apply:
+            self._apply_gains(res)
+        return res
+
+    def _apply_gains(self, res: dict, extra: dict | None = None):
+        # Apply suggested gains to options, together with any pending edits, in one write
+        new_opts = {**(extra or {})}
+        new_opts[CONF_KP] = round(res["kp"], 4)
+        new_opts[CONF_KI] = round(res["ki"], 4)
+        new_opts[CONF_KD] = round(res["kd"], 4)
+        self._pending_options.update(new_opts)
+        self.update_config()
+        self._flush_options()
+
+
+class BatchEngine:
+    """Runs every batch-mode runtime of a Home Assistant instance through one BatchPIDController.
+    The DomainScheduler hands all batch runtimes due in a tick to async_run as one vectorized update.
+    """
+    def __init__(self, hass: HomeAssistant):
+        from .batch_pid import BatchPIDController
+
+        self.hass = hass
+        self.pid = BatchPIDController()
+        self._slots: dict[ControllerRuntime, int] = {}
+
+    @classmethod
+    def get(cls, hass: HomeAssistant) -> BatchEngine:
+        engine = hass.data.get(DATA_BATCH_ENGINE)
+        if engine is None:
+            engine = hass.data[DATA_BATCH_ENGINE] = cls(hass)
+        return engine
+
+    def register(self, runtime: ControllerRuntime):
+        pid = runtime.pid
+        slot = self._slots[runtime] = self.pid.add(pid.kp, pid.ki, pid.kd, out_min=pid.out_min, out_max=pid.out_max)
+        self.pid.set_timing(slot, pid.nominal_dt, pid.max_dt)
+        self.pid.load_state(slot, *pid.state())
+
+    def unregister(self, runtime: ControllerRuntime):
+        slot = self._slots.pop(runtime, None)
+        if slot is not None:
+            self.pid.remove(slot)
+
+    def state(self, runtime: ControllerRuntime) -> tuple:
+        return self.pid.state(self._slots[runtime])
+
+    def configure(self, runtime: ControllerRuntime):
+        slot = self._slots.get(runtime)
+        if slot is not None:
+            self.pid.set_gains(slot, runtime.pid.kp, runtime.pid.ki, runtime.pid.kd)
+            self.pid.set_limits(slot, runtime.pid.out_min, runtime.pid.out_max)
+            self.pid.set_timing(slot, runtime.pid.nominal_dt, runtime.pid.max_dt)
+
+    def set_gains(self, runtime: ControllerRuntime, kp: float, ki: float, kd: float):
+        slot = self._slots.get(runtime)
+        if slot is not None:
+            self.pid.set_gains(slot, kp, ki, kd, bumpless=True)
+
+    async def async_run(self, runtimes, now=None):
+        t0 = time.perf_counter()
+        members, slots, errors, mpc = [], [], [], []
+        for runtime in runtimes:
+            if runtime not in self._slots:
+                continue
+            error = await runtime._prepare()
+            if error is None:
+                continue
+            if runtime.mpc:
+                # the zone switched to MPC after it joined the engine; it steps on its own
+                mpc.append(runtime)
+                continue
+            members.append(runtime)
+            slots.append(self._slots[runtime])
+            errors.append(error)
+        outputs = [r._mpc_output() for r in mpc]
+        if members:
+            outs = self.pid.update(errors, now=members[0].clock.monotonic(), slots=slots)
+            pid = self.pid
+            outputs.extend(
+                r._apply_output(float(o), (float(pid.p_term[s]), float(pid._i[s]), float(pid.d_term[s])))
+                for r, o, s in zip(members, outs, slots)
+            )
+        await asyncio.gather(*outputs)
+        # every runtime in the batch experienced the whole batch latency
+        elapsed = time.perf_counter() - t0
+        for runtime in runtimes:
+            runtime.metrics["loop"].record(elapsed)
+            runtime._adapt_interval()
+            runtime.publish_status()
 
-def _parse_hms(hms: str):
-    parts = [int(p) for p in hms.split(":")]
-    while len(parts) < 3:
-        parts.append(0)
-    return dtime(parts[0], parts[1], parts[2])
@@ -0,0 +1,42 @@
+from __future__ import annotations
+from homeassistant.core import HomeAssistant
+from homeassistant.config_entries import ConfigEntry
+
+from .const import DOMAIN, DATA_SCHEDULER, CONTROLLER_MPC, CONTROLLER_PID
+from .fleet import FleetRuntime
+
+
+async def async_get_config_entry_diagnostics(hass: HomeAssistant, entry: ConfigEntry) -> dict:
+    owner = hass.data[DOMAIN][entry.entry_id]
+    scheduler = hass.data.get(DATA_SCHEDULER)
+    diag = {
+        "scheduler": None if scheduler is None else {
+            "ticks": scheduler.tick_count,
+            "last_lag_ms": round(scheduler.last_lag * 1000, 3),
+            "max_lag_ms": round(scheduler.max_lag * 1000, 3),
+        },
+    }
+    if isinstance(owner, FleetRuntime):
+        diag["fleet"] = {"file": owner.path, "entities": owner.entity_set}
+        diag["zones"] = {zone_id: _runtime_diagnostics(runtime) for zone_id, runtime in owner.runtimes.items()}
+    else:
+        diag.update(_runtime_diagnostics(owner))
+    return diag
+
+
+def _runtime_diagnostics(runtime) -> dict:
+    return {
+        "config": runtime.cfg,
+        "enabled": runtime.enabled,
+        "controller": CONTROLLER_MPC if runtime.mpc else CONTROLLER_PID,
+        "autotune": runtime.autotuner.phase if runtime.autotuner else None,
+        "latency": runtime.metrics.as_dict(),
+        "commands": {
+            "sent": runtime.actuator.sent,
+            "suppressed": runtime.actuator.suppressed,
+            "failed": runtime.actuator.failed,
+        },
+        "deliveries": {entity_id: stats.as_dict() for entity_id, stats in runtime.actuator.stats.items()},
+        "telemetry_samples": runtime.telemetry.count,
+        "sensors": {"stale": runtime.fusion.stale, "rejected": runtime.fusion.rejected},
+    }
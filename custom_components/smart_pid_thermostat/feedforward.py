@@ -0,0 +1,90 @@
+from __future__ import annotations
+from datetime import datetime
+
+PROFILE_STEP = 300.0          # seconds between resampled profile points
+PROFILE_HORIZON = 48 * 3600.0
+
+
+def _timestamp(value) -> float | None:
+    if isinstance(value, datetime):
+        return value.timestamp()
+    try:
+        return datetime.fromisoformat(str(value).replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return None
+
+
+class DisturbanceProfile:
+    """Expected outdoor temperature on a fixed time grid, so a lookup is one index computation.
+    Outside [start, end) there is no value: a stale profile must be refreshed, not extrapolated."""
+    def __init__(self, start: float, values, step: float = PROFILE_STEP):
+        self.start = float(start)
+        self.step = float(step)
+        self.values: list[float] = list(values)
+        self.end = self.start + self.step * len(self.values)
+
+    @classmethod
+    def from_forecast(cls, forecast, now: float, step: float = PROFILE_STEP,
+                      horizon: float = PROFILE_HORIZON) -> DisturbanceProfile | None:
+        """Resample forecast entries ({"datetime", "temperature"}) linearly onto a grid starting at `now`."""
+        points = []
+        for item in forecast or ():
+            try:
+                t, temp = _timestamp(item["datetime"]), float(item["temperature"])
+            except (KeyError, TypeError, ValueError):
+                continue
+            if t is not None:
+                points.append((t, temp))
+        if not points:
+            return None
+        points.sort()
+        import numpy as np
+
+        ts = np.array([p[0] for p in points])
+        temps = np.array([p[1] for p in points])
+        # hourly forecasts are stamped at the start of the hour, so the first one may lie in the past
+        end = min(now + horizon, ts[-1] + 3600.0)
+        if end <= now:
+            return None
+        grid = now + step * np.arange(int(np.ceil((end - now) / step)))
+        return cls(now, np.interp(grid, ts, temps).tolist(), step)
+
+    @classmethod
+    def constant(cls, value: float, now: float, duration: float) -> DisturbanceProfile:
+        return cls(now, [float(value)], max(duration, 1.0))
+
+    def at(self, t: float) -> float | None:
+        if not self.start <= t < self.end:
+            return None
+        return self.values[int((t - self.start) // self.step)]
+
+
+class FeedForward:
+    """Setpoint offset proportional to the expected heat loss, gain * (target - outdoor), taken
+    `lead` seconds ahead so slow rooms start reacting before the weather changes."""
+    def __init__(self, gain: float, lead: float):
+        self.gain = float(gain)
+        self.lead = float(lead)
+        self.profile: DisturbanceProfile | None = None
+        self.source: str | None = None  # "forecast" or "sensor"
+        self.last = 0.0
+
+    def load_forecast(self, forecast, now: float) -> bool:
+        profile = DisturbanceProfile.from_forecast(forecast, now)
+        if profile is None:
+            return False
+        self.profile, self.source = profile, "forecast"
+        return True
+
+    def load_current(self, outdoor: float, now: float, valid_for: float):
+        self.profile, self.source = DisturbanceProfile.constant(outdoor, now, valid_for), "sensor"
+
+    def term(self, target: float, now: float) -> float:
+        outdoor = None
+        if self.profile is not None:
+            outdoor = self.profile.at(now + self.lead)
+            if outdoor is None:
+                # the lead runs past the end of the forecast: use its last value while it is current
+                outdoor = self.profile.values[-1] if self.profile.start <= now < self.profile.end else None
+        self.last = 0.0 if outdoor is None else self.gain * (target - outdoor)
+        return self.last
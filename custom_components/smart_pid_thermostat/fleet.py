@@ -0,0 +1,177 @@
+from __future__ import annotations
+import asyncio
+import json
+import logging
+
+from homeassistant.core import HomeAssistant
+
+from .coordinator import ControllerRuntime
+from .state_store import ControllerStateStore
+from .const import *
+
+_LOGGER = logging.getLogger(__name__)
+
+ENTITIES_FULL = "full"
+ENTITIES_MINIMAL = "minimal"
+
+
+def load_fleet_file(path: str) -> tuple[dict[str, dict], str]:
+    """({zone id: entry data}, entity set) from a YAML or JSON fleet file. Blocking.
+
+        entities: minimal          # or full: every per-zone entity of a single entry
+        defaults: {kp: 0.6, engine: batch}
+        zones:
+          - {id: office_101, climates: [climate.office_101], sensor: sensor.office_101_temperature}
+
+    Raises ValueError if the file is malformed.
+    """
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            raw = json.load(f)
+        else:
+            import yaml
+
+            try:
+                raw = yaml.safe_load(f)
+            except yaml.YAMLError as e:
+                raise ValueError(f"invalid YAML: {e}") from e
+    if not isinstance(raw, dict) or not isinstance(raw.get("zones"), list):
+        raise ValueError("fleet file needs a 'zones' list")
+    entities = raw.get("entities", ENTITIES_MINIMAL)
+    if entities not in (ENTITIES_FULL, ENTITIES_MINIMAL):
+        raise ValueError(f"unknown entity set {entities!r}")
+    defaults = raw.get("defaults") or {}
+    zones = {}
+    for i, zone in enumerate(raw["zones"]):
+        if not isinstance(zone, dict) or not zone.get("id"):
+            raise ValueError(f"zone #{i + 1} has no id")
+        zone_id = str(zone["id"])
+        if zone_id in zones:
+            raise ValueError(f"duplicate zone id {zone_id!r}")
+        data = {**defaults, **{k: v for k, v in zone.items() if k != "id"}}
+        for key in (CONF_CLIMATES, CONF_SENSOR):
+            if not data.get(key):
+                raise ValueError(f"zone {zone_id!r} has no {key}")
+            if isinstance(data[key], str):
+                data[key] = [data[key]]
+        data.setdefault(CONF_NAME, zone_id)
+        zones[zone_id] = data
+    return zones, entities
+
+
+class FleetZone:
+    """Stands in for a config entry for one zone: what ControllerRuntime and the entities read."""
+    def __init__(self, fleet_entry, zone_id: str, data: dict, options: dict):
+        self.zone_id = zone_id
+        self.entry_id = f"{fleet_entry.entry_id}_{zone_id}"
+        self.title = data[CONF_NAME]
+        self.data = data
+        self.options = options
+
+
+class FleetRuntime:
+    """All zones of one fleet entry. Each zone has its own ControllerRuntime (registered in
+    hass.data[DOMAIN] under its zone entry id, so entities and services find it like a single
+    entry's runtime); they share the scheduler, batch engine and state store as usual.
+    Entities of all zones are added per platform in one call; reload() only restarts zones whose
+    definition changed.
+    """
+    def __init__(self, hass: HomeAssistant, entry):
+        self.hass = hass
+        self.entry = entry
+        self.path = hass.config.path({**entry.data, **entry.options}[CONF_FLEET_FILE])
+        self.definitions: dict[str, dict] = {}
+        self.entity_set = ENTITIES_MINIMAL
+        self.zones: dict[str, FleetZone] = {}
+        self.runtimes: dict[str, ControllerRuntime] = {}
+        self._platforms = []  # (build, async_add_entities)
+        self._entities: dict[str, list] = {}
+
+    async def start(self):
+        self.definitions, self.entity_set = await self.hass.async_add_executor_job(load_fleet_file, self.path)
+        await asyncio.gather(*(self._start_zone(zone_id) for zone_id in self.definitions))
+        _LOGGER.info("Fleet %s started %d zones", self.entry.title, len(self.runtimes))
+
+    async def stop(self):
+        # the entities go with the platforms on unload
+        self._platforms.clear()
+        self._entities.clear()
+        await asyncio.gather(*(self._stop_zone(zone_id) for zone_id in list(self.runtimes)))
+
+    async def _start_zone(self, zone_id: str):
+        options = self.entry.options.get(CONF_ZONES, {}).get(zone_id, {})
+        zone = self.zones[zone_id] = FleetZone(self.entry, zone_id, self.definitions[zone_id], dict(options))
+        runtime = ControllerRuntime(self.hass, zone, store_options=lambda opts: self._store_options(zone, opts))
+        self.runtimes[zone_id] = runtime
+        self.hass.data[DOMAIN][zone.entry_id] = runtime
+        await runtime.start()
+
+    async def _stop_zone(self, zone_id: str, remove: bool = False):
+        for entity in self._entities.pop(zone_id, []):
+            if entity.hass is not None:
+                await entity.async_remove()
+        zone = self.zones.pop(zone_id)
+        runtime = self.runtimes.pop(zone_id)
+        self.hass.data[DOMAIN].pop(zone.entry_id, None)
+        await runtime.stop()
+        if remove:
+            from homeassistant.helpers import device_registry as dr
+
+            (await ControllerStateStore.async_get(self.hass)).remove(zone.entry_id)
+            registry = dr.async_get(self.hass)
+            device = registry.async_get_device(identifiers={(DOMAIN, zone.entry_id)})
+            if device is not None:
+                # removes the zone's entity registry entries with it
+                registry.async_remove_device(device.id)
+
+    def _store_options(self, zone: FleetZone, options: dict):
+        zone.options = options
+        zones = {**self.entry.options.get(CONF_ZONES, {}), zone.zone_id: options}
+        self.hass.config_entries.async_update_entry(self.entry, options={**self.entry.options, CONF_ZONES: zones})
+
+    def add_platform(self, build, async_add_entities):
+        """Add `build(hass, zone, full)` entities for every zone in one call; kept for reloads."""
+        self._platforms.append((build, async_add_entities))
+        self._add_entities(build, async_add_entities, list(self.zones))
+
+    def _add_entities(self, build, async_add_entities, zone_ids):
+        full = self.entity_set == ENTITIES_FULL
+        entities = []
+        for zone_id in zone_ids:
+            zone_entities = build(self.hass, self.zones[zone_id], full)
+            self._entities.setdefault(zone_id, []).extend(zone_entities)
+            entities.extend(zone_entities)
+        if entities:
+            # no update before add: polled sensors fill in on their first poll
+            async_add_entities(entities, False)
+
+    async def reload(self) -> dict:
+        """Re-read the fleet file; only added, removed and changed zones are touched.
+        A new entity set changes the platforms of the entry, so then the whole entry is reloaded."""
+        definitions, entity_set = await self.hass.async_add_executor_job(load_fleet_file, self.path)
+        if entity_set != self.entity_set:
+            self.hass.async_create_task(self.hass.config_entries.async_reload(self.entry.entry_id))
+            return {"entry_reloaded": True, "zones": len(definitions)}
+        old = self.definitions
+        removed = [z for z in old if z not in definitions]
+        added = [z for z in definitions if z not in old]
+        changed = [z for z in definitions if z in old and definitions[z] != old[z]]
+        await asyncio.gather(
+            *(self._stop_zone(z, remove=True) for z in removed),
+            *(self._stop_zone(z) for z in changed),
+        )
+        self.definitions, self.entity_set = definitions, entity_set
+        await asyncio.gather(*(self._start_zone(z) for z in added + changed))
+        for build, async_add_entities in self._platforms:
+            self._add_entities(build, async_add_entities, added + changed)
+        return {"added": added, "removed": removed, "changed": changed,
+                "unchanged": len(definitions) - len(added) - len(changed)}
+
+
+def add_zone_entities(hass: HomeAssistant, entry, async_add_entities, build):
+    """Platform setup for single entries and fleets alike: `build(hass, entry_or_zone, full)` returns a zone's entities."""
+    owner = hass.data[DOMAIN].get(entry.entry_id)
+    if isinstance(owner, FleetRuntime):
+        owner.add_platform(build, async_add_entities)
+    else:
+        async_add_entities(build(hass, entry, True), True)
@@ -0,0 +1,164 @@
+from __future__ import annotations
+from bisect import bisect_left, insort
+from collections import deque
+from datetime import datetime
+
+from homeassistant.const import STATE_UNAVAILABLE
+
+FILTER_NONE = "none"
+FILTER_EWMA = "ewma"
+FILTER_MEDIAN = "median"
+FILTER_KALMAN = "kalman"
+
+# consecutive all-outlier ticks after which a jump is accepted as a real change
+MAX_REJECT_STREAK = 3
+
+
+class PassThroughFilter:
+    def __init__(self, window: int = 1):
+        self.value: float | None = None
+
+    def update(self, x: float) -> float:
+        self.value = x
+        return x
+
+    def state(self) -> list:
+        return [self.value]
+
+    def load(self, state: list):
+        self.value = state[0]
+
+
+class EWMAFilter:
+    """Exponentially weighted moving average; alpha = 2 / (window + 1)."""
+    def __init__(self, window: int = 5):
+        self.alpha = 2.0 / (max(1, window) + 1)
+        self.value: float | None = None
+
+    def update(self, x: float) -> float:
+        self.value = x if self.value is None else self.value + self.alpha * (x - self.value)
+        return self.value
+
+    def state(self) -> list:
+        return [self.value]
+
+    def load(self, state: list):
+        self.value = state[0]
+
+
+class SlidingMedianFilter:
+    """Median of the last `window` samples; a FIFO plus a sorted index keeps updates at O(log n) search."""
+    def __init__(self, window: int = 5):
+        self._fifo = deque(maxlen=max(1, window))
+        self._sorted: list[float] = []
+        self.value: float | None = None
+
+    def update(self, x: float) -> float:
+        if len(self._fifo) == self._fifo.maxlen:
+            del self._sorted[bisect_left(self._sorted, self._fifo[0])]
+        self._fifo.append(x)
+        insort(self._sorted, x)
+        n = len(self._sorted)
+        mid = n // 2
+        self.value = self._sorted[mid] if n % 2 else (self._sorted[mid - 1] + self._sorted[mid]) / 2
+        return self.value
+
+    def state(self) -> list:
+        return list(self._fifo)
+
+    def load(self, state: list):
+        self._fifo.clear()
+        self._sorted.clear()
+        self.value = None
+        for x in state:
+            self.update(x)
+
+
+class ScalarKalmanFilter:
+    """Random-walk Kalman filter; process noise scaled so it smooths over roughly `window` samples."""
+    def __init__(self, window: int = 5, r: float = 0.04):
+        self.r = r
+        self.q = r / max(1, window) ** 2
+        self.value: float | None = None
+        self.p = 1.0
+
+    def update(self, x: float) -> float:
+        if self.value is None:
+            self.value, self.p = x, self.r
+            return x
+        p = self.p + self.q
+        k = p / (p + self.r)
+        self.value += k * (x - self.value)
+        self.p = (1 - k) * p
+        return self.value
+
+    def state(self) -> list:
+        return [self.value, self.p]
+
+    def load(self, state: list):
+        self.value, self.p = state
+
+
+FILTERS = {
+    FILTER_NONE: PassThroughFilter,
+    FILTER_EWMA: EWMAFilter,
+    FILTER_MEDIAN: SlidingMedianFilter,
+    FILTER_KALMAN: ScalarKalmanFilter,
+}
+
+
+class SensorFusion:
+    """Combines several temperature sensors into one filtered process variable.
+    Readings older than `max_age` seconds are ignored (0 disables the check). A reading further
+    than `outlier_threshold` from the median of all readings (or from the current estimate with
+    fewer than three sensors) is rejected, unless every reading has been rejected for
+    MAX_REJECT_STREAK ticks in a row, which is taken as a genuine step change.
+    """
+    def __init__(self, entity_ids, filter_type: str = FILTER_NONE, window: int = 5,
+                 max_age: float = 0.0, outlier_threshold: float = 0.0):
+        self.entity_ids = [entity_ids] if isinstance(entity_ids, str) else list(entity_ids)
+        self.filter = FILTERS.get(filter_type, PassThroughFilter)(int(window))
+        self.max_age = float(max_age)
+        self.outlier_threshold = float(outlier_threshold)
+        self.stale = 0
+        self.rejected = 0
+        self._reject_streak = 0
+
+    def update(self, states, now: datetime) -> float | None:
+        """Read the sensors from `states` (hass.states) and return the filtered value, or None."""
+        values = []
+        for entity_id in self.entity_ids:
+            state = states.get(entity_id)
+            if not state or state.state in (STATE_UNAVAILABLE, "unknown", None):
+                continue
+            # last_reported also moves when a sensor re-reports an unchanged value
+            seen = getattr(state, "last_reported", None) or state.last_updated
+            if self.max_age and (now - seen).total_seconds() > self.max_age:
+                self.stale += 1
+                continue
+            try:
+                values.append(float(state.state))
+            except (TypeError, ValueError):
+                continue
+        if not values:
+            return None
+
+        if self.outlier_threshold:
+            if len(values) >= 3:
+                ordered = sorted(values)
+                ref = ordered[len(ordered) // 2]
+            else:
+                ref = self.filter.value
+            if ref is not None:
+                accepted = [x for x in values if abs(x - ref) <= self.outlier_threshold]
+                self.rejected += len(values) - len(accepted)
+                if accepted:
+                    self._reject_streak = 0
+                    values = accepted
+                else:
+                    self._reject_streak += 1
+                    if self._reject_streak < MAX_REJECT_STREAK:
+                        return self.filter.value
+                    self._reject_streak = 0
+
+        return self.filter.update(sum(values) / len(values))
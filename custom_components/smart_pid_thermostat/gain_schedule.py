@@ -0,0 +1,82 @@
+from __future__ import annotations
+from bisect import bisect_right
+
+VAR_OUTDOOR = "outdoor"
+VAR_ERROR = "error"
+MODES = ("heat", "cool", "auto")
+
+
+class GainTable:
+    """kp/ki/kd breakpoints over one scheduling variable, sorted by x.
+    Segment slopes are precomputed, so a lookup is one bisect and one multiply-add per gain;
+    outside the table the end values hold.
+    """
+    def __init__(self, points):
+        points = sorted((float(x), float(kp), float(ki), float(kd)) for x, kp, ki, kd in points)
+        if not points:
+            raise ValueError("gain table needs at least one point")
+        self.xs = [p[0] for p in points]
+        self.ys = [p[1:] for p in points]
+        self.slopes = [
+            tuple((b - a) / (x1 - x0) if x1 > x0 else 0.0 for a, b in zip(y0, y1))
+            for x0, x1, y0, y1 in zip(self.xs, self.xs[1:], self.ys, self.ys[1:])
+        ]
+
+    def lookup(self, x: float) -> tuple[float, float, float]:
+        i = bisect_right(self.xs, x) - 1
+        if i < 0:
+            return self.ys[0]
+        if i >= len(self.slopes):
+            return self.ys[-1]
+        dx = x - self.xs[i]
+        return tuple(y + s * dx for y, s in zip(self.ys[i], self.slopes[i]))
+
+
+class GainSchedule:
+    """Gain tables keyed by mode. Each mode schedules on the outdoor temperature or on |error|.
+    In `auto` mode the heat table is used while the room is below target and the cool table above
+    it, falling back to an `auto` table.
+    """
+    def __init__(self, tables: dict[str, tuple[str, GainTable]]):
+        self.tables = tables
+
+    @classmethod
+    def from_config(cls, config) -> GainSchedule:
+        """{"heat": {"variable": "outdoor", "points": [[-10, 1.2, 0.02, 0.5], ...]}, "cool": {...}}
+        Points are [x, kp, ki, kd] lists or {"x", "kp", "ki", "kd"} dicts. Raises ValueError if malformed.
+        """
+        tables = {}
+        for mode, spec in (config or {}).items():
+            try:
+                if mode not in MODES:
+                    raise ValueError(f"unknown mode {mode!r}")
+                variable = spec.get("variable", VAR_OUTDOOR)
+                if variable not in (VAR_OUTDOOR, VAR_ERROR):
+                    raise ValueError(f"unknown variable {variable!r}")
+                points = [
+                    (p["x"], p["kp"], p["ki"], p["kd"]) if isinstance(p, dict) else tuple(p)
+                    for p in spec["points"]
+                ]
+                tables[mode] = (variable, GainTable(points))
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"invalid gain schedule for {mode!r}: {e}") from e
+        return cls(tables)
+
+    def __bool__(self) -> bool:
+        return bool(self.tables)
+
+    def select(self, mode: str, error: float) -> str | None:
+        """Table to use, or None if no table covers the mode (the fixed gains apply)."""
+        if mode == "auto":
+            preferred = "heat" if error > 0 else "cool"
+            candidates = (preferred, "auto")
+        else:
+            candidates = (mode, "auto")
+        return next((m for m in candidates if m in self.tables), None)
+
+    def lookup(self, key: str, error: float, outdoor: float | None) -> tuple | None:
+        """(kp, ki, kd) from table `key` at the operating point; None if its variable is unavailable."""
+        variable, table = self.tables[key]
+        if variable == VAR_ERROR:
+            return table.lookup(abs(error))
+        return None if outdoor is None else table.lookup(outdoor)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+from bisect import bisect_left
+from time import perf_counter
+
+# Upper bucket bounds in seconds: 10 log-spaced buckets per decade from 10 us to 100 s
+BOUNDS = tuple(10 ** (e / 10) for e in range(-50, 21))
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram; recording is one bisect and one increment."""
+    def __init__(self):
+        self.counts = [0] * (len(BOUNDS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, seconds: float):
+        self.counts[bisect_left(BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def percentile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th percentile (q in 0..100), in seconds."""
+        if not self.count:
+            return None
+        rank = q / 100 * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return BOUNDS[i] if i < len(BOUNDS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        def ms(v):
+            return None if v is None else round(v * 1000, 3)
+        return {
+            "count": self.count,
+            "p50_ms": ms(self.percentile(50)),
+            "p95_ms": ms(self.percentile(95)),
+            "p99_ms": ms(self.percentile(99)),
+            "max_ms": ms(self.max if self.count else None),
+            "mean_ms": ms(self.total / self.count if self.count else None),
+        }
+
+
+class RuntimeMetrics:
+    """Named latency histograms for one runtime."""
+    NAMES = ("loop", "sensor", "service_call", "setback", "restore", "schedule")
+
+    def __init__(self):
+        self.histograms = {name: LatencyHistogram() for name in self.NAMES}
+
+    def __getitem__(self, name: str) -> LatencyHistogram:
+        return self.histograms[name]
+
+    def timer(self, name: str):
+        return _Timer(self.histograms[name])
+
+    def as_dict(self) -> dict:
+        return {name: h.summary() for name, h in self.histograms.items()}
+
+
+class _Timer:
+    __slots__ = ("_hist", "_t0")
+
+    def __init__(self, hist: LatencyHistogram):
+        self._hist = hist
+
+    def __enter__(self):
+        self._t0 = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self._hist.record(perf_counter() - self._t0)
+        return False
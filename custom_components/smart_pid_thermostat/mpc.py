@@ -0,0 +1,139 @@
+from __future__ import annotations
+import math
+
+import numpy as np
+
+CONTROL_HORIZON = 5       # free setpoint moves; the setpoint holds after the last one
+OBSERVER_GAIN = 0.03      # smoothing of the offset estimate, per step
+
+
+class MPCController:
+    """Unconstrained linear MPC on a discrete FOPDT model, clamped to the setpoint limits.
+
+    Model, with the step `dt` equal to the loop interval and d = dead_time / dt steps:
+        y[k+1] = a*y[k] + b*u[k-d] + c,   a = exp(-dt/tau), b = gain*(1 - a)
+    The offset c (outdoor losses and model error) is estimated from the measurements, which
+    makes the controller offset-free. The state x = [y, u[k-1] .. u[k-D], c], D = max(d, 1),
+    is predicted `horizon` steps past the dead time. The cost is the squared tracking error plus
+    `move_penalty` times the squared setpoint changes. Only the first move of the optimum is used,
+    and it is linear in (target, x). configure() precomputes its coefficients, so step() is one
+    dot product and a clamp.
+    """
+    def __init__(self, model: dict, dt: float, horizon: int = 60, move_penalty: float = 10.0,
+                 u_min: float = -math.inf, u_max: float = math.inf):
+        self.u_min = u_min
+        self.u_max = u_max
+        self._key = None
+        self.configure(model, dt, horizon, move_penalty)
+
+    def configure(self, model: dict, dt: float, horizon: int = 60, move_penalty: float = 10.0):
+        """Rebuild the prediction and gain matrices if the model, step or horizon changed."""
+        key = (float(model["gain"]), float(model["tau"]), float(model["dead_time"]), float(dt),
+               int(horizon), float(move_penalty))
+        if key == self._key:
+            return
+        self._key = key
+        gain, tau, dead_time, dt, horizon, lam = key
+        self.dt = dt
+        self.horizon = horizon
+        self.a = a = math.exp(-dt / max(tau, 1e-6))
+        self.b = b = gain * (1 - a)
+        self.delay = d = int(round(dead_time / dt))
+        D = max(d, 1)
+        n = D + 2  # y, D past setpoints, c
+        A = np.zeros((n, n))
+        B = np.zeros(n)
+        A[0, 0] = a
+        A[0, n - 1] = 1.0
+        if d == 0:
+            B[0] = b
+        else:
+            A[0, D] = b
+        # shift register of past setpoints: u[k-1] <- u[k], u[k-i] <- u[k-i+1]
+        B[1] = 1.0
+        for i in range(2, D + 1):
+            A[i, i - 1] = 1.0
+        A[n - 1, n - 1] = 1.0
+
+        # Y = Phi x + Gamma U over the steps k+d+1 .. k+d+horizon, U = u[k] .. u[k+M-1]
+        M = max(1, min(CONTROL_HORIZON, horizon))
+        first = d + 1
+        steps = first + horizon - 1
+        Phi = np.zeros((horizon, n))
+        Ak = np.eye(n)
+        step_resp = np.zeros(steps)  # y, k+1 steps after a unit setpoint held from step 0
+        xs = np.zeros(n)
+        for k in range(1, steps + 1):
+            Ak = A @ Ak
+            xs = A @ xs + B
+            step_resp[k - 1] = xs[0]
+            if k >= first:
+                Phi[k - first] = Ak[0]
+        # u[k+j] for j < M-1 acts for exactly one step, the last move until the end
+        Gamma = np.zeros((horizon, M))
+        for i in range(horizon):
+            k = first + i
+            for j in range(M):
+                start = k - j  # steps the move at j has been acting at prediction step k
+                if start < 1:
+                    continue
+                if j < M - 1:
+                    Gamma[i, j] = step_resp[start - 1] - (step_resp[start - 2] if start >= 2 else 0.0)
+                else:
+                    Gamma[i, j] = step_resp[start - 1]
+
+        Dm = np.eye(M) - np.eye(M, k=-1)
+        H = Gamma.T @ Gamma + lam * Dm.T @ Dm
+        w = np.linalg.solve(H, np.eye(M)[0])  # first row of H^-1 (H is symmetric)
+        g = w @ Gamma.T
+        # u[k] = k_r * target + k_x @ x, the u[k-1] term comes from the move penalty
+        self.k_r = float(g.sum())
+        self.k_x = -(g @ Phi)
+        self.k_x[1] += lam * w[0]
+        self.Phi = Phi
+        self.Gamma = Gamma
+        self._x = np.zeros(n)
+        self._last_t: float | None = None
+        self._u: float | None = None
+
+    def reset(self):
+        self._x[:] = 0.0
+        self._last_t = None
+        self._u = None
+
+    def _advance(self, u: float):
+        """Shift the setpoint register one step, `u` being the setpoint applied during it."""
+        x = self._x
+        D = x.size - 2
+        y_next = self.a * x[0] + self.b * (u if self.delay == 0 else x[D]) + x[-1]
+        x[2:D + 1] = x[1:D].copy()
+        x[1] = u
+        return y_next
+
+    def step(self, y: float, target: float, applied: float | None, now: float) -> float:
+        """Setpoint for measurement `y`. `applied` is the setpoint the device currently holds
+        (whatever sent it). Gaps of several steps are replayed with it held; a call less than
+        half a step after the last one returns the last setpoint."""
+        x = self._x
+        steps = None if self._last_t is None else int(round((now - self._last_t) / self.dt))
+        if steps == 0 and self._u is not None:
+            return self._u
+        if steps is None or steps > self.delay + self.horizon:
+            # (re)start assuming the room is at rest with the device holding `applied`
+            u0 = y if applied is None else applied
+            x[0] = y
+            x[1:-1] = u0
+            x[-1] = y - self.a * y - self.b * u0
+        else:
+            u = x[1] if applied is None else applied
+            y_pred = x[0]
+            for _ in range(steps):
+                x[0] = y_pred
+                y_pred = self._advance(u)
+            # offset estimate from the prediction residual
+            x[-1] += OBSERVER_GAIN * (y - y_pred)
+            x[0] = y
+        self._last_t = now
+        u = self.k_r * target + float(self.k_x @ x)
+        self._u = min(self.u_max, max(self.u_min, u))
+        return self._u
@@ -8,13 +8,20 @@ from homeassistant.helpers.entity import DeviceInfo
 from .const import *
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
-    async_add_entities([
-        PIDNumber(hass, entry, CONF_TARGET, "Target Temperature", 5, 35, 0.1),
-        PIDNumber(hass, entry, CONF_KP, "Kp", 0, 10, 0.01),
-        PIDNumber(hass, entry, CONF_KI, "Ki", 0, 2, 0.001),
-        PIDNumber(hass, entry, CONF_KD, "Kd", 0, 10, 0.01),
-        PIDNumber(hass, entry, CONF_DEADBAND, "Deadband", 0, 2, 0.1),
-    ], True)
+    from .fleet import add_zone_entities
+
+    add_zone_entities(hass, entry, async_add_entities, _build)
+
+def _build(hass: HomeAssistant, entry: ConfigEntry, full: bool) -> list:
+    entities = [PIDNumber(hass, entry, CONF_TARGET, "Target Temperature", 5, 35, 0.1)]
+    if full:
+        entities += [
+            PIDNumber(hass, entry, CONF_KP, "Kp", 0, 10, 0.01),
+            PIDNumber(hass, entry, CONF_KI, "Ki", 0, 2, 0.001),
+            PIDNumber(hass, entry, CONF_KD, "Kd", 0, 10, 0.01),
+            PIDNumber(hass, entry, CONF_DEADBAND, "Deadband", 0, 2, 0.1),
+        ]
+    return entities
 
 class PIDNumber(NumberEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry, key: str, name: str, min_v: float, max_v: float, step: float):
@@ -30,15 +37,13 @@ class PIDNumber(NumberEntity):
 
     @property
     def value(self):
-        cfg = {**DEFAULTS, **self._entry.data, **self._entry.options}
-        return cfg[self._key]
+        # runtime.cfg is the cached merged {**DEFAULTS, **data, **options} view, including unsaved edits
+        return self._hass.data[DOMAIN][self._entry.entry_id].cfg[self._key]
 
     async def async_set_value(self, value: float):
-        opts = {**self._entry.options}
-        opts[self._key] = float(value)
-        self._hass.config_entries.async_update_entry(self._entry, options=opts)
         runtime = self._hass.data[DOMAIN][self._entry.entry_id]
-        runtime.update_config()
+        runtime.set_option(self._key, float(value))
+        self.async_write_ha_state()
 
     @property
     def device_info(self) -> DeviceInfo:
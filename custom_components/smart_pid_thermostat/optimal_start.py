@@ -0,0 +1,115 @@
+from __future__ import annotations
+import logging
+
+_LOGGER = logging.getLogger(__name__)
+
+# prior before anything is learned: 20 minutes per degree of change
+DEFAULT_SECONDS_PER_DEGREE = 1200.0
+
+
+class RateModel:
+    """Recursive least squares fit of seconds-per-degree = a + b * (indoor - outdoor).
+    Each observation costs a handful of float operations; `forgetting` < 1 lets the model
+    follow seasonal drift by weighting recent warm-ups more.
+    """
+    def __init__(self, forgetting: float = 0.95, p0: float = 1e4):
+        self.forgetting = forgetting
+        self.p0 = p0
+        self.reset()
+
+    def reset(self):
+        self.theta = [DEFAULT_SECONDS_PER_DEGREE, 0.0]
+        self.p = [[self.p0, 0.0], [0.0, self.p0]]
+        self.samples = 0
+
+    def predict(self, dx: float) -> float:
+        a, b = self.theta
+        return a + b * dx
+
+    def update(self, dx: float, y: float):
+        # phi = [1, dx]; standard RLS with exponential forgetting
+        (p00, p01), (p10, p11) = self.p
+        lam = self.forgetting
+        pp0 = p00 + p01 * dx
+        pp1 = p10 + p11 * dx
+        denom = lam + pp0 + dx * pp1
+        k0, k1 = pp0 / denom, pp1 / denom
+        err = y - self.predict(dx)
+        self.theta = [self.theta[0] + k0 * err, self.theta[1] + k1 * err]
+        # P = (P - k phi^T P) / lam ; phi^T P = [pp0, pp1] by symmetry
+        self.p = [[(p00 - k0 * pp0) / lam, (p01 - k0 * pp1) / lam],
+                  [(p10 - k1 * pp0) / lam, (p11 - k1 * pp1) / lam]]
+        self.samples += 1
+
+    def state(self) -> list:
+        return [self.theta, self.p, self.samples]
+
+    def load(self, state: list):
+        self.theta, self.p, self.samples = [list(state[0]), [list(r) for r in state[1]], int(state[2])]
+
+
+class OptimalStart:
+    """Predicts how early a schedule transition must start so the room is on target in time,
+    and learns from every transition by timing how long the room takes to get there.
+    Heating and cooling are learned separately.
+    """
+    def __init__(self, max_lead: float = 10800.0, band: float = 0.2):
+        self.max_lead = float(max_lead)
+        self.band = float(band)
+        self.heat = RateModel()
+        self.cool = RateModel()
+        self.next_lead: float | None = None   # seconds, for the next transition
+        self.last_error: float | None = None  # seconds; actual minus predicted duration
+        # (started_at, start_ambient, target, dx, predicted duration) of the warm-up in progress
+        self._active: tuple | None = None
+
+    def _model(self, lift: float) -> RateModel:
+        return self.heat if lift > 0 else self.cool
+
+    def lead(self, ambient: float | None, target: float, outdoor: float | None) -> float:
+        """Seconds to start ahead of a transition to `target`; 0 when already there."""
+        if ambient is None or abs(target - ambient) <= self.band:
+            return 0.0
+        lift = target - ambient
+        dx = ambient - outdoor if outdoor is not None else 0.0
+        lead = abs(lift) * self._model(lift).predict(dx)
+        return min(self.max_lead, max(0.0, lead))
+
+    def begin(self, now: float, ambient: float | None, target: float, outdoor: float | None):
+        """A transition to `target` was applied at `now` (wall seconds); start timing it."""
+        if ambient is None or abs(target - ambient) <= self.band:
+            self._active = None
+            return
+        dx = ambient - outdoor if outdoor is not None else 0.0
+        self._active = (now, ambient, target, dx, self.lead(ambient, target, outdoor))
+
+    def observe(self, now: float, ambient: float) -> bool:
+        """Feed a reading; returns True when a warm-up completed and the model was updated."""
+        if self._active is None:
+            return False
+        started, ambient0, target, dx, predicted = self._active
+        lift = target - ambient0
+        elapsed = now - started
+        if elapsed > 2 * self.max_lead:
+            # never got there (e.g. the climate was off); do not learn from it
+            self._active = None
+            return False
+        if (ambient - target) * (1 if lift > 0 else -1) < -self.band:
+            return False
+        self._active = None
+        self._model(lift).update(dx, elapsed / abs(lift))
+        self.last_error = elapsed - predicted
+        _LOGGER.debug("Warm-up of %.1f degC took %.0f s (predicted %.0f s)", lift, elapsed, predicted)
+        return True
+
+    def state(self) -> list:
+        return [self.heat.state(), self.cool.state(), self.last_error]
+
+    def load(self, state: list):
+        try:
+            self.heat.load(state[0])
+            self.cool.load(state[1])
+            self.last_error = state[2]
+        except (IndexError, TypeError, ValueError):
+            self.heat.reset()
+            self.cool.reset()
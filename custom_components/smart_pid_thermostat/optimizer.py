@@ -0,0 +1,151 @@
+from __future__ import annotations
+import asyncio
+import logging
+import math
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from .simulator import FOPDTPlant, run_scenario
+
+_LOGGER = logging.getLogger(__name__)
+
+# coarse grid, as multiples of the starting gains, searched before the simplex refinement
+GRID_KP = (0.25, 0.5, 1.0, 2.0, 4.0)
+GRID_KI = (0.1, 0.3, 1.0, 3.0, 10.0)
+GRID_KD = (0.25, 1.0, 4.0)
+# search bounds in log10 space
+LOG_BOUNDS = ((-3.0, 1.5), (-7.0, 0.0), (-3.0, 4.0))
+
+DEFAULT_WEIGHTS = {"overshoot": 2.0, "settling": 1.0, "commands": 0.05}
+
+
+def scenario_settings(model: dict, target: float, interval: float, deadband: float,
+                      min_temp: float, max_temp: float, step: float = 3.0) -> dict:
+    """Closed-loop step test matching a zone's configuration: the room starts `step` degC below target."""
+    # long enough to see the loop settle, but bounded so one evaluation stays cheap
+    duration = min(2 * 86400.0, max(6 * 3600.0, 15 * (model["tau"] + model["dead_time"])))
+    return {
+        "target": float(target),
+        "initial": float(target) - step,
+        "outdoor": float(target) - 12.0,
+        "duration": duration,
+        "interval": float(interval),
+        "deadband": float(deadband),
+        "min_temp": float(min_temp),
+        "max_temp": float(max_temp),
+        # real sensors report in steps; without it the search rewards derivative gains no room can use
+        "sensor_step": 0.1,
+    }
+
+
+def cost(metrics: dict, duration: float, weights: dict) -> float:
+    """Weighted sum of overshoot (degC), settling time (h; the whole run if never settled) and commands per hour."""
+    settle = metrics["settling_time"]
+    settle_h = (duration if settle is None else settle) / 3600.0
+    return (weights["overshoot"] * max(0.0, metrics["overshoot"])
+            + weights["settling"] * settle_h
+            + weights["commands"] * metrics["commands"] * 3600.0 / duration)
+
+
+def evaluate(model: dict, settings: dict, weights: dict, candidates: list[tuple]) -> list[tuple[float, dict]]:
+    """Simulate each (kp, ki, kd) candidate; runs in a worker process."""
+    out = []
+    for kp, ki, kd in candidates:
+        plant = FOPDTPlant(model["gain"], model["tau"], model["dead_time"],
+                           outdoor=settings["outdoor"], initial=settings["initial"])
+        metrics = run_scenario(
+            plant, kp, ki, kd,
+            target=settings["target"], duration=settings["duration"], interval=settings["interval"],
+            deadband=settings["deadband"], min_temp=settings["min_temp"], max_temp=settings["max_temp"],
+            settle_band=settings["deadband"] + 0.2, sensor_step=settings["sensor_step"],
+        )
+        out.append((cost(metrics, settings["duration"], weights), metrics))
+    return out
+
+
+def _to_gains(x) -> tuple:
+    return tuple(10 ** min(hi, max(lo, v)) for v, (lo, hi) in zip(x, LOG_BOUNDS))
+
+
+def _to_log(gains) -> list[float]:
+    return [math.log10(max(g, 10 ** lo)) for g, (lo, _) in zip(gains, LOG_BOUNDS)]
+
+
+class GainOptimizer:
+    """Searches kp/ki/kd for one FOPDT model: a coarse grid around the starting gains, then a
+    Nelder-Mead simplex in log10 gain space. Each simplex step evaluates its reflection, expansion
+    and both contractions at once so the pool stays busy. Simulations run in worker processes."""
+    def __init__(self, model: dict, settings: dict, weights: dict | None = None, workers: int | None = None):
+        self.model = model
+        self.settings = settings
+        self.weights = {**DEFAULT_WEIGHTS, **(weights or {})}
+        self.workers = max(1, workers or min(4, os.cpu_count() or 1))
+        self.evaluations = 0
+        self._cache: dict[tuple, tuple[float, dict]] = {}
+        self._executor: ProcessPoolExecutor | None = None
+
+    async def _evaluate(self, points: list) -> list[float]:
+        gains = [_to_gains(x) for x in points]
+        keys = [tuple(round(g, 6) for g in gs) for gs in gains]
+        todo = list(dict.fromkeys(k for k in keys if k not in self._cache))
+        if todo:
+            loop = asyncio.get_running_loop()
+            # a handful of chunks: one simulation is only milliseconds, far below the IPC cost
+            n = min(self.workers, len(todo))
+            chunks = [todo[i::n] for i in range(n)]
+            results = await asyncio.gather(*(
+                loop.run_in_executor(self._executor, evaluate, self.model, self.settings, self.weights, chunk)
+                for chunk in chunks
+            ))
+            for chunk, res in zip(chunks, results):
+                self._cache.update(zip(chunk, res))
+            self.evaluations += len(todo)
+        return [self._cache[k][0] for k in keys]
+
+    async def async_run(self, start: tuple, current: tuple | None = None, max_iter: int = 40) -> dict:
+        ctx = multiprocessing.get_context("spawn")  # never fork the running Home Assistant process
+        self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=ctx)
+        try:
+            return await self._search(start, current, max_iter)
+        finally:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    async def _search(self, start: tuple, current: tuple | None, max_iter: int) -> dict:
+        base = _to_log(start)
+        grid = [[base[0] + math.log10(a), base[1] + math.log10(b), base[2] + math.log10(c)]
+                for a in GRID_KP for b in GRID_KI for c in GRID_KD]
+        if current:
+            grid.append(_to_log(current))
+        costs = await self._evaluate(grid)
+        best = grid[min(range(len(grid)), key=costs.__getitem__)]
+
+        simplex = [best] + [[v + (0.3 if i == j else 0.0) for j, v in enumerate(best)] for i in range(3)]
+        f = await self._evaluate(simplex)
+        for _ in range(max_iter):
+            order = sorted(range(4), key=f.__getitem__)
+            simplex, f = [simplex[i] for i in order], [f[i] for i in order]
+            if f[-1] - f[0] <= 1e-3 * max(1.0, abs(f[0])):
+                break
+            worst = simplex[-1]
+            c = [sum(p[k] for p in simplex[:-1]) / 3 for k in range(3)]
+            d = [ck - wk for ck, wk in zip(c, worst)]
+            xr, xe, xoc, xic = ([ck + s * dk for ck, dk in zip(c, d)] for s in (1.0, 2.0, 0.5, -0.5))
+            fr, fe, foc, fic = await self._evaluate([xr, xe, xoc, xic])
+            if fr < f[0]:
+                simplex[-1], f[-1] = (xe, fe) if fe < fr else (xr, fr)
+            elif fr < f[-2]:
+                simplex[-1], f[-1] = xr, fr
+            elif fr < f[-1] and foc <= fr:
+                simplex[-1], f[-1] = xoc, foc
+            elif fr >= f[-1] and fic < f[-1]:
+                simplex[-1], f[-1] = xic, fic
+            else:
+                simplex = [simplex[0]] + [[b + 0.5 * (v - b) for b, v in zip(simplex[0], p)] for p in simplex[1:]]
+                f = [f[0]] + await self._evaluate(simplex[1:])
+
+        i = min(range(4), key=f.__getitem__)
+        kp, ki, kd = _to_gains(simplex[i])
+        score, metrics = self._cache[tuple(round(g, 6) for g in (kp, ki, kd))]
+        return {"kp": kp, "ki": ki, "kd": kd, "cost": score, "metrics": metrics, "evaluations": self.evaluations}
@@ -2,25 +2,55 @@ from __future__ import annotations
 import time
 
 class PIDController:
-    def __init__(self, kp: float, ki: float, kd: float, out_min=None, out_max=None):
+    def __init__(self, kp: float, ki: float, kd: float, out_min=None, out_max=None,
+                 nominal_dt: float = 1.0, max_dt: float | None = None):
         self.kp = float(kp)
         self.ki = float(ki)
         self.kd = float(kd)
         self.out_min = out_min
         self.out_max = out_max
+        # step assumed for the first update, and the longest step integrated at once
+        # (a gap longer than that, e.g. while disabled, must not dump into the integral)
+        self.nominal_dt = float(nominal_dt)
+        self.max_dt = max_dt
         self.reset()
 
     def reset(self):
         self._i = 0.0
         self._last_error = None
         self._last_t = None
+        # terms of the last update, for telemetry
+        self.p_term = 0.0
+        self.d_term = 0.0
+
+    def set_gains(self, kp: float, ki: float, kd: float, bumpless: bool = True):
+        """Change gains; with `bumpless` the integral absorbs the change of the P term at the
+        last error, so the output does not step. (The integral already carries ki, so a ki
+        change needs no correction.)"""
+        kp = float(kp)
+        if bumpless and self._last_error is not None:
+            self._i += (self.kp - kp) * self._last_error
+        self.kp = kp
+        self.ki = float(ki)
+        self.kd = float(kd)
+
+    def state(self) -> tuple:
+        """(integral, last error, last update time) for persisting the controller."""
+        return (self._i, self._last_error, self._last_t)
+
+    def load_state(self, i: float, last_error: float | None, last_t: float | None):
+        self._i = float(i)
+        self._last_error = last_error
+        self._last_t = last_t
 
     def update(self, error: float, now: float | None = None) -> float:
         t = now if now is not None else time.monotonic()
         if self._last_t is None:
-            dt = 1.0
+            dt = self.nominal_dt
         else:
             dt = max(1e-3, t - self._last_t)
+            if self.max_dt is not None:
+                dt = min(dt, self.max_dt)
         self._last_t = t
 
         # P
@@ -35,6 +65,8 @@ class PIDController:
             d = self.kd * (error - self._last_error) / dt
         self._last_error = error
 
+        self.p_term = p
+        self.d_term = d
         out = p + self._i + d
         # clamp output and reflect on integral if clamped
         if self.out_min is not None and out < self.out_min:
@@ -0,0 +1,94 @@
+from __future__ import annotations
+import asyncio
+import cProfile
+import io
+import os
+import pstats
+import tracemalloc
+
+# runtime methods timed while a session is attached; `_prepare` runs once per loop run in every mode
+HOOKS = ("_loop", "_prepare", "_apply_output", "_set_all_climates_temperature", "_set_all_climates_fan_mode")
+TICK_HOOK = "_prepare"
+PACKAGE_DIR = os.path.dirname(__file__)
+
+
+class ProfileSession:
+    """cProfile and tracemalloc over a runtime's loop and service-call helpers.
+
+    attach() shadows the HOOKS methods on the runtime instance with instrumented wrappers and
+    detach() removes them again, so nothing is installed while no session runs. Profiling is
+    enabled from entering the outermost hooked call until it returns. Other tasks that run while
+    it awaits (e.g. the climate service calls) are included. tracemalloc traces the whole process
+    during the session; the snapshot keeps allocations with this integration anywhere in their traceback.
+    Taking and filtering it is left to write(), off the event loop, and finish() stops tracing after that.
+    """
+    def __init__(self, prefix: str, ticks: int | None = None, frames: int = 10):
+        self.prefix = prefix
+        self.ticks = ticks
+        self.frames = frames
+        self.count = 0
+        self.done = asyncio.Event()
+        self._profile = cProfile.Profile()
+        self._depth = 0
+        self._snapshot: tracemalloc.Snapshot | None = None
+        self._own_tracing = False
+        self._runtime = None
+
+    def attach(self, runtime):
+        self._runtime = runtime
+        self._own_tracing = not tracemalloc.is_tracing()
+        if self._own_tracing:
+            tracemalloc.start(self.frames)
+        for name in HOOKS:
+            setattr(runtime, name, self._wrap(getattr(runtime, name), name == TICK_HOOK))
+
+    def detach(self):
+        runtime, self._runtime = self._runtime, None
+        if runtime is None:
+            return
+        for name in HOOKS:
+            runtime.__dict__.pop(name, None)
+        if self._depth:
+            self._profile.disable()
+            self._depth = 0
+
+    def finish(self):
+        """Stop tracemalloc if attach() started it; call once write() returned."""
+        if self._own_tracing and tracemalloc.is_tracing():
+            tracemalloc.stop()
+        self._own_tracing = False
+
+    def _wrap(self, method, counts_tick: bool):
+        async def wrapper(*args, **kwargs):
+            if self._depth == 0:
+                self._profile.enable()
+            self._depth += 1
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                self._depth -= 1
+                if self._depth == 0:
+                    self._profile.disable()
+                if counts_tick:
+                    self.count += 1
+                    if self.ticks and self.count >= self.ticks:
+                        self.done.set()
+        return wrapper
+
+    def write(self, top: int = 10) -> dict:
+        """Snapshot the traced allocations and write <prefix>.pstats and <prefix>.tracemalloc;
+        blocking, run in an executor."""
+        if tracemalloc.is_tracing():
+            self._snapshot = tracemalloc.take_snapshot().filter_traces(
+                [tracemalloc.Filter(True, os.path.join(PACKAGE_DIR, "*"), all_frames=True)]
+            )
+        out = {"ticks": self.count, "pstats": f"{self.prefix}.pstats"}
+        self._profile.dump_stats(out["pstats"])
+        buf = io.StringIO()
+        pstats.Stats(self._profile, stream=buf).sort_stats("cumulative").print_stats(top)
+        out["top"] = buf.getvalue()
+        if self._snapshot is not None:
+            out["tracemalloc"] = f"{self.prefix}.tracemalloc"
+            self._snapshot.dump(out["tracemalloc"])
+            out["allocated_kib"] = round(sum(s.size for s in self._snapshot.statistics("filename")) / 1024, 1)
+        return out
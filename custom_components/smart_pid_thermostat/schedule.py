@@ -0,0 +1,265 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import logging
+from bisect import bisect_right
+from datetime import datetime, time as dtime, timedelta
+from typing import NamedTuple
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_track_point_in_utc_time
+from homeassistant.util import dt as dt_util
+
+from .const import DATA_SCHEDULE_ENGINE
+
+_LOGGER = logging.getLogger(__name__)
+
+DAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+DAY_GROUPS = {
+    "daily": DAYS,
+    "weekdays": DAYS[:5],
+    "weekend": DAYS[5:],
+}
+# longest the engine sleeps without re-deriving due times from the wall clock,
+# so clock jumps and time zone changes are picked up within this delay
+RESYNC = timedelta(minutes=15)
+
+
+class Period(NamedTuple):
+    offset: int               # seconds since Monday 00:00 local time
+    temperature: float
+    fan_mode: str | None
+    label: str
+
+
+def parse_hms(hms: str) -> dtime:
+    parts = [int(p) for p in str(hms).split(":")]
+    while len(parts) < 3:
+        parts.append(0)
+    return dtime(parts[0], parts[1], parts[2])
+
+
+def _day(name: str) -> int:
+    try:
+        return DAYS.index(name.strip()[:3])
+    except ValueError:
+        raise ValueError(f"unknown day {name!r}") from None
+
+
+def _parse_days(spec) -> list[int]:
+    items = spec if isinstance(spec, (list, tuple)) else str(spec).split(",")
+    days = set()
+    for item in (str(i).strip().lower() for i in items):
+        if item in DAY_GROUPS:
+            days.update(DAYS.index(d) for d in DAY_GROUPS[item])
+        elif "-" in item:
+            first, last = (_day(d) for d in item.split("-", 1))
+            # ranges may wrap around the end of the week, e.g. fri-mon
+            days.update(d % 7 for d in range(first, last + 1 if last >= first else last + 8))
+        else:
+            days.add(_day(item))
+    return sorted(days)
+
+
+def _second_of_week(local: datetime) -> float:
+    return local.weekday() * 86400 + local.hour * 3600 + local.minute * 60 + local.second + local.microsecond / 1e6
+
+
+class WeeklySchedule:
+    """Weekly schedule compiled into periods sorted by their start offset within the week.
+    The period in effect at any time is one bisect; the period before the first start of the
+    week is the last one of the previous week.
+    """
+    def __init__(self, periods):
+        self.periods = sorted(periods, key=lambda p: p.offset)
+        self._offsets = [p.offset for p in self.periods]
+
+    @classmethod
+    def from_rules(cls, rules) -> WeeklySchedule:
+        """Rules are dicts: {"days": "mon-fri", "time": "06:30", "temperature": 22, "fan_mode": "low"}.
+        `days` takes day names, ranges, lists, or daily/weekdays/weekend (default daily).
+        Raises ValueError for malformed rules.
+        """
+        periods = {}
+        for rule in rules or ():
+            try:
+                t = parse_hms(rule["time"])
+                temperature = float(rule["temperature"])
+                days = _parse_days(rule.get("days", "daily"))
+            except (KeyError, TypeError, ValueError) as e:
+                raise ValueError(f"invalid schedule rule {rule!r}: {e}") from e
+            secs = t.hour * 3600 + t.minute * 60 + t.second
+            for day in days:
+                offset = day * 86400 + secs
+                # later rules override earlier ones starting at the same moment
+                periods[offset] = Period(offset, temperature, rule.get("fan_mode"), rule.get("label", "schedule"))
+        return cls(periods.values())
+
+    @classmethod
+    def daily(cls, setback_time: str, setback_temp: float, restore_time: str, restore_temp: float,
+              restore_fan: str | None = None) -> WeeklySchedule:
+        """The legacy single setback/restore pair, every day of the week."""
+        rules = [
+            {"time": setback_time, "temperature": setback_temp, "label": "setback"},
+            {"time": restore_time, "temperature": restore_temp, "fan_mode": restore_fan, "label": "restore"},
+        ]
+        return cls.from_rules(rules)
+
+    def __len__(self) -> int:
+        return len(self.periods)
+
+    def current(self, when: datetime) -> Period | None:
+        """Period in effect at `when` (any aware datetime)."""
+        if not self.periods:
+            return None
+        # index -1 wraps to the last period of the previous week
+        return self.periods[bisect_right(self._offsets, _second_of_week(dt_util.as_local(when))) - 1]
+
+    def next_transition(self, when: datetime) -> datetime | None:
+        """First period start strictly after `when`, in UTC."""
+        n = len(self._offsets)
+        if not n:
+            return None
+        local = dt_util.as_local(when)
+        monday = local.date() - timedelta(days=local.weekday())
+        idx = bisect_right(self._offsets, _second_of_week(local))
+        # wall times are resolved in the local zone on their own date, so DST is applied per
+        # transition; a wall time repeated by a DST fall-back can resolve before `when`, hence the scan
+        for k in range(idx, idx + n + 1):
+            week, i = divmod(k, n)
+            offset = self._offsets[i]
+            day = monday + timedelta(days=week * 7 + offset // 86400)
+            secs = offset % 86400
+            at = datetime.combine(day, dtime(secs // 3600, secs % 3600 // 60, secs % 60), tzinfo=local.tzinfo)
+            at = dt_util.as_utc(at)
+            if at > when:
+                return at
+        return None
+
+
+class _Entry:
+    __slots__ = ("schedule", "action", "lead", "due", "transition", "fired")
+
+    def __init__(self, schedule, action, lead):
+        self.schedule = schedule
+        self.action = action
+        self.lead = lead
+        self.due: datetime | None = None          # when to fire: the transition minus its lead
+        self.transition: datetime | None = None
+        self.fired: datetime | None = None        # last transition handled (possibly early)
+
+
+class ScheduleEngine:
+    """Runs the weekly schedules of every runtime off one timer.
+    Each schedule's next transition sits in a heap; only the earliest is armed. A schedule may
+    supply `lead(period)`, the seconds to start ahead of a transition (optimal start); it is
+    re-evaluated whenever due times are re-derived. When a transition fires, the action receives
+    the period in effect at max(now, transition), so one skipped by a clock jump still lands on
+    the right target.
+    """
+    def __init__(self, hass: HomeAssistant):
+        self.hass = hass
+        self._entries: dict[object, _Entry] = {}
+        self._heap: list[tuple[datetime, int, object]] = []
+        self._seq = 0
+        self._timer = None
+        self._armed: datetime | None = None
+
+    @classmethod
+    def get(cls, hass: HomeAssistant) -> ScheduleEngine:
+        engine = hass.data.get(DATA_SCHEDULE_ENGINE)
+        if engine is None:
+            engine = hass.data[DATA_SCHEDULE_ENGINE] = cls(hass)
+        return engine
+
+    def add(self, key, schedule: WeeklySchedule, action, lead=None):
+        """Call `action(period, transition)` at each transition of `schedule`, `lead(period)` seconds early.
+        Returns an unsubscribe callable.
+        """
+        entry = self._entries[key] = _Entry(schedule, action, lead)
+        self._push(key, entry, dt_util.utcnow())
+        self._arm()
+        return lambda: self.remove(key)
+
+    def remove(self, key):
+        # heap items of removed entries are skipped lazily
+        if self._entries.pop(key, None) is not None and not self._entries:
+            self._cancel()
+            self._heap.clear()
+
+    def next_due(self, key) -> datetime | None:
+        entry = self._entries.get(key)
+        return entry.due if entry else None
+
+    def _push(self, key, entry: _Entry, now: datetime):
+        # a transition started early is not due again once its time arrives
+        after = now if entry.fired is None or entry.fired < now else entry.fired
+        entry.transition = entry.due = entry.schedule.next_transition(after)
+        if entry.transition is not None and entry.lead:
+            lead = entry.lead(entry.schedule.current(entry.transition))
+            if lead:
+                entry.due = max(now, entry.transition - timedelta(seconds=lead))
+        if entry.due is not None:
+            self._seq += 1
+            heapq.heappush(self._heap, (entry.due, self._seq, key))
+
+    def _live(self, item) -> bool:
+        entry = self._entries.get(item[2])
+        return entry is not None and entry.due == item[0]
+
+    def _cancel(self):
+        if self._timer:
+            self._timer()
+        self._timer = None
+        self._armed = None
+
+    @callback
+    def _arm(self):
+        while self._heap and not self._live(self._heap[0]):
+            heapq.heappop(self._heap)
+        if not self._heap:
+            self._cancel()
+            return
+        at = min(self._heap[0][0], dt_util.utcnow() + RESYNC)
+        if self._armed is not None and self._armed <= at:
+            return
+        self._cancel()
+        self._armed = at
+        self._timer = async_track_point_in_utc_time(self.hass, self._fire, at)
+
+    @callback
+    def _resync(self, now: datetime):
+        # re-derive every due time from the wall clock (clock or time zone changed)
+        self._heap.clear()
+        for key, entry in self._entries.items():
+            self._push(key, entry, now)
+
+    async def _fire(self, now: datetime):
+        self._timer = None
+        self._armed = None
+        now = dt_util.utcnow()
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            item = heapq.heappop(self._heap)
+            if self._live(item):
+                due.append(item[2])
+        if not due:
+            self._resync(now)
+        fired = []
+        for key in due:
+            entry = self._entries[key]
+            entry.fired = entry.transition
+            fired.append((key, entry.transition))
+            self._push(key, entry, now)
+        self._arm()
+
+        # zones sharing a transition switch together
+        runs = []
+        for key, transition in fired:
+            entry = self._entries.get(key)
+            if entry is not None:
+                runs.append((key, entry.action(entry.schedule.current(max(now, transition)), transition)))
+        results = await asyncio.gather(*(run for _, run in runs), return_exceptions=True)
+        for (key, _), result in zip(runs, results):
+            if isinstance(result, Exception):
+                _LOGGER.error("Schedule transition for %s failed: %s", key, result, exc_info=result)
@@ -0,0 +1,178 @@
+from __future__ import annotations
+import asyncio
+import heapq
+import logging
+import math
+
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.event import async_call_at
+
+from .const import DATA_SCHEDULER
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _van_der_corput(n: int) -> float:
+    # 0, 1/2, 1/4, 3/4, 1/8, ... : every prefix is spread evenly over [0, 1)
+    q, denom = 0.0, 1.0
+    while n:
+        denom *= 2
+        n, bit = divmod(n, 2)
+        q += bit / denom
+    return q
+
+
+class _Job:
+    __slots__ = ("key", "interval", "action", "batch", "due", "tick")
+
+    def __init__(self, key, interval, action, batch):
+        self.key = key
+        self.interval = interval
+        self.action = action
+        self.batch = batch
+        self.due = 0.0
+        self.tick = 0
+
+
+class DomainScheduler:
+    """One hashed timer wheel for the periodic loops of every runtime.
+    Jobs are hashed into ticks of `resolution` seconds and only the next non-empty tick is
+    armed. Jobs with the same interval get phases spread evenly across that interval, and all
+    jobs landing in one tick run together. Jobs sharing a `batch` runner share a phase and are
+    handed to it as one list so a vectorized engine can process them in one update.
+    A job's interval can be changed between runs with reschedule() (adaptive sampling).
+    """
+    def __init__(self, hass: HomeAssistant, resolution: float = 1.0):
+        self.hass = hass
+        self.resolution = resolution
+        self._wheel: dict[int, list[_Job]] = {}
+        self._ticks: list[int] = []
+        self._jobs: dict[object, _Job] = {}
+        self._phase_counts: dict[float, int] = {}
+        self._batch_phases: dict[tuple, float] = {}
+        self._timer = None
+        self._armed_tick: int | None = None
+        self.last_lag = 0.0
+        self.max_lag = 0.0
+        self.tick_count = 0
+
+    @classmethod
+    def get(cls, hass: HomeAssistant) -> DomainScheduler:
+        scheduler = hass.data.get(DATA_SCHEDULER)
+        if scheduler is None:
+            scheduler = hass.data[DATA_SCHEDULER] = cls(hass)
+        return scheduler
+
+    def add(self, key, interval: float, action, batch=None):
+        """Run `action(now)` every `interval` seconds, or `batch(keys, now)` for all due jobs sharing `batch`.
+        Returns an unsubscribe callable.
+        """
+        interval = max(self.resolution, float(interval))
+        job = _Job(key, interval, action, batch)
+        phase = self._phase(interval, batch)
+        now = self.hass.loop.time()
+        due = math.floor(now / interval) * interval + phase
+        if due <= now:
+            due += interval
+        self._jobs[key] = job
+        self._place(job, due)
+        self._arm()
+        return lambda: self.remove(key)
+
+    def _phase(self, interval: float, batch) -> float:
+        # batched jobs share one phase per runner so they stay in the same tick
+        if batch is not None and (batch, interval) in self._batch_phases:
+            return self._batch_phases[(batch, interval)]
+        n = self._phase_counts.get(interval, 0)
+        self._phase_counts[interval] = n + 1
+        phase = _van_der_corput(n) * interval
+        if batch is not None:
+            self._batch_phases[(batch, interval)] = phase
+        return phase
+
+    def reschedule(self, key, interval: float):
+        """Change a job's interval. Its next run moves to the last run plus the new interval."""
+        job = self._jobs.get(key)
+        interval = max(self.resolution, float(interval))
+        if job is None or interval == job.interval:
+            return
+        due = max(job.due - job.interval + interval, self.hass.loop.time())
+        bucket = self._wheel.get(job.tick)
+        if bucket and job in bucket:
+            bucket.remove(job)
+        job.interval = interval
+        self._place(job, due)
+        self._arm()
+
+    def replace(self, key, action):
+        """Swap the action of a job (e.g. an instrumented one while profiling) without moving it."""
+        job = self._jobs.get(key)
+        if job is not None:
+            job.action = action
+
+    def remove(self, key):
+        job = self._jobs.pop(key, None)
+        if job is None:
+            return
+        bucket = self._wheel.get(job.tick)
+        if bucket and job in bucket:
+            bucket.remove(job)
+        if not self._jobs and self._timer:
+            self._timer()
+            self._timer = None
+            self._armed_tick = None
+
+    def _place(self, job: _Job, due: float):
+        job.due = due
+        job.tick = math.ceil(due / self.resolution)
+        bucket = self._wheel.get(job.tick)
+        if bucket is None:
+            bucket = self._wheel[job.tick] = []
+            heapq.heappush(self._ticks, job.tick)
+        bucket.append(job)
+
+    @callback
+    def _arm(self):
+        # drop ticks whose jobs were all removed
+        while self._ticks and not self._wheel.get(self._ticks[0]):
+            self._wheel.pop(heapq.heappop(self._ticks), None)
+        if not self._ticks:
+            return
+        tick = self._ticks[0]
+        if tick == self._armed_tick:
+            return
+        if self._timer:
+            self._timer()
+        self._armed_tick = tick
+        self._timer = async_call_at(self.hass, self._fire, tick * self.resolution)
+
+    async def _fire(self, now):
+        tick = heapq.heappop(self._ticks)
+        jobs = self._wheel.pop(tick, [])
+        self._timer = None
+        self._armed_tick = None
+
+        lag = self.hass.loop.time() - tick * self.resolution
+        self.last_lag = lag
+        self.max_lag = max(self.max_lag, lag)
+        self.tick_count += 1
+        _LOGGER.debug("Scheduler tick %s: %d job(s), lag %.1f ms", tick, len(jobs), lag * 1000)
+
+        # reschedule before running so a slow tick does not delay the wheel
+        loop_now = self.hass.loop.time()
+        for job in jobs:
+            due = job.due + job.interval
+            while due <= loop_now:
+                due += job.interval
+            self._place(job, due)
+        self._arm()
+
+        singles = [job.action(now) for job in jobs if job.batch is None]
+        batches: dict[object, list] = {}
+        for job in jobs:
+            if job.batch is not None:
+                batches.setdefault(job.batch, []).append(job.key)
+        coros = singles + [batch(keys, now) for batch, keys in batches.items()]
+        for res in await asyncio.gather(*coros, return_exceptions=True):
+            if isinstance(res, Exception):
+                _LOGGER.error("Scheduled control loop failed: %s", res, exc_info=res)
@@ -1,19 +1,45 @@
 from __future__ import annotations
-from homeassistant.components.sensor import SensorEntity
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.entity import DeviceInfo
+from homeassistant.components.sensor import SensorEntity, SensorStateClass
+from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers.dispatcher import async_dispatcher_connect
+from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 from homeassistant.config_entries import ConfigEntry
 
-from .const import DOMAIN
+from .const import DOMAIN, DATA_SCHEDULER, SIGNAL_STATUS, CONF_OPTIMAL_START
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
-    async_add_entities([SmartPIDStatusSensor(hass, entry)], True)
+    from .fleet import add_zone_entities
+
+    add_zone_entities(hass, entry, async_add_entities, _build)
+
+def _build(hass: HomeAssistant, entry: ConfigEntry, full: bool) -> list:
+    if not full:
+        return [SmartPIDStatusSensor(hass, entry)]
+    entities = [
+        SmartPIDStatusSensor(hass, entry),
+        CommandCounterSensor(hass, entry, "sent", "Commands Sent"),
+        CommandCounterSensor(hass, entry, "suppressed", "Commands Suppressed"),
+        CommandCounterSensor(hass, entry, "failed", "Commands Failed"),
+        LatencySensor(hass, entry, "loop", "Loop Latency"),
+        LatencySensor(hass, entry, "sensor", "Sensor Read Latency"),
+        LatencySensor(hass, entry, "service_call", "Service Call Latency"),
+    ]
+    if {**entry.data, **entry.options}.get(CONF_OPTIMAL_START):
+        entities += [
+            OptimalStartSensor(hass, entry, "lead", "Optimal Start Lead"),
+            OptimalStartSensor(hass, entry, "error", "Optimal Start Error"),
+        ]
+    return entities
 
 class SmartPIDStatusSensor(SensorEntity):
+    """Pushed by the runtime after control-loop ticks (throttled); never polled."""
+    _attr_should_poll = False
+
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
         self._hass = hass
         self._entry = entry
+        self._runtime = None
         self._attr_name = f"{entry.title} Status"
         self._attr_unique_id = f"{entry.entry_id}_status"
         self._attr_native_value = "idle"
@@ -22,9 +48,112 @@ class SmartPIDStatusSensor(SensorEntity):
     def device_info(self) -> DeviceInfo:
         return DeviceInfo(identifiers={(DOMAIN, self._entry.entry_id)}, name=self._entry.title, manufacturer="Smart PID")
 
+    async def async_added_to_hass(self):
+        self._runtime = self._hass.data[DOMAIN][self._entry.entry_id]
+        self.async_on_remove(
+            async_dispatcher_connect(self._hass, SIGNAL_STATUS.format(self._entry.entry_id), self._on_status)
+        )
+        self._refresh()
+
+    @callback
+    def _on_status(self):
+        self._refresh()
+        self.async_write_ha_state()
+
+    @callback
+    def _refresh(self):
+        self._attr_native_value, attrs = self._runtime.status()
+        scheduler = self._hass.data.get(DATA_SCHEDULER)
+        if scheduler:
+            attrs["scheduler_lag_ms"] = round(scheduler.last_lag * 1000, 1)
+            attrs["scheduler_max_lag_ms"] = round(scheduler.max_lag * 1000, 1)
+        self._attr_extra_state_attributes = attrs
+
+class CommandCounterSensor(SensorEntity):
+    """Number of per-climate setpoint writes sent, suppressed or failed (after retries) by the actuator."""
+    _attr_state_class = SensorStateClass.TOTAL_INCREASING
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, counter: str, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._counter = counter
+        self._attr_name = f"{entry.title} {name}"
+        self._attr_unique_id = f"{entry.entry_id}_commands_{counter}"
+        self._attr_native_value = 0
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(identifiers={(DOMAIN, self._entry.entry_id)}, name=self._entry.title, manufacturer="Smart PID")
+
+    async def async_update(self):
+        runtime = self._hass.data[DOMAIN][self._entry.entry_id]
+        self._attr_native_value = getattr(runtime.actuator, self._counter)
+
+
+class LatencySensor(SensorEntity):
+    """p95 of one runtime latency histogram in ms; p50/p99 and counts as attributes."""
+    _attr_entity_category = EntityCategory.DIAGNOSTIC
+    _attr_native_unit_of_measurement = "ms"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, histogram: str, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._histogram = histogram
+        self._attr_name = f"{entry.title} {name}"
+        self._attr_unique_id = f"{entry.entry_id}_latency_{histogram}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(identifiers={(DOMAIN, self._entry.entry_id)}, name=self._entry.title, manufacturer="Smart PID")
+
     async def async_update(self):
         runtime = self._hass.data[DOMAIN][self._entry.entry_id]
-        if getattr(runtime, "autotuner", None):
-            self._attr_native_value = "autotuning"
-        else:
-            self._attr_native_value = "running"
+        summary = runtime.metrics[self._histogram].summary()
+        self._attr_native_value = summary["p95_ms"]
+        self._attr_extra_state_attributes = summary
+
+
+class OptimalStartSensor(SensorEntity):
+    """Predicted lead of the next transition, or the last prediction error, in minutes; pushed with the status."""
+    _attr_should_poll = False
+    _attr_native_unit_of_measurement = "min"
+    _attr_state_class = SensorStateClass.MEASUREMENT
+
+    def __init__(self, hass: HomeAssistant, entry: ConfigEntry, kind: str, name: str):
+        self._hass = hass
+        self._entry = entry
+        self._kind = kind
+        self._runtime = None
+        self._attr_name = f"{entry.title} {name}"
+        self._attr_unique_id = f"{entry.entry_id}_optimal_start_{kind}"
+
+    @property
+    def device_info(self) -> DeviceInfo:
+        return DeviceInfo(identifiers={(DOMAIN, self._entry.entry_id)}, name=self._entry.title, manufacturer="Smart PID")
+
+    async def async_added_to_hass(self):
+        self._runtime = self._hass.data[DOMAIN][self._entry.entry_id]
+        self.async_on_remove(
+            async_dispatcher_connect(self._hass, SIGNAL_STATUS.format(self._entry.entry_id), self._on_status)
+        )
+        self._refresh()
+
+    @callback
+    def _on_status(self):
+        self._refresh()
+        self.async_write_ha_state()
+
+    @callback
+    def _refresh(self):
+        optimal = self._runtime.optimal
+        value = optimal.next_lead if self._kind == "lead" else optimal.last_error
+        self._attr_native_value = None if value is None else round(value / 60, 1)
+        if self._kind == "lead":
+            self._attr_extra_state_attributes = {
+                "heating_samples": optimal.heat.samples,
+                "cooling_samples": optimal.cool.samples,
+                "heating_min_per_degree": round(optimal.heat.theta[0] / 60, 1),
+                "cooling_min_per_degree": round(optimal.cool.theta[0] / 60, 1),
+            }
@@ -0,0 +1,148 @@
+from __future__ import annotations
+import logging
+from functools import partial
+
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import HomeAssistantError
+
+from .const import DOMAIN
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _ids(value) -> list[str]:
+    if not value:
+        return []
+    return [value] if isinstance(value, str) else list(value)
+
+
+def _targets(hass: HomeAssistant, call: ServiceCall) -> list:
+    """Runtimes and fleets addressed by `entry_id` and `device_id` (one id or a list each).
+    A zone device of a fleet resolves to that zone's runtime."""
+    owners = hass.data.get(DOMAIN, {})
+    found = []
+    for entry_id in _ids(call.data.get("entry_id")):
+        if entry_id not in owners:
+            raise HomeAssistantError(f"No loaded {DOMAIN} entry {entry_id}")
+        found.append(owners[entry_id])
+    device_ids = _ids(call.data.get("device_id"))
+    if device_ids:
+        from homeassistant.helpers import device_registry as dr
+
+        registry = dr.async_get(hass)
+        for device_id in device_ids:
+            device = registry.async_get(device_id)
+            owner = None if device is None else next(
+                (owners[ident] for domain, ident in device.identifiers if domain == DOMAIN and ident in owners), None)
+            if owner is None:
+                raise HomeAssistantError(f"Device {device_id} is not a loaded {DOMAIN} zone")
+            found.append(owner)
+    return found
+
+
+def _runtimes(hass: HomeAssistant, call: ServiceCall, single: bool = False) -> list:
+    """Zone runtimes a call targets; a fleet entry stands for all its zones. Without a target the
+    call goes to the only loaded zone."""
+    from .fleet import FleetRuntime
+
+    targets = _targets(hass, call)
+    if not targets:
+        targets = [o for o in hass.data.get(DOMAIN, {}).values() if not isinstance(o, FleetRuntime)]
+        if len(targets) != 1:
+            raise HomeAssistantError(f"{len(targets)} zones are loaded; target one by entry_id or device_id")
+    runtimes = []
+    for owner in targets:
+        zones = list(owner.runtimes.values()) if isinstance(owner, FleetRuntime) else [owner]
+        runtimes.extend(r for r in zones if r not in runtimes)
+    if single and len(runtimes) != 1:
+        raise HomeAssistantError(f"{DOMAIN}.{call.service} needs exactly one zone, got {len(runtimes)}")
+    return runtimes
+
+
+async def _start_autotune(hass: HomeAssistant, call: ServiceCall):
+    for runtime in _runtimes(hass, call):
+        await runtime.start_autotune()
+
+
+async def _stop_autotune(hass: HomeAssistant, call: ServiceCall):
+    for runtime in _runtimes(hass, call):
+        res = await runtime.stop_autotune()
+        # Expose result to log; UI sensor also reflects applied values
+        _LOGGER.info("Auto-tune result for %s: %s", runtime.entry.title, res)
+
+
+async def _identify(hass: HomeAssistant, call: ServiceCall):
+    # an explicit export file holds the history of one zone
+    for runtime in _runtimes(hass, call, single=bool(call.data.get("path"))):
+        res = await runtime.identify_model(
+            source=call.data.get("source", "recorder"),
+            path=call.data.get("path"),
+            query=call.data.get("query"),
+            days=call.data.get("days", 30),
+            sample_interval=call.data.get("sample_interval", 60),
+            apply=call.data.get("apply", True),
+        )
+        _LOGGER.info("System identification result for %s: %s", runtime.entry.title, res)
+
+
+async def _optimize(hass: HomeAssistant, call: ServiceCall):
+    weights = {
+        name: float(call.data[f"{name}_weight"])
+        for name in ("overshoot", "settling", "commands")
+        if f"{name}_weight" in call.data
+    }
+    for runtime in _runtimes(hass, call):
+        res = await runtime.optimize_gains(
+            step=call.data.get("step", 3.0),
+            workers=call.data.get("workers"),
+            max_iterations=call.data.get("max_iterations", 40),
+            weights=weights,
+            apply=call.data.get("apply", True),
+        )
+        _LOGGER.info("Gain optimization result for %s: %s", runtime.entry.title, res)
+
+
+async def _dump_telemetry(hass: HomeAssistant, call: ServiceCall):
+    for runtime in _runtimes(hass, call, single=bool(call.data.get("path"))):
+        path = await runtime.dump_telemetry(call.data.get("path"), call.data.get("format", "binary"))
+        _LOGGER.info("Telemetry of %s written to %s", runtime.entry.title, path)
+
+
+async def _profile(hass: HomeAssistant, call: ServiceCall):
+    runtime, = _runtimes(hass, call, single=True)
+    res = await runtime.profile(
+        duration=call.data.get("duration"),
+        ticks=call.data.get("ticks"),
+        path=call.data.get("path"),
+    )
+    top = res.pop("top")
+    _LOGGER.info("Profile result: %s\n%s", res, top)
+
+
+async def _reload_fleet(hass: HomeAssistant, call: ServiceCall):
+    from .fleet import FleetRuntime
+
+    if call.data.get("entry_id") or call.data.get("device_id"):
+        fleets = [o for o in _targets(hass, call) if isinstance(o, FleetRuntime)]
+    else:
+        fleets = [o for o in hass.data.get(DOMAIN, {}).values() if isinstance(o, FleetRuntime)]
+    for fleet in fleets:
+        res = await fleet.reload()
+        _LOGGER.info("Fleet %s reloaded: %s", fleet.entry.title, res)
+
+
+SERVICES = {
+    "start_autotune": _start_autotune,
+    "stop_autotune": _stop_autotune,
+    "identify": _identify,
+    "optimize": _optimize,
+    "dump_telemetry": _dump_telemetry,
+    "profile": _profile,
+    "reload_fleet": _reload_fleet,
+}
+
+
+def async_setup_services(hass: HomeAssistant):
+    """Register the domain services once; each call picks its runtimes from the call data."""
+    for name, handler in SERVICES.items():
+        hass.services.async_register(DOMAIN, name, partial(handler, hass))
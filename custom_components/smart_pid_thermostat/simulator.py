@@ -0,0 +1,186 @@
+from __future__ import annotations
+import math
+import time
+from collections import deque
+
+from .pid_controller import PIDController
+from .autotune import RelayAutoTuner
+from .mpc import MPCController
+
+
+class SimClock:
+    """Simulated clock; pass `clock.t` wherever the controllers take `now`, or the clock itself
+    as ControllerRuntime's `clock` (time() is wall time `epoch + t`)."""
+    def __init__(self, start: float = 0.0, epoch: float = 0.0):
+        self.t = float(start)
+        self.epoch = float(epoch)
+
+    def advance(self, dt: float) -> float:
+        self.t += dt
+        return self.t
+
+    def monotonic(self) -> float:
+        return self.t
+
+    def time(self) -> float:
+        return self.epoch + self.t
+
+
+class FOPDTPlant:
+    """First-order-plus-dead-time room model.
+    The room relaxes towards gain * setpoint + (1 - gain) * outdoor with time constant `tau`;
+    the commanded setpoint reaches the room only after `dead_time` seconds.
+    """
+    def __init__(self, gain=0.8, tau=1800.0, dead_time=120.0, outdoor=10.0, initial=18.0):
+        self.gain = gain
+        self.tau = tau
+        self.dead_time = dead_time
+        self.outdoor = outdoor
+        self.initial = initial
+        self.reset()
+
+    def reset(self):
+        self.temperature = self.initial
+        self._queue = deque()
+
+    def step(self, setpoint: float, dt: float) -> float:
+        # dead time as a FIFO of past setpoints sampled every dt
+        delay_steps = max(0, int(round(self.dead_time / dt)))
+        self._queue.append(setpoint)
+        while len(self._queue) > delay_steps + 1:
+            self._queue.popleft()
+        u = self._queue[0] if len(self._queue) > delay_steps else self.initial
+        y_eq = self.gain * u + (1 - self.gain) * self.outdoor
+        # exact discretisation of the first-order lag for a held input
+        self.temperature = y_eq + (self.temperature - y_eq) * math.exp(-dt / self.tau)
+        return self.temperature
+
+
+class TwoNodeRCPlant:
+    """Two-node RC model: room air coupled to a slow thermal mass, leaking to outdoor.
+    The HVAC unit pushes heat proportional to (setpoint - air), limited to +/- q_max.
+    Capacitances in J/K, resistances in K/W, powers in W.
+    """
+    def __init__(self, c_air=5e5, c_mass=1e7, r_air_mass=0.002, r_air_out=0.01,
+                 hvac_gain=1500.0, q_max=4000.0, outdoor=10.0, initial=18.0):
+        self.c_air = c_air
+        self.c_mass = c_mass
+        self.r_air_mass = r_air_mass
+        self.r_air_out = r_air_out
+        self.hvac_gain = hvac_gain
+        self.q_max = q_max
+        self.outdoor = outdoor
+        self.initial = initial
+        self.reset()
+
+    def reset(self):
+        self.temperature = self.initial
+        self.mass_temperature = self.initial
+
+    def step(self, setpoint: float, dt: float) -> float:
+        # forward Euler with internal sub-steps keeps the stiff air node stable
+        n = max(1, int(math.ceil(dt / 30.0)))
+        h = dt / n
+        ta, tm = self.temperature, self.mass_temperature
+        for _ in range(n):
+            q = max(-self.q_max, min(self.q_max, self.hvac_gain * (setpoint - ta)))
+            flow_mass = (tm - ta) / self.r_air_mass
+            flow_out = (self.outdoor - ta) / self.r_air_out
+            ta += h * (flow_mass + flow_out + q) / self.c_air
+            tm += h * (-flow_mass) / self.c_mass
+        self.temperature, self.mass_temperature = ta, tm
+        return ta
+
+
+def run_scenario(plant, kp=0.8, ki=0.05, kd=0.1, target=22.0, duration=86400.0, interval=60.0,
+                 deadband=0.3, min_temp=18.0, max_temp=30.0, dt=10.0, settle_band=None, sensor_step=0.0,
+                 mpc: MPCController | None = None, command_step: float = 0.1):
+    """Run the same closed loop as ControllerRuntime._loop against `plant` on a simulated clock.
+    `sensor_step` > 0 rounds the readings the controller sees, like a real sensor's resolution.
+    With `mpc` the setpoint comes from it instead of the PID gains.
+    Setpoints are rounded to `command_step` like the actuator does, and `commands` counts only
+    the ticks where that changed the setpoint sent to the device.
+    Returns settling time, overshoot, actuator command count and wall-clock cost per simulated day.
+    """
+    plant.reset()
+    clock = SimClock()
+    pid = PIDController(kp, ki, kd, out_min=min_temp - target, out_max=max_temp - target)
+    if mpc:
+        mpc.reset()
+        mpc.u_min, mpc.u_max = min_temp, max_temp
+    band = deadband if settle_band is None else settle_band
+    direction = 1 if target >= plant.temperature else -1
+
+    applied = plant.temperature
+    commands = 0
+    next_tick = 0.0
+    overshoot = 0.0
+    settled_at = None
+    wall = time.perf_counter()
+    while clock.t < duration:
+        ambient = plant.temperature
+        if sensor_step:
+            ambient = round(ambient / sensor_step) * sensor_step
+        if clock.t >= next_tick:
+            next_tick += interval
+            error = target - ambient
+            if abs(error) > deadband:
+                if mpc:
+                    commanded = mpc.step(ambient, target, applied, clock.t)
+                else:
+                    out = pid.update(error, now=clock.t)
+                    commanded = max(min_temp, min(max_temp, target + out))
+                if command_step:
+                    commanded = round(round(commanded / command_step) * command_step, 4)
+                if commanded != applied:
+                    applied = commanded
+                    commands += 1
+        y = plant.step(applied, dt)
+        clock.advance(dt)
+        overshoot = max(overshoot, (y - target) * direction)
+        if abs(y - target) <= band:
+            if settled_at is None:
+                settled_at = clock.t
+        else:
+            settled_at = None
+    wall = time.perf_counter() - wall
+
+    return {
+        "settling_time": settled_at,
+        "overshoot": overshoot,
+        "commands": commands,
+        "final": plant.temperature,
+        "wall_per_day": wall * 86400.0 / duration,
+    }
+
+
+def run_autotune(plant, target=22.0, amplitude=0.5, duration=6 * 3600.0, interval=60.0, dt=10.0):
+    """Drive RelayAutoTuner against `plant` and return its suggested gains plus run statistics."""
+    plant.reset()
+    clock = SimClock()
+    tuner = RelayAutoTuner(amplitude=amplitude)
+    tuner.start()
+
+    commanded = target
+    commands = 0
+    next_tick = 0.0
+    wall = time.perf_counter()
+    while clock.t < duration:
+        if clock.t >= next_tick:
+            next_tick += interval
+            commanded = tuner.step(plant.temperature, target, now=clock.t)
+            commands += 1
+        plant.step(commanded, dt)
+        clock.advance(dt)
+    wall = time.perf_counter() - wall
+
+    return {
+        "result": tuner.results(),
+        "commands": commands,
+        "wall_per_day": wall * 86400.0 / duration,
+    }
+
+
+def run_batch(scenarios):
+    """Run several scenarios: an iterable of (name, plant, kwargs) tuples. Returns {name: metrics}."""
+    return {name: run_scenario(plant, **kwargs) for name, plant, kwargs in scenarios}
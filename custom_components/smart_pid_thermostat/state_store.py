@@ -0,0 +1,87 @@
+from __future__ import annotations
+import asyncio
+import logging
+
+from homeassistant.const import EVENT_HOMEASSISTANT_FINAL_WRITE
+from homeassistant.core import Event, HomeAssistant, callback
+from homeassistant.helpers.storage import Store
+
+from .const import DOMAIN, DATA_STATE_STORE
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION = 1
+STORAGE_KEY = f"{DOMAIN}.controller_state"
+SAVE_DELAY = 60
+
+
+class ControllerStateStore:
+    """One debounced Store file holding the warm-start state of every runtime.
+    Each entry is a compact list produced by ControllerRuntime.snapshot_state(); runtimes only
+    mark themselves dirty, and the file is written at most once per SAVE_DELAY seconds. On Home
+    Assistant shutdown a fresh snapshot of every runtime is written, dirty or not, so settled zones
+    that sent no command keep a recent integral.
+    """
+    def __init__(self, hass: HomeAssistant):
+        self._store = Store(hass, STORAGE_VERSION, STORAGE_KEY)
+        self._data: dict[str, list] = {}
+        self._runtimes = {}
+        self._pending = False
+
+    @classmethod
+    async def async_get(cls, hass: HomeAssistant) -> ControllerStateStore:
+        # concurrent entry setups share a single load
+        task = hass.data.get(DATA_STATE_STORE)
+        if task is None:
+            task = hass.data[DATA_STATE_STORE] = hass.async_create_task(cls._async_create(hass))
+        return await asyncio.shield(task)
+
+    @classmethod
+    async def _async_create(cls, hass: HomeAssistant) -> ControllerStateStore:
+        store = cls(hass)
+        try:
+            store._data = (await store._store.async_load() or {}).get("runtimes", {})
+        except Exception as e:
+            _LOGGER.warning("Could not load controller state, starting cold: %s", e)
+        hass.bus.async_listen_once(EVENT_HOMEASSISTANT_FINAL_WRITE, store._async_final_write)
+        return store
+
+    def get(self, entry_id: str) -> list | None:
+        return self._data.get(entry_id)
+
+    def register(self, entry_id: str, runtime):
+        self._runtimes[entry_id] = runtime
+
+    def unregister(self, entry_id: str):
+        runtime = self._runtimes.pop(entry_id, None)
+        if runtime is not None:
+            self._data[entry_id] = runtime.snapshot_state()
+            self.async_schedule_save()
+
+    def remove(self, entry_id: str):
+        self._runtimes.pop(entry_id, None)
+        if self._data.pop(entry_id, None) is not None:
+            self.async_schedule_save()
+
+    def remove_prefix(self, prefix: str):
+        """Drop all entries whose id starts with `prefix` (the zones of a removed fleet)."""
+        for entry_id in [e for e in (*self._data, *self._runtimes) if e.startswith(prefix)]:
+            self.remove(entry_id)
+
+    @callback
+    def async_schedule_save(self):
+        # Store.async_delay_save restarts its timer on every call; arm it once so that
+        # runtimes ticking more often than SAVE_DELAY cannot postpone the write forever
+        if not self._pending:
+            self._pending = True
+            self._store.async_delay_save(self._collect, SAVE_DELAY)
+
+    async def _async_final_write(self, event: Event):
+        await self._store.async_save(self._collect())
+
+    @callback
+    def _collect(self) -> dict:
+        self._pending = False
+        for entry_id, runtime in self._runtimes.items():
+            self._data[entry_id] = runtime.snapshot_state()
+        return {"runtimes": self._data}
@@ -8,7 +8,12 @@ from homeassistant.helpers.entity import DeviceInfo
 from .const import DOMAIN
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback):
-    async_add_entities([SmartPIDEnableSwitch(hass, entry)], True)
+    from .fleet import add_zone_entities
+
+    add_zone_entities(hass, entry, async_add_entities, _build)
+
+def _build(hass: HomeAssistant, entry: ConfigEntry, full: bool) -> list:
+    return [SmartPIDEnableSwitch(hass, entry)]
 
 class SmartPIDEnableSwitch(SwitchEntity):
     def __init__(self, hass: HomeAssistant, entry: ConfigEntry):
@@ -26,12 +31,14 @@ class SmartPIDEnableSwitch(SwitchEntity):
         self._is_on = True
         runtime = self._hass.data[DOMAIN][self._entry.entry_id]
         runtime.enabled = True
+        runtime.publish_status()
         self.async_write_ha_state()
 
     async def async_turn_off(self, **kwargs):
         self._is_on = False
         runtime = self._hass.data[DOMAIN][self._entry.entry_id]
         runtime.enabled = False
+        runtime.publish_status()
         self.async_write_ha_state()
 
     @property
@@ -0,0 +1,220 @@
+from __future__ import annotations
+import csv
+import math
+import sqlite3
+from datetime import datetime, timedelta
+
+import numpy as np
+
+CHUNK_ROWS = 20000
+
+
+class ZOHResampler:
+    """Streams irregular (t, ambient, setpoint) rows onto a fixed grid with zero-order hold.
+    NaN in a column means "no new value in this row". A grid sample whose source value is
+    older than `max_hold` seconds is NaN so long recorder gaps are not bridged.
+    """
+    def __init__(self, step: float, max_hold: float = 900.0):
+        self.step = float(step)
+        self.max_hold = float(max_hold)
+        self.next_t: float | None = None
+        self._last = np.full(2, np.nan)
+        self._last_t = np.full(2, -np.inf)
+
+    def feed(self, t, ambient, setpoint):
+        t = np.asarray(t, dtype=float)
+        if t.size == 0:
+            return np.empty(0), np.empty(0)
+        vals = np.vstack([self._last, np.column_stack([ambient, setpoint])])
+        times = np.vstack([self._last_t, np.column_stack([t, t])])
+        # forward-fill each column (value and the time it was reported)
+        rows = np.arange(vals.shape[0])[:, None]
+        src = np.maximum.accumulate(np.where(np.isnan(vals), 0, rows), axis=0)
+        vals = np.take_along_axis(vals, src, axis=0)
+        times = np.take_along_axis(times, src, axis=0)
+        self._last, self._last_t = vals[-1], times[-1]
+
+        if self.next_t is None:
+            self.next_t = math.ceil(t[0] / self.step) * self.step
+        grid = np.arange(self.next_t, t[-1] + self.step * 1e-6, self.step)
+        if grid.size == 0:
+            return np.empty(0), np.empty(0)
+        self.next_t = grid[-1] + self.step
+        pos = np.searchsorted(np.concatenate([[-np.inf], t]), grid, side="right") - 1
+        out = vals[pos]
+        out[(grid[:, None] - times[pos]) > self.max_hold] = np.nan
+        return out[:, 0], out[:, 1]
+
+
+class ARXAccumulator:
+    """Least-squares fit of y[k+1] = a*y[k] + b*u[k-d] + c for every dead time d <= max_delay.
+    Only the sufficient statistics (normal equations) are kept, so memory does not depend on
+    how much history is streamed through `add`.
+    """
+    def __init__(self, step: float, max_delay: int = 30):
+        self.step = float(step)
+        self.max_delay = int(max_delay)
+        n = self.max_delay + 1
+        self._tail_y = np.empty(0)
+        self._tail_u = np.empty(0)
+        self._ref: float | None = None
+        self.samples = 0
+        # statistics shared by all delays
+        self._s = dict(yy=0.0, y=0.0, n=0.0, yy1=0.0, y1=0.0, y1y1=0.0)
+        # statistics per delay
+        self._uu = np.zeros(n)
+        self._yu = np.zeros(n)
+        self._u = np.zeros(n)
+        self._uy1 = np.zeros(n)
+
+    def add(self, y, u):
+        y = np.concatenate([self._tail_y, np.asarray(y, dtype=float)])
+        u = np.concatenate([self._tail_u, np.asarray(u, dtype=float)])
+        D = self.max_delay
+        self._tail_y, self._tail_u = y[-(D + 1):], u[-(D + 1):]
+        m = y.size - 1 - D
+        if m <= 0:
+            return
+        if self._ref is None:
+            finite = y[np.isfinite(y)]
+            if finite.size == 0:
+                return
+            self._ref = float(finite[0])
+        # centre around the first reading to keep the normal equations well conditioned
+        yk = y[D:D + m] - self._ref
+        yk1 = y[D + 1:D + 1 + m] - self._ref
+        # row d holds u[k - d]
+        U = np.stack([u[D - d:D - d + m] for d in range(D + 1)]) - self._ref
+        valid = np.isfinite(yk) & np.isfinite(yk1) & np.isfinite(U).all(axis=0)
+        yk, yk1, U = yk[valid], yk1[valid], U[:, valid]
+        self.samples += yk.size
+
+        s = self._s
+        s["yy"] += yk @ yk
+        s["y"] += yk.sum()
+        s["n"] += yk.size
+        s["yy1"] += yk @ yk1
+        s["y1"] += yk1.sum()
+        s["y1y1"] += yk1 @ yk1
+        self._uu += np.einsum("ij,ij->i", U, U)
+        self._yu += U @ yk
+        self._u += U.sum(axis=1)
+        self._uy1 += U @ yk1
+
+    def fit(self):
+        """Return the best FOPDT model, or None if the data does not identify one."""
+        s = self._s
+        if s["n"] < 10:
+            return None
+        n = self.max_delay + 1
+        XtX = np.empty((n, 3, 3))
+        XtX[:, 0, 0] = s["yy"]
+        XtX[:, 0, 1] = XtX[:, 1, 0] = self._yu
+        XtX[:, 0, 2] = XtX[:, 2, 0] = s["y"]
+        XtX[:, 1, 1] = self._uu
+        XtX[:, 1, 2] = XtX[:, 2, 1] = self._u
+        XtX[:, 2, 2] = s["n"]
+        Xty = np.stack([np.full(n, s["yy1"]), self._uy1, np.full(n, s["y1"])], axis=1)
+        try:
+            theta = np.linalg.solve(XtX, Xty[:, :, None])[:, :, 0]
+        except np.linalg.LinAlgError:
+            return None
+        sse = s["y1y1"] - np.einsum("ij,ij->i", theta, Xty)
+        d = int(np.argmin(sse))
+        a, b, c = theta[d]
+        if not (0 < a < 1) or b <= 0:
+            return None
+        gain = b / (1 - a)
+        return {
+            "gain": float(gain),
+            "tau": float(-self.step / math.log(a)),
+            "dead_time": float(d * self.step),
+            "rmse": float(math.sqrt(max(0.0, sse[d]) / s["n"])),
+            "samples": int(s["n"]),
+        }
+
+
+def imc_gains(model: dict, tau_c: float | None = None) -> dict:
+    """IMC PID tuning for a FOPDT model; closed-loop time constant defaults to max(dead time, tau / 10)."""
+    K, tau, theta = model["gain"], model["tau"], model["dead_time"]
+    if tau_c is None:
+        tau_c = max(theta, tau / 10)
+    kc = (tau + theta / 2) / (K * (tau_c + theta / 2))
+    ti = tau + theta / 2
+    td = tau * theta / (2 * tau + theta)
+    return {"kp": kc, "ki": kc / ti, "kd": kc * td}
+
+
+def _to_ts(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return datetime.fromisoformat(str(value)).timestamp()
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _stream(rows, resampler: ZOHResampler, acc: ARXAccumulator):
+    """Feed (t, ambient, setpoint) row tuples in chunks of CHUNK_ROWS."""
+    buf = []
+    for row in rows:
+        buf.append((_to_ts(row[0]), _to_float(row[1]), _to_float(row[2])))
+        if len(buf) >= CHUNK_ROWS:
+            acc.add(*resampler.feed(*np.array(buf).T))
+            buf.clear()
+    if buf:
+        acc.add(*resampler.feed(*np.array(buf).T))
+
+
+def identify_csv(path: str, step: float = 60.0, max_delay: int = 30) -> dict | None:
+    """CSV with a header and columns timestamp (epoch or ISO 8601), ambient, setpoint."""
+    resampler, acc = ZOHResampler(step), ARXAccumulator(step, max_delay)
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        next(reader, None)
+        _stream(reader, resampler, acc)
+    return acc.fit()
+
+
+def identify_sqlite(path: str, query: str, step: float = 60.0, max_delay: int = 30) -> dict | None:
+    """`query` must return timestamp, ambient, setpoint rows ordered by timestamp."""
+    resampler, acc = ZOHResampler(step), ARXAccumulator(step, max_delay)
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        cur = conn.execute(query)
+        while rows := cur.fetchmany(CHUNK_ROWS):
+            _stream(rows, resampler, acc)
+    finally:
+        conn.close()
+    return acc.fit()
+
+
+def identify_recorder(hass, sensor: str, climate: str, days: int, step: float = 60.0, max_delay: int = 30) -> dict | None:
+    """Read sensor and climate setpoint history one day at a time. Runs in the recorder executor."""
+    from homeassistant.components.recorder import history
+    from homeassistant.util import dt as dt_util
+
+    resampler, acc = ZOHResampler(step), ARXAccumulator(step, max_delay)
+    end = dt_util.utcnow()
+    start = end - timedelta(days=days)
+    while start < end:
+        stop = min(end, start + timedelta(days=1))
+        states = history.get_significant_states(
+            hass, start, stop, entity_ids=[sensor, climate], significant_changes_only=False
+        )
+        rows = [(s.last_updated.timestamp(), _to_float(s.state), np.nan) for s in states.get(sensor, [])]
+        rows += [
+            (s.last_updated.timestamp(), np.nan, _to_float(s.attributes.get("temperature")))
+            for s in states.get(climate, [])
+        ]
+        if rows:
+            data = np.array(rows)
+            data = data[np.argsort(data[:, 0], kind="stable")]
+            acc.add(*resampler.feed(data[:, 0], data[:, 1], data[:, 2]))
+        start = stop
+    return acc.fit()
@@ -0,0 +1,58 @@
+from __future__ import annotations
+import csv
+from array import array
+
+FIELDS = ("timestamp", "ambient", "target", "error", "p", "i", "d", "commanded")
+NAN = float("nan")
+
+
+class TelemetryBuffer:
+    """Fixed-size ring buffer of control-loop samples stored in one flat float64 array.
+    Recording a sample writes its fields in place; no array or tuple is built per tick.
+    """
+    def __init__(self, capacity: int = 4096):
+        self.capacity = max(1, int(capacity))
+        self._width = len(FIELDS)
+        self._data = array("d", bytes(8 * self._width * self.capacity))
+        self._pos = 0
+        self.count = 0
+
+    def record(self, timestamp, ambient, target, error, p=NAN, i=NAN, d=NAN, commanded=NAN):
+        data = self._data
+        base = self._pos * self._width
+        data[base] = timestamp
+        data[base + 1] = ambient
+        data[base + 2] = target
+        data[base + 3] = error
+        data[base + 4] = p
+        data[base + 5] = i
+        data[base + 6] = d
+        data[base + 7] = commanded
+        self._pos = (self._pos + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def snapshot(self) -> array:
+        """Copy of the recorded samples, oldest first, as a flat array of len(FIELDS) columns."""
+        w = self._width
+        if self.count < self.capacity:
+            return self._data[:self.count * w]
+        return self._data[self._pos * w:] + self._data[:self._pos * w]
+
+
+def write_csv(path: str, data: array):
+    w = len(FIELDS)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(FIELDS)
+        for k in range(0, len(data), w):
+            writer.writerow(data[k:k + w])
+
+
+def write_binary(path: str, data: array):
+    """NumPy .npy with one float64 field per column; load with numpy.load(path). Written to `path`
+    as given (np.save would append .npy to a bare file name)."""
+    import numpy as np
+
+    dtype = np.dtype([(name, "f8") for name in FIELDS])
+    with open(path, "wb") as f:
+        np.save(f, np.frombuffer(data, dtype="f8").view(dtype))
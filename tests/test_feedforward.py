@@ -0,0 +1,179 @@
+"""Feedforward from a stub weather entity: profile resampling, lead lookup, the forecast fallback
+and the PID limits shifted by the offset."""
+from __future__ import annotations
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from homeassistant.exceptions import HomeAssistantError
+
+from custom_components.smart_pid_thermostat.const import (
+    CONF_CLIMATES,
+    CONF_FEEDFORWARD,
+    CONF_FF_GAIN,
+    CONF_FF_LEAD,
+    CONF_KD,
+    CONF_KI,
+    CONF_KP,
+    CONF_MAX_TEMP,
+    CONF_MIN_TEMP,
+    CONF_NAME,
+    CONF_OUTDOOR_SENSOR,
+    CONF_SENSOR,
+    CONF_TARGET,
+)
+from custom_components.smart_pid_thermostat.coordinator import ControllerRuntime
+from custom_components.smart_pid_thermostat.feedforward import DisturbanceProfile, FeedForward
+from custom_components.smart_pid_thermostat.simulator import SimClock
+
+START = datetime(2026, 1, 15, 12, 0, tzinfo=timezone.utc)
+NOW = START.timestamp()
+WEATHER = "weather.home"
+
+
+def hourly(temps, first: datetime = START - timedelta(minutes=30)) -> list[dict]:
+    """Hourly forecast entries as weather.get_forecasts returns them; the first one lies in the past."""
+    return [{"datetime": (first + timedelta(hours=h)).isoformat(), "temperature": t} for h, t in enumerate(temps)]
+
+
+class State:
+    def __init__(self, state, attributes: dict):
+        self.state = state
+        self.attributes = attributes
+
+
+class StubWeather:
+    """hass stand-in with one weather entity. With `service=False` weather.get_forecasts is not
+    available and only the legacy `forecast` attribute carries the forecast."""
+    def __init__(self, temperature: float, forecast=None, attribute_forecast=None, service: bool = True):
+        attributes = {"temperature": temperature}
+        if attribute_forecast is not None:
+            attributes["forecast"] = attribute_forecast
+        self.states = {WEATHER: State("cloudy", attributes)}
+        self.services = self
+        self.forecast = forecast
+        self.service = service
+        self.calls = 0
+
+    async def async_call(self, domain, service, data, blocking=False, return_response=False):
+        self.calls += 1
+        if not self.service:
+            raise HomeAssistantError(f"Service {domain}.{service} not found")
+        return {data["entity_id"]: {"forecast": self.forecast}}
+
+
+def runtime(hass, **options) -> ControllerRuntime:
+    entry = type("Entry", (), {})()
+    entry.entry_id, entry.title = "test", "Test"
+    entry.data = {CONF_NAME: "Test", CONF_CLIMATES: ["climate.test"], CONF_SENSOR: ["sensor.test"],
+                  CONF_OUTDOOR_SENSOR: WEATHER, CONF_FEEDFORWARD: True}
+    entry.options = options
+    return ControllerRuntime(hass, entry, clock=SimClock(0.0, epoch=NOW))
+
+
+def test_profile_resamples_forecast_onto_grid():
+    profile = DisturbanceProfile.from_forecast(hourly([0.0, 6.0, 12.0]), NOW, step=300.0)
+    assert profile.start == NOW
+    # linear between the hourly points, which sit at -30, +30 and +90 minutes
+    assert profile.at(NOW) == pytest.approx(3.0)
+    assert profile.at(NOW + 299.0) == pytest.approx(3.0)
+    assert profile.at(NOW + 300.0) == pytest.approx(3.5)
+    assert profile.at(NOW + 3600.0) == pytest.approx(9.0)
+    # the last hour is held until its end, nothing before now or after is extrapolated
+    assert profile.end == NOW + 150 * 60
+    assert profile.at(profile.end - 1.0) == pytest.approx(12.0)
+    assert profile.at(profile.end) is None
+    assert profile.at(NOW - 1.0) is None
+
+
+def test_profile_ignores_unusable_forecasts():
+    assert DisturbanceProfile.from_forecast(None, NOW) is None
+    assert DisturbanceProfile.from_forecast([{"datetime": "soon", "temperature": 3}, {"temperature": 4}], NOW) is None
+    assert DisturbanceProfile.from_forecast(hourly([5.0], START - timedelta(hours=3)), NOW) is None
+    profile = DisturbanceProfile.from_forecast(hourly([0.0, "n/a", 12.0]), NOW)
+    assert profile.at(NOW + 3600.0) == pytest.approx(9.0)
+
+
+def test_lead_reads_ahead_and_holds_the_last_value():
+    ff = FeedForward(gain=0.5, lead=3600.0)
+    assert ff.term(22.0, NOW) == 0.0
+    assert ff.load_forecast(hourly([0.0, 6.0, 12.0]), NOW)
+    assert ff.source == "forecast"
+    assert ff.term(22.0, NOW) == pytest.approx(0.5 * (22.0 - 9.0))
+    ff.lead = 24 * 3600.0
+    assert ff.term(22.0, NOW) == pytest.approx(0.5 * (22.0 - 12.0))
+    # a stale profile contributes nothing
+    assert ff.term(22.0, NOW + 3 * 3600.0) == 0.0
+
+
+@pytest.mark.parametrize("outdoor, sign", [(-5.0, 1), (35.0, -1)])
+def test_term_sign_for_heat_and_cool(outdoor, sign):
+    ff = FeedForward(gain=0.2, lead=0.0)
+    ff.load_current(outdoor, NOW, 3600.0)
+    assert ff.source == "sensor"
+    assert ff.term(22.0, NOW) == pytest.approx(0.2 * (22.0 - outdoor))
+    assert (ff.term(22.0, NOW) > 0) == (sign > 0)
+
+
+def test_forecast_from_service():
+    hass = StubWeather(10.0, forecast=hourly([0.0, 6.0, 12.0]), attribute_forecast=hourly([20.0, 20.0, 20.0]))
+    rt = runtime(hass, **{CONF_FF_LEAD: 0})
+    asyncio.run(rt.refresh_feedforward())
+    assert hass.calls == 1
+    assert rt.feedforward.source == "forecast"
+    assert rt.feedforward.profile.at(NOW) == pytest.approx(3.0)
+
+
+def test_forecast_falls_back_to_legacy_attribute():
+    hass = StubWeather(10.0, attribute_forecast=hourly([0.0, 6.0, 12.0]), service=False)
+    rt = runtime(hass, **{CONF_FF_LEAD: 0})
+    asyncio.run(rt.refresh_feedforward())
+    assert hass.calls == 1
+    assert rt.feedforward.source == "forecast"
+    assert rt.feedforward.profile.at(NOW) == pytest.approx(3.0)
+
+
+def test_no_forecast_falls_back_to_current_temperature():
+    hass = StubWeather(10.0, forecast=[])
+    rt = runtime(hass)
+    asyncio.run(rt.refresh_feedforward())
+    assert rt.feedforward.source == "sensor"
+    assert rt.feedforward.term(22.0, NOW) == pytest.approx(0.1 * 12.0)
+
+
+@pytest.mark.parametrize("outdoor, error, limit", [(-18.0, 10.0, CONF_MAX_TEMP), (42.0, -10.0, CONF_MIN_TEMP)])
+def test_shifted_limits_saturate_the_setpoint(outdoor, error, limit):
+    hass = StubWeather(outdoor, forecast=[])
+    rt = runtime(hass, **{CONF_TARGET: 22.0, CONF_MIN_TEMP: 16.0, CONF_MAX_TEMP: 28.0, CONF_FF_GAIN: 0.1,
+                          CONF_KP: 1.0, CONF_KI: 0.01, CONF_KD: 0.0})
+    sent = []
+
+    async def capture(entity_ids, temperature, force=False):
+        sent.append(temperature)
+
+    rt.actuator.async_set_temperature = capture
+    asyncio.run(rt.refresh_feedforward())
+    rt._update_feedforward(22.0)
+    ff = 0.1 * (22.0 - outdoor)
+    assert rt._ff == pytest.approx(ff)
+    assert rt.pid.out_max == pytest.approx(28.0 - 22.0 - ff)
+    assert rt.pid.out_min == pytest.approx(16.0 - 22.0 - ff)
+
+    async def run(error, ticks):
+        for _ in range(ticks):
+            rt.clock.advance(60.0)
+            rt._sample = (rt.clock.time(), 22.0 - error, 22.0, error)
+            await rt._apply_output(rt.pid.update(error, now=rt.clock.monotonic()))
+
+    asyncio.run(run(error, 5))
+    # the PID output stops at the shifted limit, so PID plus offset lands exactly on the limit
+    assert sent[-1] == pytest.approx(rt.cfg[limit])
+    assert rt.pid.update(error, now=rt.clock.advance(60.0)) == pytest.approx(
+        rt.pid.out_max if error > 0 else rt.pid.out_min)
+    # a new offset moves the limits with it; the setpoint still stops at the same temperature
+    hass.states[WEATHER].attributes["temperature"] = outdoor / 2
+    asyncio.run(rt.refresh_feedforward())
+    rt._update_feedforward(22.0)
+    assert rt.pid.out_max == pytest.approx(28.0 - 22.0 - 0.1 * (22.0 - outdoor / 2))
+    asyncio.run(run(error, 1))
+    assert sent[-1] == pytest.approx(rt.cfg[limit])